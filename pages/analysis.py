@@ -1,17 +1,43 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import seaborn as sns
-import matplotlib.pyplot as plt
-import ppscore as pps
-from feature_engine.encoding import OneHotEncoder
-from src.data_management import load_pricing_data
+from src.data_management import load_pricing_data, pricing_data_version
+from src.data_analysis.matrix_cache import correlation_matrix, pps_matrix
+from src.data_analysis.correlation_index import get_correlation_index
+from src.data_analysis.eda_frame import (
+    EDA_VARIABLES,
+    TARGET_VAR,
+    load_eda_frame
+)
+from src.data_analysis.charts import bivariate_chart
+from src.data_analysis.figure_cache import (
+    cached_image,
+    display_chart,
+    show_image
+)
+from src.data_analysis.gallery import render_gallery
+from src.data_analysis.sampling import (
+    REFRESH_SECONDS,
+    STRATA_COLUMN,
+    get_progressive_analysis
+)
+from src.data_analysis.streaming import (
+    RANK_BINS,
+    bivariate_figure,
+    load_streaming_summary,
+    streaming_source,
+    target_figure
+)
 from utils import create_toc
 
 # This page displays content of the
 # correlation analysis page in the Streamlit app.
 # This includes:
 # - Page introduction
+# - Choice of analysis mode: in memory, streamed from Parquet row
+#   groups for datasets larger than memory (with approximate Spearman
+#   correlations from binned ranks), or sampled, showing
+#   approximate heatmaps at once and refining them in the background
 # - Optional: Checkbox to review raw dataset,
 #   displays raw data table if checked
 # - Summary of correlation analysis
@@ -66,188 +92,47 @@ st.write(
 st.markdown(" ")
 
 
-# Function to create a correlation heatmap
-def correlation_heatmap(df, threshold=0.5, figsize=(12, 8),
-                        font_size=8, title="Correlation Heatmap"):
-    """
-    Generate a heatmap to visualize strong correlations between variables.
-    Code copied from Notebook 3:
-    Section: 5.2 Calculate and Visualize Relationships in Dataset
-    """
-    if df.shape[1] > 1:  # Check for enough columns
-        # Filter rows and columns with values below the threshold
-        filtered_data = df.loc[(abs(df) >= threshold).any(axis=1),
-                               (abs(df) >= threshold).any(axis=0)]
-
-        # Create a mask to hide the upper triangle
-        # and values below the threshold
-        mask = np.zeros_like(filtered_data, dtype=bool)
-        mask[np.triu_indices_from(mask)] = True
-        mask[(abs(filtered_data) <= 0.2)] = True
-
-        # Format data for better readability
-        formatted_data = filtered_data.applymap(
-                        lambda x: round(x, 2) if abs(x) > 0.2 else 0)
-
-        # Draw heatmap
-        fig, ax = plt.subplots(figsize=figsize)
-        sns.heatmap(
-            formatted_data,
-            annot=True,
-            cmap=sns.color_palette("Spectral"),
-            mask=mask,
-            annot_kws={"size": font_size},
-            linewidths=0.5,
-            ax=ax
-        )
-        ax.set_title(title, fontsize=14)
-        st.pyplot(fig)
-
-
-# Function to create a PPS heatmap
-def pps_heatmap(df, threshold=0.2, figsize=(12, 8),
-                font_size=8, title="PPS Heatmap"):
+def sampled_heatmap(progressive, kind, title, threshold, columns=None,
+                    polling=False):
     """
-    Generate a heatmap to visualize Predictive Power Score (PPS)
-    between variables.
-    Code copied from Notebook 3:
-    Section: 5.2 Calculate and Visualize Relationships in Dataset
+    Display the most precise heatmap of a progressive analysis so far.
+
+    Args:
+        progressive (ProgressiveAnalysis): Sampled analysis of the data
+        kind (str): "pearson", "spearman" or "pps"
+        title (str): Heatmap title
+        threshold (float): Heatmap threshold
+        columns (list): Variables to keep, all of them if None
+        polling (bool): Whether the heatmap is refreshed periodically,
+                        the page is rerun once refinement is over to
+                        stop it
     """
-    if df.shape[1] > 1:
-        # Filter rows and columns with values under the threshold
-        filtered_data = df.loc[(abs(df) >= threshold).any(axis=1),
-                               (abs(df) >= threshold).any(axis=0)]
-
-        # Create a mask to hide values <= threshold
-        # and values that are exactly 0
-        mask = np.zeros_like(filtered_data, dtype=bool)
-        mask[abs(filtered_data) <= 0.2] = True
-        mask[filtered_data == 0] = True
-
-        # Format data for better readability
-        formatted_data = filtered_data.applymap(
-                        lambda x: round(x, 2) if abs(x) > 0.2 else 0)
-
-        # Draw heatmap
-        fig, ax = plt.subplots(figsize=figsize)
-        sns.heatmap(
-            formatted_data,
-            annot=True,
-            cmap=sns.color_palette("Spectral"),
-            annot_kws={"size": font_size},
-            linewidths=0.5,
-            mask=mask,
-            ax=ax
+    if progressive.error is not None:
+        st.error(f"The sampled analysis failed: {progressive.error}")
+        return
+    result = progressive.latest(kind)
+    if result is None:
+        st.caption("Drawing a stratified sample of the data...")
+    else:
+        values, errors = result["values"], result["errors"]
+        if columns is not None:
+            values = values.loc[columns, columns]
+            errors = errors.loc[columns, columns]
+        chart = "pps_heatmap" if kind == "pps" else "correlation_heatmap"
+        display_chart(
+            chart, values, threshold=threshold, title=title,
+            errors=None if result["exact"] else errors
         )
-        ax.set_title(title, fontsize=14)
-        st.pyplot(fig)
-
-
-# Code copied from Notebook 3
-# Section: 6.3 Bivariate Analysis of Key Variables and SalePrice
-# Dictionary for variable names
-variable_names = {
-    'YearBuilt': 'Year Built',
-    'YearRemodAdd': 'Year Remodeled/Added',
-    'GrLivArea': 'Above Ground Living Area (sq ft)',
-    'GarageArea': 'Garage Area (sq ft)',
-    'OverallQual': 'Overall Quality (1-10 scale)',
-    'SalePrice': 'Sale Price (USD)',
-    '1stFlrSF': '1st Floor Area (sq ft)',
-    'KitchenQual_Gd': 'Kitchen Quality - Good',
-    'KitchenQual_Ex': 'Kitchen Quality - Excellent',
-    'KitchenQual_TA': 'Kitchen Quality - Typical/Average',
-    'TotalBsmtSF': 'Total Basement Area (sq ft)',
-    'MasVnrArea': 'Masonry Veneer Area (sq ft)',
-    'GarageYrBlt': 'Garage Year Built',
-}
-
-# Time variables
-time_vars = ['YearBuilt', 'YearRemodAdd']
-
-
-# Function to create a scatterplot with regression line
-def plot_lm(df, col, target_var):
-    fig, ax = plt.subplots(figsize=(8, 4))
-
-    # Scatter plot
-    scatter = ax.scatter(
-        x=df[col],
-        y=df[target_var],
-        c=df[col],
-        cmap='Spectral',
-        alpha=0.7,
-        edgecolor='k'
-    )
-
-    # Regression line
-    sns.regplot(
-        data=df,
-        x=col,
-        y=target_var,
-        scatter=False,
-        line_kws={'color': 'black'},
-        ax=ax
-    )
-
-    # Colorbar
-    cbar = fig.colorbar(scatter, ax=ax)
-    cbar.set_label(f"{col}", fontsize=9)
-
-    # Title and labels
-    ax.set_title(
-        f"{variable_names.get(col, col)} vs {target_var}", fontsize=20
-    )
-    ax.set_xlabel(variable_names.get(col, col), fontsize=9)
-    ax.set_ylabel(variable_names.get(target_var, target_var), fontsize=9)
-    ax.grid(True, linestyle='--', alpha=0.6)
-
-    st.pyplot(fig)
-
-
-# Function to create a boxplot for categorical variables
-def plot_box(df, col, target_var):
-    num_categories = len(df[col].unique())
-    palette = sns.color_palette("Spectral", n_colors=num_categories)
-
-    fig, ax = plt.subplots(figsize=(8, 4))
-    sns.boxplot(
-        data=df,
-        x=col,
-        y=target_var,
-        palette=palette,
-        ax=ax
-    )
-
-    # Title and labels
-    ax.set_title(
-        f"{variable_names.get(col, col)} vs {target_var}", fontsize=20
-    )
-    ax.set_xlabel(variable_names.get(col, col), fontsize=9)
-    ax.set_ylabel(variable_names.get(target_var, target_var), fontsize=9)
-
-    st.pyplot(fig)
-
-
-# Function to create a line plot for time variables
-def plot_line(df, col, target_var):
-    fig, ax = plt.subplots(figsize=(8, 4))
-    sns.lineplot(
-        data=df,
-        x=col,
-        y=target_var,
-        color=sns.color_palette("Spectral")[1],
-        ax=ax
-    )
-
-    # Title and labels
-    ax.set_title(
-        f"{variable_names.get(col, col)} vs {target_var}", fontsize=20
-    )
-    ax.set_xlabel(variable_names.get(col, col), fontsize=9)
-    ax.set_ylabel(variable_names.get(target_var, target_var), fontsize=9)
-
-    st.pyplot(fig)
+        if result["exact"]:
+            st.caption(f"Exact values from all {result['rows']:,} rows.")
+        else:
+            st.caption(
+                f"Approximate values from a sample of {result['rows']:,} "
+                f"rows stratified by {STRATA_COLUMN}, with the half-width "
+                f"of their 95% bootstrap interval. Refining..."
+            )
+    if polling and progressive.finished:
+        st.rerun()
 
 
 # Main analysis function
@@ -256,41 +141,55 @@ def analysis():
     Main function to display the correlation analysis page.
     """
     # Define target variable
-    target_var = 'SalePrice'
-
-    # Load raw house pricing data
-    df = load_pricing_data()
-
-    # Check if data is loaded successfully
-    if df is None:
-        st.error("Failed to load the dataset. Please check the file path.")
-        return
-
-    # Process categorical and numerical variables
-    categorical_vars = df.select_dtypes(include='object').columns
-    numerical_vars = df.select_dtypes(include=['int64', 'float64']).columns
-
-    df[categorical_vars] = df[categorical_vars].fillna("Missing")
-    for col in numerical_vars:
-        df[col] = df[col].fillna(df[col].median())
-
-    # One-hot encoding
-    encoder = OneHotEncoder(
-        variables=categorical_vars.to_list(), drop_last=False
-    )
-    df_ohe = encoder.fit_transform(df)
+    target_var = TARGET_VAR
 
     # Select variables for analysis
-    vars_to_study = [
-        '1stFlrSF', 'GarageArea', 'GarageYrBlt', 'GrLivArea',
-        'KitchenQual_Ex', 'KitchenQual_Gd', 'KitchenQual_TA',
-        'MasVnrArea', 'OverallQual', 'TotalBsmtSF', 'YearBuilt', 'YearRemodAdd'
-    ]
-
-    df_eda = df_ohe.filter(vars_to_study + [target_var])
+    vars_to_study = EDA_VARIABLES
+
+    # Streaming mode reads the records one Parquet row group at a time
+    # and works from statistics gathered in that single pass. Sampled
+    # mode shows heatmaps of a stratified sample, refined in the
+    # background up to the exact values
+    mode = st.radio(
+        "**Analysis mode**",
+        ["In memory", "Streaming", "Sampled"],
+        horizontal=True,
+        help="Streaming mode computes the analysis out of core, for "
+             "datasets that don't fit in memory. Sampled mode shows "
+             "approximate heatmaps at once, with error bounds, and "
+             "refines them in the background.",
+    )
+    streaming = mode == "Streaming"
+    sampled = mode == "Sampled"
+
+    if streaming:
+        summary = load_streaming_summary(streaming_source())
+        analysed_columns = summary.columns
+    else:
+        # Load raw house pricing data
+        df = load_pricing_data()
+
+        # Check if data is loaded successfully
+        if df is None:
+            st.error(
+                "Failed to load the dataset. Please check the file path.")
+            return
+
+        # Imputed and one-hot encoded variables, built once per dataset
+        # version
+        data_version = pricing_data_version()
+        df_eda = load_eda_frame(
+            df, vars_to_study, target_var, version=data_version)
+        analysed_columns = df_eda.columns
+
+    if sampled:
+        progressive = get_progressive_analysis(df_eda, version=data_version)
+        # Heatmaps check for refined results until the exact ones are in
+        refresh = None if progressive.finished else REFRESH_SECONDS
 
     # Check for missing variables
-    missing_vars = [var for var in vars_to_study if var not in df_eda.columns]
+    missing_vars = [
+        var for var in vars_to_study if var not in analysed_columns]
     if missing_vars:
         st.error(
             f"The following variables are missing from the dataset: "
@@ -301,10 +200,15 @@ def analysis():
     # Optional: Inspect raw dataset
     if st.checkbox("**Would you like to inspect the raw dataset?** 🔍"):
         st.write("##### Inspection of house prices raw data")
+        if streaming:
+            num_rows, num_columns = summary.num_rows, summary.num_columns
+            head = summary.head
+        else:
+            (num_rows, num_columns), head = df.shape, df.head(10)
         st.write(
-            f"The dataset has {df.shape[0]} rows and {df.shape[1]} columns."
+            f"The dataset has {num_rows} rows and {num_columns} columns."
         )
-        st.write(df.head(10))
+        st.write(head)
 
     # Horizontal line
     st.divider()
@@ -419,29 +323,71 @@ def analysis():
                  "one of our predefined heat maps."
                  )
         if st.checkbox("Display Pearson Correlation Heatmap"):
-            pearson_corr = df_eda.corr(method="pearson")
-            correlation_heatmap(
-                pearson_corr,
-                threshold=0.5,
-                title="Pearson Correlation Heatmap"
-            )
+            if sampled:
+                st.fragment(sampled_heatmap, run_every=refresh)(
+                    progressive, "pearson", "Pearson Correlation Heatmap",
+                    0.5, polling=refresh is not None)
+            else:
+                if streaming:
+                    pearson_corr = summary.corr(method="pearson")
+                else:
+                    pearson_corr = correlation_matrix(
+                        df_eda, method="pearson")
+                display_chart(
+                    "correlation_heatmap",
+                    pearson_corr,
+                    threshold=0.5,
+                    title="Pearson Correlation Heatmap"
+                )
 
         if st.checkbox("Display Spearman Correlation Heatmap"):
-            spearman_corr = df_eda.corr(method="spearman")
-            correlation_heatmap(
-                spearman_corr,
-                threshold=0.5,
-                title="Spearman Correlation Heatmap"
-            )
+            if sampled:
+                st.fragment(sampled_heatmap, run_every=refresh)(
+                    progressive, "spearman", "Spearman Correlation Heatmap",
+                    0.5, polling=refresh is not None)
+            else:
+                if streaming:
+                    spearman_corr = summary.corr(method="spearman")
+                else:
+                    spearman_corr = correlation_matrix(
+                        df_eda, method="spearman")
+                display_chart(
+                    "correlation_heatmap",
+                    spearman_corr,
+                    threshold=0.5,
+                    title="Spearman Correlation Heatmap"
+                )
+                if streaming:
+                    st.caption(
+                        f"Approximate values: whole-number variables "
+                        f"spanning fewer than {RANK_BINS} values are ranked "
+                        f"exactly, the others by {RANK_BINS} equal-width "
+                        f"bins, where values sharing a bin share a rank. "
+                        f"Their error depends on how the values spread "
+                        f"over the bins; it is about 0.002 on the house "
+                        f"price data, and larger for data bunched in a "
+                        f"few bins."
+                    )
 
         if st.checkbox("Display PPS Matrix Heatmap"):
-            df_eda_pps = df_eda.select_dtypes(include=[np.number])
-            df_eda_pps = df_eda_pps.fillna(0)
-            pps_matrix_raw = pps.matrix(df_eda_pps)
-            pps_matrix = pps_matrix_raw.pivot(
-                index='y', columns='x', values='ppscore'
-            )
-            pps_heatmap(pps_matrix, threshold=0.2, title="PPS Heatmap")
+            if sampled:
+                st.fragment(sampled_heatmap, run_every=refresh)(
+                    progressive, "pps", "PPS Heatmap", 0.2,
+                    polling=refresh is not None)
+            elif streaming:
+                st.info("The PPS heatmap fits models on the rows, so it "
+                        "is only available in memory.")
+            else:
+                df_eda_pps = df_eda.select_dtypes(include=[np.number])
+                df_eda_pps = df_eda_pps.fillna(0)
+                pps_matrix_raw = pps_matrix(df_eda_pps)
+                pps_pivot = pps_matrix_raw.pivot(
+                    index='y', columns='x', values='ppscore'
+                )
+                display_chart(
+                    "pps_heatmap", pps_pivot, threshold=0.2,
+                    title="PPS Heatmap"
+                )
 
     # Tab 2: Custom heatmap
     with tab2:
@@ -451,9 +397,19 @@ def analysis():
             options=vars_to_study,
             default=vars_to_study[:3]  # Preselect the first 3 variables
         )
-        if selected_vars:
-            custom_corr = df_eda[selected_vars].corr()
-            correlation_heatmap(
+        if selected_vars and sampled:
+            st.fragment(sampled_heatmap, run_every=refresh)(
+                progressive, "pearson", "Custom Correlation Heatmap", 0.0,
+                columns=selected_vars, polling=refresh is not None)
+        elif selected_vars:
+            # Slice of the precomputed statistics, no pass over the rows
+            if streaming:
+                custom_corr = summary.corr(selected_vars)
+            else:
+                custom_corr = get_correlation_index(
+                    df_eda, version=data_version).corr(selected_vars)
+            display_chart(
+                "correlation_heatmap",
                 custom_corr,
                 threshold=0.0,
                 title="Custom Correlation Heatmap"
@@ -471,15 +427,15 @@ def analysis():
     # Section: 6.2 Visualization of Target Variable Distribution
     st.header("🎯Target Variable Distribution")
     if st.checkbox("Display Distribution of Target Variable"):
-        fig, ax = plt.subplots(figsize=(10, 5))
-        sns.histplot(
-            df[target_var],
-            kde=True,
-            color=sns.color_palette("Spectral")[0],
-            ax=ax
-        )
-        ax.set_title(f"Distribution of {target_var}", fontsize=18)
-        st.pyplot(fig)
+        if streaming:
+            show_image(cached_image(
+                summary.chart_key("target_histogram"),
+                lambda: target_figure(summary)))
+        else:
+            display_chart(
+                "target_histogram", df_eda[[target_var]],
+                target_var=target_var
+            )
 
     # Horizontal line
     st.divider()
@@ -487,13 +443,25 @@ def analysis():
     # Bivariate Analysis
     st.header("📊Bivariate Analysis")
     if st.checkbox("Display all visualizations for key variables"):
-        for col in vars_to_study:
-            if len(df_eda[col].unique()) <= 10:
-                plot_box(df_eda, col, target_var)
-            elif col in time_vars:
-                plot_line(df_eda, col, target_var)
-            else:
-                plot_lm(df_eda, col, target_var)
+        if streaming:
+            # Charts drawn from the summary take the same time at any size
+            for col in vars_to_study:
+                show_image(cached_image(
+                    summary.chart_key("bivariate", col=col),
+                    lambda: bivariate_figure(summary, col)))
+        else:
+            # Draw the charts in parallel, each one shows up once it's
+            # ready
+            placeholders = [st.empty() for _ in vars_to_study]
+            charts = [
+                (bivariate_chart(df_eda, col), df_eda[[col, target_var]],
+                 {'col': col, 'target_var': target_var})
+                for col in vars_to_study
+            ]
+            for position, image in render_gallery(charts):
+                if image is not None:
+                    placeholders[position].image(
+                        image, use_container_width=True)
 
 
 # Run function with page content
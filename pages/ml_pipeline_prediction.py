@@ -1,9 +1,10 @@
+import os
 import streamlit as st
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from src.data_management import load_pkl_file
-from src.machine_learning.evaluate_reg import regression_performance
+from src.machine_learning.model_registry import get_model_registry
+from src.machine_learning.evaluate_reg import (
+    regression_performance,
+    segment_performance
+)
 from utils import create_toc
 
 
@@ -22,6 +23,8 @@ from utils import create_toc
 #     - Mean Squared Error (MSE)
 #     - Root Mean Squared Error (RMSE)
 #     - R² Score
+#   with their 95% bootstrap confidence intervals
+# - Test set metrics by OverallQual and KitchenQual
 # - Regression Evaluation Plots for train and test set
 
 # Define page configuration
@@ -73,47 +76,24 @@ st.divider()
 
 
 def ml_pipeline_prediction_body():
-    # Load regression pipeline
-    version = 'v1'
-    model_path = (
-        f"outputs/ml_pipeline/predict_price/{version}/"
-        f"regression_pipeline.pkl"
-    )
-    price_pipe = load_pkl_file(model_path)
+    # Load the latest regression pipeline, shared by all sessions
+    registry = get_model_registry()
+    version = registry.latest_version()
+    price_pipe = registry.get(version, engine="sklearn") if version else None
 
-    if price_pipe is None:
+    manifest = registry.manifest(version) if version else None
+
+    if price_pipe is None or manifest is None:
         st.error(
-            f"Failed to load model from {model_path}. Please check the file."
+            f"Failed to load model from {registry.model_dir}. "
+            "Please check the file."
         )
         return
 
-    # Load training and test data
-    try:
-        X_train = pd.read_parquet(
-            f"outputs/ml_pipeline/predict_price/{version}/X_train.parquet"
-        )
-        X_test = pd.read_parquet(
-            f"outputs/ml_pipeline/predict_price/{version}/X_test.parquet"
-        )
-        y_train = pd.read_parquet(
-            f"outputs/ml_pipeline/predict_price/{version}/y_train.parquet"
-        )
-        y_test = pd.read_parquet(
-            f"outputs/ml_pipeline/predict_price/{version}/y_test.parquet"
-        )
-
-        # Synchronize columns between X_train and X_test
-        missing_cols = set(X_train.columns) - set(X_test.columns)
-        for col in missing_cols:
-            X_test[col] = 0
-
-        extra_cols = set(X_test.columns) - set(X_train.columns)
-        X_test = X_test.drop(columns=extra_cols)
-
-        X_test = X_test[X_train.columns]
-
-    except FileNotFoundError as e:
-        st.error(f"Failed to load data: {e}")
+    # Predictions and metrics, computed once per model version
+    evaluation = registry.evaluation(version)
+    if evaluation is None:
+        st.error(f"Failed to evaluate model version {version}.")
         return
 
     # Show ML pipeline
@@ -129,7 +109,7 @@ def ml_pipeline_prediction_body():
     # Display feature importance
     st.header("🌟Feature Importance")
     st.write("Best features in best model:")
-    st.write(X_train.columns.tolist())
+    st.write(manifest.features)
     st.write("The plot shows the importance of each feature in the model.")
 
     feature_importance_path = (
@@ -137,15 +117,18 @@ def ml_pipeline_prediction_body():
         f"feature_importance.png"
     )
 
-    try:
-        feature_importance_img = plt.imread(feature_importance_path)
+    if os.path.isfile(feature_importance_path):
+        # Pass the file itself, not a decoded pixel array
         st.image(
-            feature_importance_img,
+            feature_importance_path,
             caption="Feature Importance",
             use_container_width=True
         )
-    except FileNotFoundError as e:
-        st.error(f"Failed to load feature importance image: {e}")
+    else:
+        st.error(
+            "Failed to load feature importance image: "
+            f"{feature_importance_path} not found"
+        )
 
     # Horizontal line
     st.divider()
@@ -157,72 +140,19 @@ def ml_pipeline_prediction_body():
         "training and test datasets."
     )
 
-    regression_performance(
-        X_train=X_train, y_train=y_train,
-        X_test=X_test, y_test=y_test,
-        pipeline=price_pipe
-    )
+    regression_performance(evaluation)
+
+    # Test set metrics per segment of the houses
+    for column in evaluation.segments["test"]:
+        st.write(f"Test set performance by `{column}`:")
+        segment_performance(evaluation.segment_metrics("test", column))
 
     # Regression Evaluation Plots
     st.subheader("Regression Evaluation Plots")
     st.write("Compare actual values and predictions for both training "
              "and test datasets."
              )
-    regression_evaluation_plots(X_train, y_train, X_test, y_test, price_pipe)
-
-
-def regression_evaluation_plots(
-    X_train, y_train, X_test, y_test, pipeline, alpha_scatter=0.5
-):
-    """
-    Create scatterplots to compare actual values and predictions
-    for both training and test datasets, with multiple colors from the
-    Spectral palette.
-
-    Args:
-        X_train (pd.DataFrame): Training features
-        y_train (pd.DataFrame): Training target
-        X_test (pd.DataFrame): Test features
-        y_test (pd.DataFrame): Test target
-        pipeline: Trained ML pipeline
-        alpha_scatter (float): Transparency for scatter points
-    """
-    # Convert y_train and y_test to 1D array if they are DataFrames
-    if isinstance(y_train, pd.DataFrame):
-        y_train = y_train.values.ravel()
-    if isinstance(y_test, pd.DataFrame):
-        y_test = y_test.values.ravel()
-
-    # Predictions for Train and Test data
-    pred_train = pipeline.predict(X_train)
-    pred_test = pipeline.predict(X_test)
-
-    # Create subplots
-    fig, axes = plt.subplots(nrows=1, ncols=2, figsize=(12, 5))
-
-    # Scatterplot for Train data
-    sns.scatterplot(
-        x=y_train, y=pred_train, alpha=alpha_scatter, ax=axes[0],
-        hue=pred_train, palette="Spectral", legend=False
-    )
-    sns.lineplot(x=y_train, y=y_train, color='black', ax=axes[0])
-    axes[0].set_xlabel("Actual")
-    axes[0].set_ylabel("Predictions")
-    axes[0].set_title("Train Set", fontsize=20)
-
-    # Scatterplot for Test data
-    sns.scatterplot(
-        x=y_test, y=pred_test, alpha=alpha_scatter, ax=axes[1],
-        hue=pred_test, palette="Spectral", legend=False
-    )
-    sns.lineplot(x=y_test, y=y_test, color='black', ax=axes[1])
-    axes[1].set_xlabel("Actual")
-    axes[1].set_ylabel("Predictions")
-    axes[1].set_title("Test Set", fontsize=20)
-
-    # Adjust layout
-    plt.tight_layout()
-    st.pyplot(fig)
+    st.image(evaluation.plot, use_container_width=True)
 
 
 # Run the ML pipeline prediction body function
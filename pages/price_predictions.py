@@ -5,8 +5,13 @@ from plotly.colors import qualitative
 
 from src.data_management import (
     load_inherited_data,
-    load_pricing_data,
-    load_pkl_file
+    load_pricing_data
+)
+from src.machine_learning.model_registry import get_model_registry
+from src.machine_learning.price_surface import (
+    AREA_STEP,
+    area_input_range,
+    get_price_surface
 )
 from src.machine_learning.predictive_analysis import (
     predict_house_price,
@@ -89,9 +94,6 @@ def draw_input_widgets(house_features):
         st.error("Could not load data to create input widgets.")
         return pd.DataFrame()
 
-    # Define range for scaling input values
-    percentage_min, percentage_max = 0.4, 2.0
-
     # Initialize an empty DataFrame to store user's input
     X_live = pd.DataFrame([], index=[0])
 
@@ -116,42 +118,31 @@ def draw_input_widgets(house_features):
 
     with col1:
         if 'GarageArea' in house_features:
-            min_garage = 0
-            max_garage = 2000
-            default_garage = 500
-
-            if 'GarageArea' in df.columns:
-                min_garage = int(df['GarageArea'].min() * percentage_min)
-                max_garage = int(df['GarageArea'].max() * percentage_max)
-                default_garage = int(df['GarageArea'].median())
+            # Range scaled from the dataset, shared with the price surface
+            min_garage, max_garage, default_garage = area_input_range(
+                df, 'GarageArea')
 
             garage_area = st.number_input(
                 label=feature_display_names.get('GarageArea', 'GarageArea'),
                 min_value=min_garage,
                 max_value=max_garage,
                 value=default_garage,
-                step=50,
+                step=AREA_STEP,
                 key='GarageArea'
             )
             X_live['GarageArea'] = garage_area
 
     with col2:
         if 'GrLivArea' in house_features:
-            min_area = 500
-            max_area = 5000
-            default_area = 1500
-
-            if 'GrLivArea' in df.columns:
-                min_area = int(df['GrLivArea'].min() * percentage_min)
-                max_area = int(df['GrLivArea'].max() * percentage_max)
-                default_area = int(df['GrLivArea'].median())
+            min_area, max_area, default_area = area_input_range(
+                df, 'GrLivArea')
 
             gr_liv_area = st.number_input(
                 label=feature_display_names.get('GrLivArea', 'GrLivArea'),
                 min_value=min_area,
                 max_value=max_area,
                 value=default_area,
-                step=50,
+                step=AREA_STEP,
                 key='GrLivArea'
             )
             X_live['GrLivArea'] = gr_liv_area
@@ -215,18 +206,20 @@ def predict_price_body():
     - Predicting the sale price of inherited houses
     - Widget to predict house sale price based on user input
     """
-    # Load the saved pipeline
-    version = "v1"
-    pipeline_path = (
-        f"outputs/ml_pipeline/predict_price/{version}/"
-        f"regression_pipeline.pkl"
-    )
-    regression_pipeline = load_pkl_file(pipeline_path)
-
-    train_data_path = (
-        f"outputs/ml_pipeline/predict_price/{version}/X_train.parquet"
-    )
-    house_features = pd.read_parquet(train_data_path).columns.tolist()
+    # Load the latest saved pipeline, shared by all sessions
+    registry = get_model_registry()
+    version = registry.latest_version()
+    if version is None:
+        st.error("No trained model is available.")
+        return
+    regression_pipeline = registry.get(version)
+
+    # Features the model expects, from the manifest saved with it
+    manifest = registry.manifest(version)
+    if manifest is None:
+        st.error(f"Model version {version} has no readable manifest.")
+        return
+    house_features = manifest.features
 
     # Prediction for inherited houses
     st.header("Predict the sale price of inherited houses")
@@ -376,11 +369,24 @@ def predict_price_body():
     # Create a placeholder for the prediction result
     prediction_placeholder = st.empty()
 
+    # Precomputed prices for every widget input, None until it is built
+    price_surface = get_price_surface(
+        registry.version_dir(version),
+        registry.get(version, engine="sklearn"),
+        load_pricing_data()
+    )
+
     # Make prediction for user's house
     if st.button("Predict Sale Price", type="primary"):
-        price_prediction = predict_house_price(
-            X_live, house_features, regression_pipeline
-        )
+        # Look the price up on the surface, inputs typed off the grid
+        # fall back to live inference
+        price_prediction = None
+        if price_surface is not None:
+            price_prediction = price_surface.lookup(X_live)
+        if price_prediction is None:
+            price_prediction = predict_house_price(
+                X_live, house_features, regression_pipeline
+            )
         if price_prediction is not None:
             with prediction_placeholder.container():
                 st.write(
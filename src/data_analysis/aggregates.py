@@ -0,0 +1,329 @@
+import numpy as np
+from matplotlib.colors import LogNorm, to_rgba
+from scipy import stats
+from src.data_analysis.regression_band import ols_statistics
+
+# Charts are drawn from aggregates by default from this many rows
+AGGREGATE_MIN_ROWS = 100_000
+
+# Outliers drawn per box at most, evenly spread over the sorted outliers
+MAX_FLIERS = 500
+
+# Points of the grid the KDE is evaluated on
+KDE_GRID_SIZE = 2048
+
+# Bins per axis of the 2-D density drawn instead of a scatterplot
+DENSITY_BINS = 150
+
+
+def _as_float(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def box_statistics(x, y, max_fliers=MAX_FLIERS):
+    """
+    Compute the box plot statistics of `y` for each value of `x`.
+
+    Matches `matplotlib.cbook.boxplot_stats`, which seaborn's boxplot
+    uses: linear-interpolated quartiles and whiskers at the furthest
+    values within 1.5 IQR of the box. All groups come from one sort.
+
+    Args:
+        x (array-like): Group of each row
+        y (array-like): Values
+        max_fliers (int): Outliers kept per group
+
+    Returns:
+        list: One dict per group, in ascending group order, with the keys
+              `Axes.bxp` expects ("label", "med", "q1", "q3", "whislo",
+              "whishi", "fliers") and the group size "n"
+    """
+    x, y = _as_float(x), _as_float(y)
+    present = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[present], y[present]
+    order = np.lexsort((y, x))
+    x, y = x[order], y[order]
+    labels, starts, counts = np.unique(
+        x, return_index=True, return_counts=True)
+
+    # Quartiles of every group at once, from positions in the sorted rows
+    positions = starts[:, np.newaxis] + (
+        (counts[:, np.newaxis] - 1) * np.array([0.25, 0.5, 0.75]))
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, (starts + counts - 1)[:, np.newaxis])
+    fraction = positions - lower
+    quartiles = y[lower] + (y[upper] - y[lower]) * fraction
+
+    groups = []
+    for label, start, count, (q1, med, q3) in zip(
+            labels, starts, counts, quartiles):
+        values = y[start:start + count]
+        iqr = q3 - q1
+        low = values[np.searchsorted(values, q1 - 1.5 * iqr, side="left")]
+        high = values[
+            np.searchsorted(values, q3 + 1.5 * iqr, side="right") - 1]
+        whislo = low if low <= q1 else q1
+        whishi = high if high >= q3 else q3
+        fliers = np.concatenate([
+            values[:np.searchsorted(values, whislo, side="left")],
+            values[np.searchsorted(values, whishi, side="right"):],
+        ])
+        if len(fliers) > max_fliers:
+            fliers = fliers[np.linspace(
+                0, len(fliers) - 1, max_fliers).round().astype(np.intp)]
+        groups.append({
+            "label": label, "n": int(count), "med": med, "q1": q1, "q3": q3,
+            "whislo": whislo, "whishi": whishi, "fliers": fliers,
+        })
+    return groups
+
+
+def draw_boxes(ax, groups, palette):
+    """
+    Draw box plots from `box_statistics`, styled like seaborn's boxplot.
+
+    Args:
+        ax (Axes): Axes to draw on
+        groups (list): Output of `box_statistics`
+        palette (list): One color per group
+    """
+    artists = ax.bxp(
+        groups, positions=np.arange(len(groups)), widths=0.8,
+        patch_artist=True, manage_ticks=False,
+        medianprops={"color": ".26"}, whiskerprops={"color": ".26"},
+        capprops={"color": ".26"},
+        flierprops={"marker": "d", "markerfacecolor": ".26",
+                    "markeredgecolor": ".26", "markersize": 4},
+    )
+    for box, color in zip(artists["boxes"], palette):
+        box.set_facecolor(color)
+        box.set_edgecolor(".26")
+    ax.set_xticks(np.arange(len(groups)))
+    ax.set_xticklabels([_format_label(group["label"]) for group in groups])
+    ax.set_xlim(-0.5, len(groups) - 0.5)
+
+
+def _format_label(value):
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def group_mean_statistics(x, y):
+    """
+    Compute the count, sum and sum of squares of `y` for each `x`.
+
+    Args:
+        x (array-like): Group of each row, e.g. a year
+        y (array-like): Values
+
+    Returns:
+        dict: Sorted group values "x" and, per group, "count", "sum" and
+              "sum_sq" of `y`; sums of several parts can be added up
+    """
+    x, y = _as_float(x), _as_float(y)
+    present = ~(np.isnan(x) | np.isnan(y))
+    groups, inverse = np.unique(x[present], return_inverse=True)
+    y = y[present]
+    return {
+        "x": groups,
+        "count": np.bincount(inverse, minlength=len(groups)),
+        "sum": np.bincount(inverse, weights=y, minlength=len(groups)),
+        "sum_sq": np.bincount(
+            inverse, weights=y * y, minlength=len(groups)),
+    }
+
+
+def group_mean_band(statistics, ci=95):
+    """
+    Return the mean of each group and its t-based confidence interval.
+
+    Args:
+        statistics (dict): Output of `group_mean_statistics`
+        ci (float): Confidence level in percent
+
+    Returns:
+        tuple: Group values, means, and lower and upper bounds; groups of
+               a single row have no bounds (NaN)
+    """
+    count = statistics["count"].astype(np.float64)
+    mean = statistics["sum"] / count
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = np.maximum(
+            statistics["sum_sq"] - count * mean ** 2, 0.0) / (count - 1)
+        half_width = (
+            stats.t.ppf(0.5 + ci / 200, count - 1)
+            * np.sqrt(variance / count)
+        )
+    half_width[count < 2] = np.nan
+    return statistics["x"], mean, mean - half_width, mean + half_width
+
+
+def draw_group_means(ax, statistics, color):
+    """
+    Draw group means and their band, like seaborn's lineplot.
+
+    Args:
+        ax (Axes): Axes to draw on
+        statistics (dict): Output of `group_mean_statistics`
+        color: Color of the line and band
+    """
+    x, mean, lower, upper = group_mean_band(statistics)
+    ax.plot(x, mean, color=color)
+    ax.fill_between(x, lower, upper, color=color, alpha=.2, linewidth=0)
+
+
+def histogram_statistics(values, bins="auto", grid_size=KDE_GRID_SIZE,
+                         value_range=None):
+    """
+    Bin values for a histogram and for a KDE, in one vectorized pass.
+
+    Args:
+        values (array-like): Values to bin
+        bins (int or str or array): Histogram bins, as for
+                                    `np.histogram_bin_edges`
+        grid_size (int): Points of the KDE grid
+        value_range (tuple): Range of the KDE grid, the data range if None
+
+    Returns:
+        dict: Histogram "edges" and "counts", KDE "grid" and
+              linearly binned "grid_counts", and the "n", "sum" and
+              "sum_sq" of the values
+    """
+    values = _as_float(values)
+    values = values[~np.isnan(values)]
+    edges = np.histogram_bin_edges(values, bins)
+    counts, _ = np.histogram(values, edges)
+
+    low, high = value_range or (values.min(), values.max())
+    grid = np.linspace(low, high, grid_size)
+    return {
+        "edges": edges,
+        "counts": counts,
+        "grid": grid,
+        "grid_counts": _linear_binning(values, grid),
+        "n": len(values),
+        "sum": values.sum(),
+        "sum_sq": np.dot(values, values),
+    }
+
+
+def _linear_binning(values, grid):
+    """
+    Spread each value over its two nearest grid points.
+    """
+    step = grid[1] - grid[0] if len(grid) > 1 else 1.0
+    position = np.clip((values - grid[0]) / step, 0, len(grid) - 1)
+    index = np.minimum(np.floor(position).astype(np.intp), len(grid) - 2)
+    weight = position - index
+    return (
+        np.bincount(index, weights=1 - weight, minlength=len(grid))
+        + np.bincount(index + 1, weights=weight, minlength=len(grid))
+    )
+
+
+def fft_kde(statistics):
+    """
+    Estimate the density on the KDE grid by FFT convolution.
+
+    Uses a Gaussian kernel with Scott's bandwidth, like seaborn's
+    `scipy.stats.gaussian_kde`, convolved with the binned counts.
+
+    Args:
+        statistics (dict): Output of `histogram_statistics`
+
+    Returns:
+        np.ndarray: Density at each grid point, None if the values have
+                    no spread
+    """
+    n = statistics["n"]
+    grid = statistics["grid"]
+    if n < 2 or grid[-1] == grid[0]:
+        return None
+    mean = statistics["sum"] / n
+    variance = max(statistics["sum_sq"] - n * mean ** 2, 0.0) / (n - 1)
+    bandwidth = np.sqrt(variance) * n ** (-1 / 5)
+    if bandwidth == 0:
+        return None
+
+    step = grid[1] - grid[0]
+    reach = min(int(np.ceil(4 * bandwidth / step)), len(grid) - 1)
+    offsets = np.arange(-reach, reach + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+
+    size = len(grid) + len(kernel) - 1
+    convolved = np.fft.irfft(
+        np.fft.rfft(statistics["grid_counts"], size)
+        * np.fft.rfft(kernel, size), size)
+    density = convolved[reach:reach + len(grid)]
+    return np.maximum(density, 0) / (n * bandwidth * np.sqrt(2 * np.pi))
+
+
+def draw_histogram(ax, statistics, color, kde=True):
+    """
+    Draw a count histogram with its KDE, like seaborn's histplot.
+
+    Args:
+        ax (Axes): Axes to draw on
+        statistics (dict): Output of `histogram_statistics`
+        color: Color of the bars and curve
+        kde (bool): Draw the KDE curve
+    """
+    edges, counts = statistics["edges"], statistics["counts"]
+    widths = np.diff(edges)
+    ax.bar(edges[:-1], counts, widths, align="edge",
+           facecolor=to_rgba(color, .5 if kde else .75))
+    density = fft_kde(statistics) if kde else None
+    if density is not None:
+        # Scale the curve to the histogram area, like seaborn
+        ax.plot(statistics["grid"], density * (counts * widths).sum(),
+                color=color)
+    ax.set_ylabel("Count")
+
+
+def density_statistics(x, y, bins=DENSITY_BINS, x_range=None,
+                       y_range=None):
+    """
+    Count rows in a 2-D grid and collect the regression statistics.
+
+    Args:
+        x (array-like): Values on the x axis
+        y (array-like): Values on the y axis
+        bins (int): Bins per axis
+        x_range (tuple): Range of the x bins, the data range if None
+        y_range (tuple): Range of the y bins, the data range if None
+
+    Returns:
+        dict: Bin edges "x_edges" and "y_edges", "counts" indexed by
+              (x bin, y bin), and the "ols" statistics of the rows
+    """
+    x, y = _as_float(x), _as_float(y)
+    present = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[present], y[present]
+    x_range = x_range or (x.min(), x.max())
+    y_range = y_range or (y.min(), y.max())
+    counts, x_edges, y_edges = np.histogram2d(
+        x, y, bins=bins, range=[x_range, y_range])
+    return {
+        "x_edges": x_edges,
+        "y_edges": y_edges,
+        "counts": counts,
+        "ols": ols_statistics(x, y),
+    }
+
+
+def draw_density(ax, statistics, cmap="Spectral_r"):
+    """
+    Draw the 2-D density of `density_statistics` on a log color scale.
+
+    Args:
+        ax (Axes): Axes to draw on
+        statistics (dict): Output of `density_statistics`
+        cmap (str): Colormap of the counts
+
+    Returns:
+        QuadMesh: The drawn mesh, for a colorbar
+    """
+    counts = np.ma.masked_equal(statistics["counts"].T, 0)
+    return ax.pcolormesh(
+        statistics["x_edges"], statistics["y_edges"], counts,
+        cmap=cmap, norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)),
+    )
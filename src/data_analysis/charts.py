@@ -0,0 +1,432 @@
+import numpy as np
+import seaborn as sns
+from matplotlib.figure import Figure
+from src.data_analysis.aggregates import (
+    AGGREGATE_MIN_ROWS,
+    box_statistics,
+    density_statistics,
+    draw_boxes,
+    draw_density,
+    draw_group_means,
+    draw_histogram,
+    group_mean_statistics,
+    histogram_statistics
+)
+from src.data_analysis.regression_band import (
+    FAST_REGRESSION_MIN_ROWS,
+    draw_regression_line
+)
+
+# Chart builders of the correlation analysis page. Each one returns a
+# matplotlib Figure that isn't registered with pyplot, so it is freed as
+# soon as it has been encoded, or None when there is nothing to draw.
+# From AGGREGATE_MIN_ROWS rows, the row-level charts are drawn from
+# aggregates computed with NumPy, so their cost stops growing with rows.
+
+# Code copied from Notebook 3
+# Section: 6.3 Bivariate Analysis of Key Variables and SalePrice
+# Dictionary for variable names
+VARIABLE_NAMES = {
+    'YearBuilt': 'Year Built',
+    'YearRemodAdd': 'Year Remodeled/Added',
+    'GrLivArea': 'Above Ground Living Area (sq ft)',
+    'GarageArea': 'Garage Area (sq ft)',
+    'OverallQual': 'Overall Quality (1-10 scale)',
+    'SalePrice': 'Sale Price (USD)',
+    '1stFlrSF': '1st Floor Area (sq ft)',
+    'KitchenQual_Gd': 'Kitchen Quality - Good',
+    'KitchenQual_Ex': 'Kitchen Quality - Excellent',
+    'KitchenQual_TA': 'Kitchen Quality - Typical/Average',
+    'TotalBsmtSF': 'Total Basement Area (sq ft)',
+    'MasVnrArea': 'Masonry Veneer Area (sq ft)',
+    'GarageYrBlt': 'Garage Year Built',
+}
+
+# Time variables
+TIME_VARS = ['YearBuilt', 'YearRemodAdd']
+
+
+def _annotations(formatted_data, errors):
+    """
+    Annotate each cell with its value and, when it is uncertain, the
+    error bound of the value.
+
+    Args:
+        formatted_data (pd.DataFrame): Rounded values shown in the cells
+        errors (pd.DataFrame): Error bound of each value, or None
+
+    Returns:
+        bool or np.ndarray: True to let seaborn write the values, or the
+                            text of each cell
+    """
+    if errors is None:
+        return True
+    errors = errors.reindex(
+        index=formatted_data.index, columns=formatted_data.columns)
+    return np.vectorize(
+        lambda value, error: f"{value:.2g}\n±{error:.2f}"
+        if error >= 0.005 else f"{value:.2g}"
+    )(formatted_data.to_numpy(), errors.fillna(0).to_numpy())
+
+
+def correlation_heatmap(df, threshold=0.5, figsize=(12, 8),
+                        font_size=8, title="Correlation Heatmap",
+                        errors=None):
+    """
+    Generate a heatmap to visualize strong correlations between variables.
+    Code copied from Notebook 3:
+    Section: 5.2 Calculate and Visualize Relationships in Dataset
+
+    `errors` holds an error bound per correlation, written under the
+    values of approximate heatmaps.
+    """
+    if df.shape[1] <= 1:  # Check for enough columns
+        return None
+
+    # Filter rows and columns with values below the threshold
+    filtered_data = df.loc[(abs(df) >= threshold).any(axis=1),
+                           (abs(df) >= threshold).any(axis=0)]
+
+    # Create a mask to hide the upper triangle
+    # and values below the threshold
+    mask = np.zeros_like(filtered_data, dtype=bool)
+    mask[np.triu_indices_from(mask)] = True
+    mask[(abs(filtered_data) <= 0.2)] = True
+
+    # Format data for better readability
+    formatted_data = filtered_data.applymap(
+                    lambda x: round(x, 2) if abs(x) > 0.2 else 0)
+
+    # Draw heatmap
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    sns.heatmap(
+        formatted_data,
+        annot=_annotations(formatted_data, errors),
+        fmt=".2g" if errors is None else "",
+        cmap=sns.color_palette("Spectral"),
+        mask=mask,
+        annot_kws={"size": font_size},
+        linewidths=0.5,
+        ax=ax
+    )
+    ax.set_title(title, fontsize=14)
+    return fig
+
+
+def pps_heatmap(df, threshold=0.2, figsize=(12, 8),
+                font_size=8, title="PPS Heatmap", errors=None):
+    """
+    Generate a heatmap to visualize Predictive Power Score (PPS)
+    between variables.
+    Code copied from Notebook 3:
+    Section: 5.2 Calculate and Visualize Relationships in Dataset
+
+    `errors` holds an error bound per score, written under the values of
+    approximate heatmaps.
+    """
+    if df.shape[1] <= 1:
+        return None
+
+    # Filter rows and columns with values under the threshold
+    filtered_data = df.loc[(abs(df) >= threshold).any(axis=1),
+                           (abs(df) >= threshold).any(axis=0)]
+
+    # Create a mask to hide values <= threshold
+    # and values that are exactly 0
+    mask = np.zeros_like(filtered_data, dtype=bool)
+    mask[abs(filtered_data) <= 0.2] = True
+    mask[filtered_data == 0] = True
+
+    # Format data for better readability
+    formatted_data = filtered_data.applymap(
+                    lambda x: round(x, 2) if abs(x) > 0.2 else 0)
+
+    # Draw heatmap
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    sns.heatmap(
+        formatted_data,
+        annot=_annotations(formatted_data, errors),
+        fmt=".2g" if errors is None else "",
+        cmap=sns.color_palette("Spectral"),
+        annot_kws={"size": font_size},
+        linewidths=0.5,
+        mask=mask,
+        ax=ax
+    )
+    ax.set_title(title, fontsize=14)
+    return fig
+
+
+def _label_bivariate(ax, col, target_var):
+    """
+    Set the title and axis labels of a chart of a variable vs the target.
+    """
+    ax.set_title(
+        f"{VARIABLE_NAMES.get(col, col)} vs {target_var}", fontsize=20
+    )
+    ax.set_xlabel(VARIABLE_NAMES.get(col, col), fontsize=9)
+    ax.set_ylabel(VARIABLE_NAMES.get(target_var, target_var), fontsize=9)
+
+
+def plot_lm(df, col, target_var, fast=None, aggregate=None):
+    """
+    Scatterplot of a variable against the target, with a regression line.
+
+    In fast mode the line and its 95% confidence band are the closed-form
+    OLS fit, instead of `sns.regplot`'s bootstrapped band. In aggregate
+    mode the points are replaced by a 2-D binned density, drawn with the
+    closed-form line.
+
+    Args:
+        df (pd.DataFrame): Data to plot
+        col (str): Variable on the x axis
+        target_var (str): Target variable
+        fast (bool): Use the closed-form band; by default when `df` has
+                     at least FAST_REGRESSION_MIN_ROWS rows
+        aggregate (bool): Draw the binned density; by default when `df`
+                          has at least AGGREGATE_MIN_ROWS rows
+    """
+    if aggregate is None:
+        aggregate = len(df) >= AGGREGATE_MIN_ROWS
+    if aggregate:
+        return density_figure(
+            density_statistics(df[col], df[target_var]), col, target_var)
+    if fast is None:
+        fast = len(df) >= FAST_REGRESSION_MIN_ROWS
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+
+    # Scatter plot
+    scatter = ax.scatter(
+        x=df[col],
+        y=df[target_var],
+        c=df[col],
+        cmap='Spectral',
+        alpha=0.7,
+        edgecolor='k'
+    )
+
+    # Regression line
+    if fast:
+        draw_regression_line(ax, df[col], df[target_var], color='black')
+    else:
+        sns.regplot(
+            data=df,
+            x=col,
+            y=target_var,
+            scatter=False,
+            line_kws={'color': 'black'},
+            ax=ax
+        )
+
+    # Colorbar
+    cbar = fig.colorbar(scatter, ax=ax)
+    cbar.set_label(f"{col}", fontsize=9)
+
+    # Title and labels
+    _label_bivariate(ax, col, target_var)
+    ax.grid(True, linestyle='--', alpha=0.6)
+    return fig
+
+
+def plot_box(df, col, target_var, aggregate=None):
+    """
+    Boxplot of the target for each value of a categorical variable.
+
+    Args:
+        df (pd.DataFrame): Data to plot
+        col (str): Categorical variable on the x axis
+        target_var (str): Target variable
+        aggregate (bool): Draw from quantiles computed in one sort; by
+                          default when `df` has at least
+                          AGGREGATE_MIN_ROWS rows
+    """
+    if aggregate is None:
+        aggregate = len(df) >= AGGREGATE_MIN_ROWS
+    if aggregate:
+        return box_figure(
+            box_statistics(df[col], df[target_var]), col, target_var)
+    num_categories = len(df[col].unique())
+    palette = sns.color_palette("Spectral", n_colors=num_categories)
+
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    sns.boxplot(
+        data=df,
+        x=col,
+        y=target_var,
+        palette=palette,
+        ax=ax
+    )
+
+    # Title and labels
+    _label_bivariate(ax, col, target_var)
+    return fig
+
+
+def plot_line(df, col, target_var, aggregate=None):
+    """
+    Line plot of the mean target for each value of a time variable.
+
+    Args:
+        df (pd.DataFrame): Data to plot
+        col (str): Time variable on the x axis
+        target_var (str): Target variable
+        aggregate (bool): Draw the means with a t-based 95% band computed
+                          from per-value sums, instead of seaborn's
+                          bootstrapped band; by default when `df` has at
+                          least AGGREGATE_MIN_ROWS rows
+    """
+    if aggregate is None:
+        aggregate = len(df) >= AGGREGATE_MIN_ROWS
+    if aggregate:
+        return line_figure(
+            group_mean_statistics(df[col], df[target_var]), col, target_var)
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    sns.lineplot(
+        data=df,
+        x=col,
+        y=target_var,
+        color=sns.color_palette("Spectral")[1],
+        ax=ax
+    )
+
+    # Title and labels
+    _label_bivariate(ax, col, target_var)
+    return fig
+
+
+def target_histogram(df, target_var, aggregate=None):
+    """
+    Histogram of the target variable with a KDE.
+    Code copied from Notebook 3:
+    Section: 6.2 Visualization of Target Variable Distribution
+
+    Args:
+        df (pd.DataFrame): Data to plot
+        target_var (str): Target variable
+        aggregate (bool): Draw from binned counts, with a KDE computed by
+                          FFT over a fixed grid; by default when `df` has
+                          at least AGGREGATE_MIN_ROWS rows
+    """
+    if aggregate is None:
+        aggregate = len(df) >= AGGREGATE_MIN_ROWS
+    if aggregate:
+        return histogram_figure(
+            histogram_statistics(df[target_var]), target_var)
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    sns.histplot(
+        df[target_var],
+        kde=True,
+        color=sns.color_palette("Spectral")[0],
+        ax=ax
+    )
+    ax.set_title(f"Distribution of {target_var}", fontsize=18)
+    return fig
+
+
+# Builders drawing the same charts from aggregates, so they can also be
+# fed with statistics accumulated without holding the rows in memory
+
+
+def density_figure(statistics, col, target_var):
+    """
+    2-D density of a variable against the target, with the OLS line.
+
+    Args:
+        statistics (dict): Output of `density_statistics`
+        col (str): Variable on the x axis
+        target_var (str): Target variable
+    """
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    mesh = draw_density(ax, statistics)
+    draw_regression_line(
+        ax, None, None, color='black', statistics=statistics["ols"])
+    cbar = fig.colorbar(mesh, ax=ax)
+    cbar.set_label("Count", fontsize=9)
+    _label_bivariate(ax, col, target_var)
+    ax.grid(True, linestyle='--', alpha=0.6)
+    return fig
+
+
+def box_figure(groups, col, target_var):
+    """
+    Boxplot of the target for each value of a variable.
+
+    Args:
+        groups (list): Output of `box_statistics`
+        col (str): Variable on the x axis
+        target_var (str): Target variable
+    """
+    palette = sns.color_palette("Spectral", n_colors=len(groups))
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    draw_boxes(ax, groups, palette)
+    _label_bivariate(ax, col, target_var)
+    return fig
+
+
+def line_figure(statistics, col, target_var):
+    """
+    Mean target for each value of a time variable, with a 95% band.
+
+    Args:
+        statistics (dict): Output of `group_mean_statistics`
+        col (str): Time variable on the x axis
+        target_var (str): Target variable
+    """
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    draw_group_means(ax, statistics, sns.color_palette("Spectral")[1])
+    _label_bivariate(ax, col, target_var)
+    return fig
+
+
+def histogram_figure(statistics, target_var):
+    """
+    Histogram of the target variable with a KDE.
+
+    Args:
+        statistics (dict): Output of `histogram_statistics`
+        target_var (str): Target variable
+    """
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    draw_histogram(ax, statistics, sns.color_palette("Spectral")[0])
+    ax.set_xlabel(target_var)
+    ax.set_title(f"Distribution of {target_var}", fontsize=18)
+    return fig
+
+
+def bivariate_chart(df, col):
+    """
+    Pick the bivariate chart suited to a variable.
+
+    Args:
+        df (pd.DataFrame): EDA frame
+        col (str): Variable plotted against the target
+
+    Returns:
+        str: Name of the chart in CHARTS
+    """
+    if len(df[col].unique()) <= 10:
+        return "plot_box"
+    if col in TIME_VARS:
+        return "plot_line"
+    return "plot_lm"
+
+
+# Chart builders by name
+CHARTS = {
+    "correlation_heatmap": correlation_heatmap,
+    "pps_heatmap": pps_heatmap,
+    "plot_lm": plot_lm,
+    "plot_box": plot_box,
+    "plot_line": plot_line,
+    "target_histogram": target_histogram,
+}
@@ -0,0 +1,280 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from src.data_analysis.matrix_cache import MATRIX_CACHE_DIR, matrix_cache_key
+
+# Version of the stored index layout, part of its file name
+INDEX_FORMAT = 2
+
+# Indexes already loaded or built by this process, per index key
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _pairwise_sums(values, shift):
+    """
+    Compute the pairwise-complete sums of a block of rows.
+
+    Args:
+        values (np.ndarray): float64 rows, NaN for missing values
+        shift (np.ndarray): Value subtracted from each column, keeping the
+                            sums small so products don't lose precision
+
+    Returns:
+        dict: k x k matrices, where entry (i, j) only counts the rows
+              holding both column i and column j: "count", "sum" (of
+              column i), "sum_sq" (of column i) and "cross" (of i * j)
+    """
+    present = ~np.isnan(values)
+    centered = np.where(present, values - shift, 0.0)
+    weights = present.astype(np.float64)
+    return {
+        "count": weights.T @ weights,
+        "sum": centered.T @ weights,
+        "sum_sq": (centered ** 2).T @ weights,
+        "cross": centered.T @ centered,
+    }
+
+
+def _average_ranks(values):
+    """
+    Rank each column like `DataFrame.rank`, averaging ties, NaN kept.
+    """
+    return pd.DataFrame(values).rank().to_numpy(dtype=np.float64)
+
+
+class CorrelationIndex:
+    """
+    Sufficient statistics answering correlation queries on any subset.
+
+    The index stores pairwise-complete counts, sums, sums of squares and
+    cross products of all columns, so the covariance, means and
+    Pearson correlation of any subset of k columns are an O(k^2) slice.
+    The same statistics are kept for the ranked data, for Spearman; the
+    rows themselves aren't kept. Results match `DataFrame.corr` up to
+    floating point rounding, for Spearman when the data has no missing
+    values.
+
+    Args:
+        columns (list): Column names, in matrix order
+        n_rows (int): Number of rows the statistics were computed from
+        shift (np.ndarray): Value subtracted from each column in the sums
+        sums (dict): Pairwise sums of the data, see `_pairwise_sums`
+        rank_shift (np.ndarray): Value subtracted from each column of
+                                 ranks in the sums
+        rank_sums (dict): Pairwise sums of the ranked data
+    """
+
+    def __init__(self, columns, n_rows, shift, sums, rank_shift, rank_sums):
+        self.columns = list(columns)
+        self.n_rows = int(n_rows)
+        self.shift = shift
+        self.sums = sums
+        self.rank_shift = rank_shift
+        self.rank_sums = rank_sums
+        self._positions = {
+            column: i for i, column in enumerate(self.columns)}
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build the index of a frame of numerical columns.
+
+        Args:
+            df (pd.DataFrame): Numerical data
+
+        Returns:
+            CorrelationIndex: Index of all columns of `df`
+        """
+        data = df.to_numpy(dtype=np.float64, na_value=np.nan)
+        shift = np.nan_to_num(np.nanmean(data, axis=0)) if len(data) else (
+            np.zeros(data.shape[1]))
+        ranks = _average_ranks(data)
+        rank_shift = np.full(data.shape[1], (len(data) + 1) / 2)
+        return cls(
+            df.columns, len(data), shift, _pairwise_sums(data, shift),
+            rank_shift, _pairwise_sums(ranks, rank_shift),
+        )
+
+    def __len__(self):
+        return self.n_rows
+
+    def _positions_of(self, columns):
+        if columns is None:
+            return np.arange(len(self.columns)), list(self.columns)
+        columns = list(columns)
+        missing = [c for c in columns if c not in self._positions]
+        if missing:
+            raise KeyError(f"Columns not in the correlation index: {missing}")
+        return np.array([self._positions[c] for c in columns], dtype=int), (
+            columns)
+
+    @staticmethod
+    def _slice(sums, positions):
+        grid = np.ix_(positions, positions)
+        return {name: matrix[grid] for name, matrix in sums.items()}
+
+    def counts(self, columns=None):
+        """
+        Return the number of rows holding both columns of each pair.
+
+        Args:
+            columns (list): Columns to include, all columns if None
+
+        Returns:
+            pd.DataFrame: Pairwise counts
+        """
+        positions, columns = self._positions_of(columns)
+        return pd.DataFrame(
+            self.sums["count"][np.ix_(positions, positions)],
+            index=columns, columns=columns,
+        )
+
+    def means(self, columns=None):
+        """
+        Return the mean of each column over its non-missing values.
+
+        Args:
+            columns (list): Columns to include, all columns if None
+
+        Returns:
+            pd.Series: Column means
+        """
+        positions, columns = self._positions_of(columns)
+        count = np.diag(self.sums["count"])[positions]
+        total = np.diag(self.sums["sum"])[positions]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self.shift[positions] + total / count
+        return pd.Series(means, index=columns)
+
+    def covariance(self, columns=None):
+        """
+        Return the pairwise-complete sample covariance matrix.
+
+        Args:
+            columns (list): Columns to include, all columns if None
+
+        Returns:
+            pd.DataFrame: Covariance matrix, like `DataFrame.cov`
+        """
+        positions, columns = self._positions_of(columns)
+        s = self._slice(self.sums, positions)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            comoment = s["cross"] - s["sum"] * s["sum"].T / s["count"]
+            covariance = comoment / (s["count"] - 1)
+        covariance[s["count"] < 2] = np.nan
+        return pd.DataFrame(covariance, index=columns, columns=columns)
+
+    def corr(self, columns=None, method="pearson"):
+        """
+        Return the correlation matrix of a subset of columns.
+
+        Args:
+            columns (list): Columns to include, all columns if None
+            method (str): "pearson" or "spearman"
+
+        Returns:
+            pd.DataFrame: Correlation matrix, like `DataFrame.corr`
+        """
+        if method == "pearson":
+            sums = self.sums
+        elif method == "spearman":
+            sums = self.rank_sums
+        else:
+            raise ValueError(
+                f"method must be 'pearson' or 'spearman', got {method!r}")
+
+        positions, columns = self._positions_of(columns)
+        s = self._slice(sums, positions)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            comoment = s["cross"] - s["sum"] * s["sum"].T / s["count"]
+            # Spread of column i (rows) and j (columns) over shared rows
+            spread_i = s["sum_sq"] - s["sum"] ** 2 / s["count"]
+            correlation = comoment / np.sqrt(spread_i * spread_i.T)
+        correlation = np.clip(correlation, -1.0, 1.0)
+        np.fill_diagonal(
+            correlation,
+            np.where(np.isnan(np.diag(correlation)), np.nan, 1.0))
+        return pd.DataFrame(correlation, index=columns, columns=columns)
+
+    def save(self, file_path):
+        """
+        Store the index in an uncompressed `.npz` file.
+
+        Args:
+            file_path (str): Path to the output file
+        """
+        arrays = {f"sums_{name}": m for name, m in self.sums.items()}
+        arrays.update(
+            {f"rank_sums_{name}": m for name, m in self.rank_sums.items()})
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = f"{file_path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path, columns=np.array(self.columns, dtype=str),
+            n_rows=self.n_rows, shift=self.shift,
+            rank_shift=self.rank_shift, **arrays,
+        )
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load an index stored with `save`.
+
+        Args:
+            file_path (str): Path to the `.npz` file
+
+        Returns:
+            CorrelationIndex: The stored index
+        """
+        with np.load(file_path) as arrays:
+            names = ("count", "sum", "sum_sq", "cross")
+            return cls(
+                arrays["columns"].tolist(), arrays["n_rows"],
+                arrays["shift"],
+                {name: arrays[f"sums_{name}"] for name in names},
+                arrays["rank_shift"],
+                {name: arrays[f"rank_sums_{name}"] for name in names},
+            )
+
+
+def get_correlation_index(df, version=None):
+    """
+    Return the correlation index of a dataset version, building it once.
+
+    Indexes are stored next to the cached matrices, keyed by the dataset
+    version and the columns of `df`, and kept in memory once loaded, so
+    a query doesn't read the rows.
+
+    Args:
+        df (pd.DataFrame): Numerical data
+        version (str): Dataset version `df` was built from; without it
+                       `df` is hashed to identify it
+
+    Returns:
+        CorrelationIndex: Index of all columns of `df`
+    """
+    key = matrix_cache_key(df, "correlation_index", version=version)
+    with _indexes_lock:
+        if key in _indexes:
+            return _indexes[key]
+
+    file_path = os.path.join(
+        MATRIX_CACHE_DIR, f"correlation-index-{INDEX_FORMAT}-{key[:16]}.npz")
+    index = None
+    if os.path.exists(file_path):
+        try:
+            index = CorrelationIndex.load(file_path)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Ignoring unreadable correlation index {file_path}: {e}")
+    if index is None or index.columns != [str(c) for c in df.columns]:
+        index = CorrelationIndex.from_frame(df)
+        try:
+            index.save(file_path)
+        except OSError as e:
+            print(f"Could not write correlation index {file_path}: {e}")
+
+    with _indexes_lock:
+        _indexes[key] = index
+    return index
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from src.data_management import (
+    frame_content_hash,
+    freeze_frame,
+    shared_view,
+    smallest_int_dtype
+)
+from src.data_analysis.matrix_cache import cached_matrix
+
+# Target variable of the correlation analysis
+TARGET_VAR = 'SalePrice'
+
+# Variables studied on the correlation analysis page; names of the form
+# <categorical column>_<category> are one-hot indicators
+EDA_VARIABLES = [
+    '1stFlrSF', 'GarageArea', 'GarageYrBlt', 'GrLivArea',
+    'KitchenQual_Ex', 'KitchenQual_Gd', 'KitchenQual_TA',
+    'MasVnrArea', 'OverallQual', 'TotalBsmtSF', 'YearBuilt', 'YearRemodAdd'
+]
+
+# Value given to missing categories before one-hot encoding
+MISSING_CATEGORY = "Missing"
+
+# EDA frames kept in memory, one per dataset version and variables
+EDA_FRAME_ENTRIES = 4
+
+
+def _is_categorical(series):
+    return (
+        isinstance(series.dtype, pd.CategoricalDtype)
+        or pd.api.types.is_object_dtype(series)
+    )
+
+
+def _compact(values):
+    """
+    Store numbers in the smallest dtype that holds them without loss.
+
+    Args:
+        values (pd.Series): Numerical column without missing values
+
+    Returns:
+        pd.Series: Integer column of the smallest fitting dtype, or a
+                   float32 column when that is exact, float64 otherwise
+    """
+    array = values.to_numpy(dtype=np.float64)
+    if len(array) and np.array_equal(array, np.round(array)):
+        dtype = smallest_int_dtype(array.min(), array.max())
+        return pd.Series(array.astype(dtype), index=values.index)
+    as_float32 = array.astype(np.float32)
+    if np.array_equal(as_float32.astype(np.float64), array):
+        return pd.Series(as_float32, index=values.index)
+    return pd.Series(array, index=values.index)
+
+
+def _indicator_source(df, variable):
+    """
+    Find the categorical column and category a one-hot name refers to.
+
+    Args:
+        df (pd.DataFrame): Raw data
+        variable (str): Name such as "KitchenQual_Ex"
+
+    Returns:
+        tuple: Column name and category, or None if `variable` isn't a
+               one-hot name of a categorical column of `df`
+    """
+    candidates = [
+        column for column in df.columns
+        if variable.startswith(f"{column}_") and _is_categorical(df[column])
+    ]
+    if not candidates:
+        return None
+    column = max(candidates, key=len)
+    return column, variable[len(column) + 1:]
+
+
+def build_eda_frame(df, variables=EDA_VARIABLES, target=TARGET_VAR,
+                    impute=True):
+    """
+    Build the numerical frame used by the correlation analysis.
+
+    Equivalent to imputing every column (categories with "Missing",
+    numbers with their median), one-hot encoding every categorical column
+    and keeping `variables` and `target`. Only the requested columns are
+    computed: each indicator is a single comparison with its category.
+    Columns are stored in the smallest dtype holding them exactly.
+
+    Args:
+        df (pd.DataFrame): Raw house pricing data
+        variables (list): Variables to study, as column names or one-hot
+                          names of categorical columns
+        target (str): Target variable
+        impute (bool): Fill missing numbers with the median; when False
+                       they are kept as NaN in float64 columns, e.g. for
+                       chunks of data whose median isn't known yet
+
+    Returns:
+        pd.DataFrame: The studied variables and the target, in that
+                      order; variables that can't be found are left out
+    """
+    columns = {}
+    for variable in list(variables) + [target]:
+        if variable in columns:
+            continue
+        if variable in df.columns and not _is_categorical(df[variable]):
+            values = df[variable]
+            if values.hasnans and not impute:
+                columns[variable] = values.astype('float64')
+                continue
+            if values.hasnans:
+                values = values.astype('float64').fillna(values.median())
+            columns[variable] = _compact(values)
+            continue
+        source = _indicator_source(df, variable)
+        if source is not None:
+            column, category = source
+            filled = df[column].astype(object).fillna(MISSING_CATEGORY)
+            columns[variable] = (filled == category).astype(np.int8)
+
+    return pd.DataFrame(columns)
+
+
+@st.cache_resource(max_entries=EDA_FRAME_ENTRIES)
+def _load_shared_eda_frame(_df, version, variables, target):
+    """
+    Build or read the EDA frame of a dataset version, and freeze it.
+
+    Streamlit keys the cache by the version and the variables only; the
+    raw data itself isn't hashed.
+
+    Returns:
+        pd.DataFrame: Frozen EDA frame shared by all sessions
+    """
+    eda_frame = cached_matrix(
+        _df, "eda-frame",
+        lambda data: build_eda_frame(data, variables, target),
+        params={"variables": list(variables), "target": target},
+        version=version, keep_in_memory=False,
+    )
+    return freeze_frame(eda_frame)
+
+
+def load_eda_frame(df, variables=EDA_VARIABLES, target=TARGET_VAR,
+                   version=None):
+    """
+    Return the EDA frame of a dataset version, building it only once.
+
+    The frame is stored through the matrix cache, so it survives
+    restarts, and kept frozen in memory once per dataset version, shared
+    by every session. Each call only hands out a view of it, like the
+    loaded datasets.
+
+    Args:
+        df (pd.DataFrame): Raw house pricing data
+        variables (list): Variables to study
+        target (str): Target variable
+        version (str): Dataset version of `df`, e.g.
+                       `pricing_data_version()`; without it `df` is
+                       hashed to identify it
+
+    Returns:
+        pd.DataFrame: Read-only view of the EDA frame
+    """
+    version = version or frame_content_hash(df)
+    return shared_view(_load_shared_eda_frame(
+        df, version, tuple(variables), target))
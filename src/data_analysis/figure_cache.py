@@ -0,0 +1,219 @@
+import io
+import json
+import hashlib
+import threading
+import collections
+import pandas as pd
+import matplotlib.pyplot as plt
+import streamlit as st
+from src.data_management import frame_content_hash
+from src.data_analysis.charts import CHARTS
+
+# Bytes of encoded figures kept in memory by the process-wide cache
+FIGURE_CACHE_BYTES = 64 * 1024 * 1024
+
+# Options Streamlit's st.pyplot encodes figures with
+SAVEFIG_OPTIONS = {"bbox_inches": "tight", "dpi": 200}
+
+
+class FigureCache:
+    """
+    Encoded chart images with least-recently-used eviction.
+
+    Entries are evicted, oldest first, once the stored images exceed
+    `max_bytes`. An image larger than the whole budget is not stored.
+
+    Args:
+        max_bytes (int): Budget for the stored images, in bytes
+    """
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the image stored under a key, marking it recently used.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            bytes: Encoded image, or None if it isn't stored
+        """
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        """
+        Store an image, evicting the least recently used ones if needed.
+
+        Args:
+            key (str): Cache key
+            image (bytes): Encoded image
+        """
+        if len(image) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._images:
+                self.size -= len(self._images.pop(key))
+            self._images[key] = image
+            self.size += len(image)
+            while self.size > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __len__(self):
+        return len(self._images)
+
+
+def chart_key(chart, df, params, fmt):
+    """
+    Compute the cache key of a chart.
+
+    Args:
+        chart (str): Name of the chart in CHARTS
+        df (pd.DataFrame): Data the chart is drawn from
+        params (dict): Other arguments of the chart builder
+        fmt (str): Image format
+
+    Returns:
+        str: Hexadecimal key
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        "chart": chart,
+        "params": params,
+        "format": fmt,
+        "data": frame_content_hash(df),
+        "index": [str(label) for label in df.index]
+        if df.index.dtype == object else None,
+    }, sort_keys=True, default=_param_key).encode())
+    return digest.hexdigest()
+
+
+def _param_key(value):
+    """
+    Describe a chart parameter that isn't JSON, for the cache key.
+    """
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+    if isinstance(value, pd.DataFrame):
+        return {
+            "data": frame_content_hash(value),
+            "index": [str(label) for label in value.index],
+        }
+    return str(value)
+
+
+def encode_figure(fig, fmt="png"):
+    """
+    Encode a figure as PNG or SVG bytes and release it.
+
+    Args:
+        fig (Figure): Figure to encode
+        fmt (str): "png" or "svg"
+
+    Returns:
+        bytes: Encoded image
+    """
+    image = io.BytesIO()
+    try:
+        fig.savefig(image, format=fmt, **SAVEFIG_OPTIONS)
+    finally:
+        plt.close(fig)
+    return image.getvalue()
+
+
+def render_chart(chart, df, fmt="png", cache=None, **params):
+    """
+    Return a chart as encoded image bytes, drawing it only on a miss.
+
+    Args:
+        chart (str): Name of the chart in CHARTS
+        df (pd.DataFrame): Data the chart is drawn from
+        fmt (str): "png" or "svg"
+        cache (FigureCache): Cache to use, the process-wide one if None
+        **params: Other arguments of the chart builder
+
+    Returns:
+        bytes: Encoded image, or None if the chart has nothing to draw
+    """
+    return cached_image(
+        chart_key(chart, df, params, fmt),
+        lambda: CHARTS[chart](df, **params), fmt, cache,
+    )
+
+
+def cached_image(key, build, fmt="png", cache=None):
+    """
+    Return the image stored under a key, drawing it only on a miss.
+
+    Args:
+        key (str): Cache key, which must identify the data and the format
+        build (callable): Returns the Figure to encode, or None
+        fmt (str): "png" or "svg"
+        cache (FigureCache): Cache to use, the process-wide one if None
+
+    Returns:
+        bytes: Encoded image, or None if `build` has nothing to draw
+    """
+    cache = cache if cache is not None else get_figure_cache()
+    image = cache.get(key)
+    if image is None:
+        fig = build()
+        if fig is None:
+            return None
+        image = encode_figure(fig, fmt)
+        cache.put(key, image)
+    return image
+
+
+def display_chart(chart, df, fmt="png", **params):
+    """
+    Render a chart through the figure cache and show it on the page.
+
+    Args:
+        chart (str): Name of the chart in CHARTS
+        df (pd.DataFrame): Data the chart is drawn from
+        fmt (str): "png" or "svg"
+        **params: Other arguments of the chart builder
+    """
+    show_image(render_chart(chart, df, fmt, **params), fmt)
+
+
+def show_image(image, fmt="png"):
+    """
+    Show an encoded chart on the page.
+
+    Args:
+        image (bytes): Encoded image, nothing is shown if None
+        fmt (str): "png" or "svg"
+    """
+    if image is None:
+        return
+    if fmt == "svg":
+        st.image(image.decode(), use_container_width=True)
+    else:
+        st.image(image, use_container_width=True)
+
+
+@st.cache_resource
+def get_figure_cache():
+    """
+    Return the figure cache shared by all sessions.
+
+    Returns:
+        FigureCache: Process-wide figure cache
+    """
+    return FigureCache()
@@ -0,0 +1,126 @@
+import os
+import warnings
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import matplotlib as mpl
+import streamlit as st
+from src.data_analysis.charts import CHARTS
+from src.data_analysis.figure_cache import (
+    chart_key,
+    encode_figure,
+    get_figure_cache,
+    render_chart
+)
+
+# Processes rendering the bivariate gallery; 1 renders on the script thread
+GALLERY_WORKERS = int(
+    os.environ.get("ANALYSIS_GALLERY_WORKERS", os.cpu_count() or 1))
+
+
+def _current_style():
+    """
+    Return the active matplotlib settings, to style charts the same way
+    in worker processes.
+    """
+    return {
+        key: value for key, value in mpl.rcParams.items()
+        if key != "backend"
+    }
+
+
+def _render_in_worker(chart, df, params, fmt, style):
+    """
+    Draw and encode one chart in a worker process.
+
+    Returns:
+        bytes: Encoded image, or None if the chart has nothing to draw
+    """
+    with warnings.catch_warnings():
+        # Deprecated settings warn when they are copied over
+        warnings.simplefilter("ignore")
+        with mpl.rc_context(style):
+            fig = CHARTS[chart](df, **params)
+            return None if fig is None else encode_figure(fig, fmt)
+
+
+@st.cache_resource
+def get_gallery_pool(workers=GALLERY_WORKERS):
+    """
+    Return the process pool rendering charts, shared by all sessions.
+
+    Workers are started with "spawn", which is safe to use from
+    Streamlit's threads, and kept for the life of the server.
+
+    Args:
+        workers (int): Number of processes
+
+    Returns:
+        ProcessPoolExecutor: Rendering pool
+    """
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def render_gallery(charts, workers=GALLERY_WORKERS, fmt="png", cache=None):
+    """
+    Render charts in parallel, yielding each one as soon as it is ready.
+
+    Charts already in the figure cache are yielded first, without
+    rendering. The others are drawn in a process pool and stored in the
+    cache as they finish. If a worker dies, the pool is replaced for the
+    next call and the remaining charts are drawn in this process.
+
+    Args:
+        charts (list): (chart name, data, parameters dict) per chart
+        workers (int): Rendering processes; 1 renders here, one by one
+        fmt (str): "png" or "svg"
+        cache (FigureCache): Cache to use, the process-wide one if None
+
+    Yields:
+        tuple: Position of the chart in `charts` and its encoded image,
+               None if the chart has nothing to draw
+    """
+    cache = cache if cache is not None else get_figure_cache()
+    if workers <= 1:
+        for position, (chart, df, params) in enumerate(charts):
+            yield position, render_chart(chart, df, fmt, cache, **params)
+        return
+
+    pending = {}
+    style = _current_style()
+    for position, (chart, df, params) in enumerate(charts):
+        key = chart_key(chart, df, params, fmt)
+        image = cache.get(key)
+        if image is not None:
+            yield position, image
+        else:
+            pending[position] = key, (chart, df, params, fmt, style)
+
+    if not pending:
+        return
+    pool = get_gallery_pool(workers)
+    try:
+        futures = {
+            pool.submit(_render_in_worker, *args): (position, key)
+            for position, (key, args) in pending.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            position, key = futures[future]
+            image = future.result()
+            if image is not None:
+                cache.put(key, image)
+            del pending[position]
+            yield position, image
+    except BrokenProcessPool:
+        # A worker died: drop the pool so the next gallery starts a new
+        # one, and draw the remaining charts here
+        print("Gallery process pool broke, rendering the remaining "
+              f"{len(pending)} charts in the server process")
+        get_gallery_pool.clear()
+        pool.shutdown(wait=False, cancel_futures=True)
+    for position, (_, (chart, df, params, _, _)) in sorted(
+            pending.items()):
+        yield position, render_chart(chart, df, fmt, cache, **params)
@@ -0,0 +1,159 @@
+import os
+import json
+import hashlib
+import threading
+import pandas as pd
+import ppscore as pps
+from src.data_management import (
+    CACHE_DIR,
+    frame_content_hash,
+    read_cached_parquet,
+    write_cached_parquet
+)
+from src.data_analysis.pps_engine import pps_matrix as compute_pps_matrix
+
+# Directory holding the computed correlation and PPS matrices
+MATRIX_CACHE_DIR = os.path.join(CACHE_DIR, "matrices")
+
+# Parquet metadata key storing the full cache key of a matrix
+MATRIX_KEY = b"matrix_key"
+
+# Version of each computation, bump it when the computation changes
+MATRIX_VERSIONS = {
+    "pearson": "1",
+    "spearman": "1",
+    "pps": f"engine-1-ppscore-{pps.__version__}",
+    "eda-frame": "1",
+}
+
+# Matrices already read or computed by this process, per cache key
+_matrices = {}
+_matrices_lock = threading.Lock()
+
+
+def matrix_cache_key(df, method, params=None, version=None):
+    """
+    Compute the cache key of a matrix of a dataset.
+
+    Args:
+        df (pd.DataFrame): Data the matrix is computed from
+        method (str): Name of the computation, a key of MATRIX_VERSIONS
+        params (dict): Extra parameters of the computation
+        version (str): Dataset version `df` was loaded as, which saves
+                       hashing its rows; its content hash is used if None
+
+    Returns:
+        str: Hexadecimal key, changing with the data, its variables, the
+             method or its parameters
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        "data": version or frame_content_hash(df),
+        "variables": [str(column) for column in df.columns],
+        "method": method,
+        "version": MATRIX_VERSIONS.get(method),
+        "params": params or {},
+    }, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def cached_matrix(df, method, compute, params=None, version=None,
+                  keep_in_memory=True):
+    """
+    Return a matrix of a dataset, computing it only if it isn't cached.
+
+    Matrices are stored as Parquet files in MATRIX_CACHE_DIR, so they
+    survive restarts and are shared by every process, and kept in memory
+    once read.
+
+    Args:
+        df (pd.DataFrame): Data the matrix is computed from
+        method (str): Name of the computation, a key of MATRIX_VERSIONS
+        compute (callable): Takes `df` and returns the matrix as a
+                            DataFrame with string column names
+        params (dict): Extra parameters of the computation
+        version (str): Dataset version `df` was loaded as, see
+                       `matrix_cache_key`
+        keep_in_memory (bool): Keep the matrix in this module once read,
+                               False when the caller keeps its own copy
+
+    Returns:
+        pd.DataFrame: The matrix
+    """
+    key = matrix_cache_key(df, method, params, version)
+    with _matrices_lock:
+        if key in _matrices:
+            return _matrices[key]
+
+    cache_path = os.path.join(MATRIX_CACHE_DIR, f"{method}-{key[:16]}.parquet")
+    stored, _ = read_cached_parquet(cache_path, {MATRIX_KEY: key.encode()})
+    if stored is not None:
+        matrix = _restore_index(stored)
+    else:
+        matrix = compute(df)
+        try:
+            write_cached_parquet(
+                _store_index(matrix), cache_path, {MATRIX_KEY: key.encode()})
+        except OSError as e:
+            print(f"Could not write matrix cache {cache_path}: {e}")
+
+    if keep_in_memory:
+        with _matrices_lock:
+            _matrices[key] = matrix
+    return matrix
+
+
+def _store_index(matrix):
+    """
+    Move a named index into a column, as the Parquet writer drops it.
+    """
+    if matrix.index.name is None and isinstance(matrix.index, pd.RangeIndex):
+        return matrix
+    return matrix.rename_axis("__index__").reset_index()
+
+
+def _restore_index(stored):
+    """
+    Undo `_store_index`.
+    """
+    if "__index__" not in stored.columns:
+        return stored
+    return stored.set_index("__index__").rename_axis(None)
+
+
+def correlation_matrix(df, method="pearson"):
+    """
+    Return the cached Pearson or Spearman correlation matrix of a dataset.
+
+    Args:
+        df (pd.DataFrame): Numerical data
+        method (str): "pearson" or "spearman"
+
+    Returns:
+        pd.DataFrame: Correlation matrix
+    """
+    return cached_matrix(df, method, lambda data: data.corr(method=method))
+
+
+def _compute_pps_matrix(df):
+    """
+    Compute the PPS matrix with the PPS engine, in a Parquet-friendly form.
+    """
+    matrix = compute_pps_matrix(df)
+    # The fitted model objects can't be stored, keep their description
+    matrix["model"] = matrix["model"].astype(str)
+    return matrix
+
+
+def pps_matrix(df):
+    """
+    Return the cached Predictive Power Score matrix of a dataset.
+
+    Args:
+        df (pd.DataFrame): Data to score
+
+    Returns:
+        pd.DataFrame: PPS of every ordered pair of columns, in the long
+                      format of `ppscore.matrix`
+    """
+    return cached_matrix(df, "pps", _compute_pps_matrix)
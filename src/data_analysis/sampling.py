@@ -0,0 +1,323 @@
+import time
+import warnings
+import threading
+import numpy as np
+import pandas as pd
+from src.data_analysis.matrix_cache import (
+    correlation_matrix, matrix_cache_key, pps_matrix)
+from src.data_analysis.pps_engine import pps_matrix as compute_pps_matrix
+
+# Column the samples are stratified by
+STRATA_COLUMN = 'OverallQual'
+
+# Sample sizes of the successive approximations, before the exact values
+SAMPLE_SIZES = (1_000, 5_000, 20_000)
+
+# Rows added to the reservoir at a time
+CHUNK_ROWS = 100_000
+
+# Bootstrap resamples behind the error bounds of each statistic
+BOOTSTRAP_ROUNDS = 200
+PPS_BOOTSTRAP_ROUNDS = 30
+
+# Confidence level of the error bounds, in percent
+CONFIDENCE = 95
+
+# Seconds between two checks of the page for refined results
+REFRESH_SECONDS = 2
+
+# Statistics computed by the sampled analysis
+KINDS = ("pearson", "spearman", "pps")
+
+# Seconds an analysis may go unrequested before it's evicted
+ANALYSIS_MAX_IDLE = 30 * 60.0
+
+# Analyses started by this process, and when each was last requested,
+# per dataset version and columns
+_analyses = {}
+_analyses_last_used = {}
+_analyses_lock = threading.Lock()
+
+
+class StratifiedReservoir:
+    """
+    Uniform sample of each stratum of a stream of rows.
+
+    Every row draws a random priority, and each stratum keeps the
+    `capacity` rows with the lowest priorities. That is a uniform sample
+    without replacement of the stratum, whatever the order and chunking
+    of the rows, and its first rows by priority are a uniform sample too,
+    so samples of any smaller size are read from the same reservoir.
+
+    Args:
+        strata_column (str): Column defining the strata
+        capacity (int): Rows kept per stratum
+        seed (int): Seed of the priorities
+    """
+
+    def __init__(self, strata_column, capacity, seed=0):
+        self.strata_column = strata_column
+        self.capacity = capacity
+        self.sizes = {}
+        self._rng = np.random.default_rng(seed)
+        self._rows = {}
+        self._priorities = {}
+
+    def update(self, frame):
+        """
+        Add a chunk of rows.
+
+        Args:
+            frame (pd.DataFrame): Rows holding the strata column
+        """
+        priorities = self._rng.random(len(frame))
+        strata = frame.groupby(
+            self.strata_column, dropna=False, sort=False).indices
+        for stratum, positions in strata.items():
+            self.sizes[stratum] = self.sizes.get(stratum, 0) + len(positions)
+            kept = self._priorities.get(stratum, np.empty(0))
+            new = priorities[positions]
+            if len(kept) == self.capacity:
+                # Rows ranked after a full reservoir can't get in
+                entering = new < kept[-1]
+                positions, new = positions[entering], new[entering]
+            if not len(positions):
+                continue
+            rows = pd.concat([
+                self._rows.get(stratum, frame.iloc[:0]),
+                frame.iloc[positions],
+            ])
+            combined = np.concatenate([kept, new])
+            order = np.argsort(combined, kind="stable")[:self.capacity]
+            self._rows[stratum] = rows.iloc[order]
+            self._priorities[stratum] = combined[order]
+
+    def sample(self, size):
+        """
+        Return a sample with each stratum in proportion to its size.
+
+        Allocations are rounded by largest remainder, and a stratum gets
+        at most the rows its reservoir holds.
+
+        Args:
+            size (int): Rows in the sample
+
+        Returns:
+            pd.DataFrame: Stratified sample
+        """
+        total = sum(self.sizes.values())
+        size = min(size, total)
+        strata = list(self.sizes)
+        quotas = np.array([self.sizes[s] for s in strata]) * size / total
+        allocation = np.floor(quotas).astype(int)
+        remainder = size - allocation.sum()
+        for position in np.argsort(allocation - quotas)[:remainder]:
+            allocation[position] += 1
+        return pd.concat([
+            self._rows[stratum].iloc[:count]
+            for stratum, count in zip(strata, allocation)
+        ])
+
+
+def stratified_bootstrap(sample, strata_column, statistic, rounds,
+                         confidence=CONFIDENCE, seed=0):
+    """
+    Compute a matrix statistic and its bootstrap error bounds.
+
+    Each resample draws, with replacement, as many rows from each
+    stratum as the sample holds.
+
+    Args:
+        sample (pd.DataFrame): Stratified sample
+        strata_column (str): Column defining the strata
+        statistic (callable): Takes a frame and returns a DataFrame
+        rounds (int): Number of resamples
+        confidence (float): Confidence level in percent
+        seed (int): Seed of the resampling
+
+    Returns:
+        tuple: The statistic of `sample`, and the half-width of the
+               percentile bootstrap interval of each of its values
+    """
+    rng = np.random.default_rng(seed)
+    strata = list(sample.groupby(
+        strata_column, dropna=False, sort=False).indices.values())
+    estimate = statistic(sample)
+    replicates = []
+    for _ in range(rounds):
+        positions = np.concatenate([
+            rng.choice(stratum, len(stratum)) for stratum in strata])
+        replicate = statistic(sample.iloc[positions])
+        replicates.append(replicate.reindex(
+            index=estimate.index, columns=estimate.columns).to_numpy(float))
+
+    tail = (100 - confidence) / 2
+    with warnings.catch_warnings():
+        # Constant columns in a resample have no correlation
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanpercentile(
+            np.stack(replicates), [tail, 100 - tail], axis=0)
+    errors = pd.DataFrame(
+        (high - low) / 2, index=estimate.index, columns=estimate.columns)
+    return estimate, errors
+
+
+def pps_frame(df):
+    """
+    Prepare data for the PPS heatmap, as the analysis page does.
+
+    Args:
+        df (pd.DataFrame): EDA frame
+
+    Returns:
+        pd.DataFrame: Numerical columns, missing values set to 0
+    """
+    return df.select_dtypes(include=[np.number]).fillna(0)
+
+
+def pps_pivot(scores):
+    """
+    Pivot PPS scores into a matrix of targets (rows) by features.
+    """
+    return scores.pivot(index='y', columns='x', values='ppscore')
+
+
+def _sample_statistic(kind):
+    if kind == "pps":
+        return lambda data: pps_pivot(compute_pps_matrix(
+            pps_frame(data), workers=1, sample=None))
+    return lambda data: data.corr(method=kind)
+
+
+class ProgressiveAnalysis:
+    """
+    Correlations and PPS of a dataset, refined in a background thread.
+
+    The statistics are first computed on stratified samples of growing
+    size, each with bootstrap error bounds, then on the full data. Each
+    result replaces the previous one of its kind as soon as it's ready,
+    so readers always get the most precise values available.
+
+    Args:
+        frame (pd.DataFrame): EDA frame, holding the strata column
+        strata_column (str): Column the samples are stratified by
+        sizes (tuple): Sample sizes, those below the row count are used
+        seed (int): Seed of the sampling and the resampling
+    """
+
+    def __init__(self, frame, strata_column=STRATA_COLUMN,
+                 sizes=SAMPLE_SIZES, seed=0):
+        self.frame = frame
+        self.strata_column = strata_column
+        self.sizes = [size for size in sizes if size < len(frame)]
+        self.seed = seed
+        self.error = None
+        self._results = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """
+        Start refining in the background.
+        """
+        self._thread.start()
+
+    @property
+    def finished(self):
+        """
+        Whether the exact values are available, or the refinement failed.
+        """
+        with self._lock:
+            exact = len(self._results) == len(KINDS) and all(
+                result["exact"] for result in self._results.values())
+        return not self._thread.is_alive() and (
+            exact or self.error is not None)
+
+    def latest(self, kind):
+        """
+        Return the most precise result computed so far.
+
+        Args:
+            kind (str): "pearson", "spearman" or "pps"
+
+        Returns:
+            dict: "values" and "errors" matrices (errors are 0 once exact),
+                  the "rows" they were computed from and whether they are
+                  "exact", or None if nothing is ready yet
+        """
+        with self._lock:
+            return self._results.get(kind)
+
+    def _publish(self, kind, values, errors, rows, exact):
+        with self._lock:
+            self._results[kind] = {
+                "values": values, "errors": errors, "rows": rows,
+                "exact": exact,
+            }
+
+    def _run(self):
+        try:
+            if self.sizes:
+                reservoir = StratifiedReservoir(
+                    self.strata_column, max(self.sizes), self.seed)
+                for start in range(0, len(self.frame), CHUNK_ROWS):
+                    reservoir.update(
+                        self.frame.iloc[start:start + CHUNK_ROWS])
+            for size in self.sizes:
+                sample = reservoir.sample(size)
+                for kind in KINDS:
+                    rounds = (
+                        PPS_BOOTSTRAP_ROUNDS if kind == "pps"
+                        else BOOTSTRAP_ROUNDS)
+                    values, errors = stratified_bootstrap(
+                        sample, self.strata_column, _sample_statistic(kind),
+                        rounds, seed=self.seed)
+                    self._publish(kind, values, errors, len(sample), False)
+
+            for kind in KINDS:
+                if kind == "pps":
+                    values = pps_pivot(pps_matrix(pps_frame(self.frame)))
+                else:
+                    values = correlation_matrix(self.frame, method=kind)
+                self._publish(
+                    kind, values, values * 0.0, len(self.frame), True)
+        except Exception as e:
+            print(f"Sampled analysis failed: {e}")
+            self.error = e
+
+
+def get_progressive_analysis(frame, version=None):
+    """
+    Return the progressive analysis of a dataset version, starting it
+    the first time it's requested.
+
+    Analyses not requested for ANALYSIS_MAX_IDLE seconds are evicted,
+    with the EDA frame they hold.
+
+    Args:
+        frame (pd.DataFrame): EDA frame
+        version (str): Dataset version `frame` was built from, e.g.
+                       `pricing_data_version()`; without it `frame` is
+                       hashed to identify it
+
+    Returns:
+        ProgressiveAnalysis: Analysis shared by all sessions
+    """
+    key = matrix_cache_key(frame, "progressive_analysis", version=version)
+    now = time.monotonic()
+    with _analyses_lock:
+        evicted = [
+            other for other, last_used in _analyses_last_used.items()
+            if other != key and now - last_used > ANALYSIS_MAX_IDLE
+        ]
+        for other in evicted:
+            del _analyses_last_used[other]
+            del _analyses[other]
+        analysis = _analyses.get(key)
+        if analysis is None:
+            analysis = _analyses[key] = ProgressiveAnalysis(frame)
+            analysis.start()
+        _analyses_last_used[key] = now
+    for other in evicted:
+        print(f"Evicted idle sampled analysis {other[:16]}")
+    return analysis
@@ -0,0 +1,981 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import streamlit as st
+from src.data_management import CACHE_DIR
+from src.data_analysis.aggregates import (
+    DENSITY_BINS,
+    KDE_GRID_SIZE,
+    MAX_FLIERS,
+    group_mean_statistics,
+    histogram_statistics
+)
+from src.data_analysis.charts import (
+    TIME_VARS,
+    box_figure,
+    density_figure,
+    histogram_figure,
+    line_figure
+)
+from src.data_analysis.eda_frame import (
+    EDA_VARIABLES,
+    TARGET_VAR,
+    _indicator_source,
+    build_eda_frame
+)
+
+# Raw records converted to Parquet for the streaming analysis
+RAW_CSV_PATH = os.path.join(
+    "inputs", "datasets", "raw", "house_prices_records.csv")
+
+# Parquet file streamed by the analysis page, converted from the raw CSV
+# file unless the variable points to an existing file
+STREAM_PARQUET_PATH = os.environ.get(
+    "ANALYSIS_PARQUET_PATH",
+    os.path.join(CACHE_DIR, "stream", "house_prices_records.parquet"),
+)
+
+# Rows per row group of the converted file, i.e. per streamed chunk
+ROW_GROUP_ROWS = 65_536
+
+# Values a quantile sketch keeps exactly before merging them
+SKETCH_CAPACITY = 4096
+
+# Rank bins per column for Spearman; columns of integers spanning fewer
+# values get one bin per value, which makes their ranks exact
+RANK_BINS = 256
+
+# Fine bins of the target histogram, merged to the final width at the end
+HISTOGRAM_FINE_BINS = 4096
+
+# Variables with at most this many values are drawn as box plots, as in
+# `bivariate_chart`
+BOX_MAX_GROUPS = 10
+
+# Bumped when the statistics change, to tell summaries apart
+STREAMING_VERSION = "2"
+
+
+class QuantileSketch:
+    """
+    Mergeable summary of a distribution, for quantiles and box plots.
+
+    Distinct values are kept with their counts, so quantiles are exact
+    until more than `capacity` distinct values have been seen. Beyond
+    that, neighboring values are merged into weighted means covering
+    equal shares of the rows, and quantiles become approximate.
+
+    Args:
+        capacity (int): Distinct values kept before merging
+    """
+
+    def __init__(self, capacity=SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+        self.exact = True
+
+    @property
+    def count(self):
+        return int(self.weights.sum())
+
+    def update(self, values):
+        """
+        Add values, ignoring NaN.
+
+        Args:
+            values (array-like): Values to add
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            unique, counts = np.unique(values, return_counts=True)
+            self._add(unique, counts.astype(np.float64))
+
+    def merge(self, other):
+        """
+        Add the values summarized by another sketch.
+
+        Args:
+            other (QuantileSketch): Sketch to merge into this one
+        """
+        self._add(other.values, other.weights)
+        self.exact = self.exact and other.exact
+
+    def _add(self, values, weights):
+        unique, inverse = np.unique(
+            np.concatenate([self.values, values]), return_inverse=True)
+        self.values = unique
+        self.weights = np.bincount(
+            inverse, weights=np.concatenate([self.weights, weights]))
+        if len(self.values) > self.capacity:
+            self._compress()
+
+    def _compress(self):
+        buckets = self.capacity // 2
+        cumulative = np.cumsum(self.weights)
+        # Bucket holding the middle of each value's share of the rows
+        bucket = np.minimum(
+            ((cumulative - self.weights / 2) / cumulative[-1]
+             * buckets).astype(np.intp),
+            buckets - 1)
+        weights = np.bincount(bucket, weights=self.weights,
+                              minlength=buckets)
+        sums = np.bincount(bucket, weights=self.values * self.weights,
+                           minlength=buckets)
+        kept = weights > 0
+        self.values = sums[kept] / weights[kept]
+        self.weights = weights[kept]
+        self.exact = False
+
+    def distinct_count(self):
+        """
+        Return the number of distinct values, None once it isn't known.
+        """
+        return len(self.values) if self.exact else None
+
+    def _value_at(self, positions):
+        # Value of the row at each 0-based position in sorted order
+        cumulative = np.cumsum(self.weights)
+        return self.values[np.searchsorted(cumulative, positions, "right")]
+
+    def quantile(self, q):
+        """
+        Return quantiles, linearly interpolated like `np.percentile`.
+
+        Args:
+            q (float or array-like): Quantiles, between 0 and 1
+
+        Returns:
+            float or np.ndarray: Quantile values, NaN if the sketch is
+                                 empty
+        """
+        n = self.count
+        if n == 0:
+            return np.full(np.shape(q), np.nan)[()]
+        positions = np.asarray(q, dtype=np.float64) * (n - 1)
+        lower = np.floor(positions)
+        below = self._value_at(lower)
+        above = self._value_at(np.minimum(lower + 1, n - 1))
+        return (below + (above - below) * (positions - lower))[()]
+
+    def box_statistics(self, label, max_fliers=MAX_FLIERS):
+        """
+        Return the box plot statistics of the values.
+
+        Args:
+            label: Group the values belong to
+            max_fliers (int): Outliers kept
+
+        Returns:
+            dict: Statistics in the format of `box_statistics`
+        """
+        n = self.count
+        q1, med, q3 = self.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        values, weights = self.values, self.weights
+        low = values[np.searchsorted(values, q1 - 1.5 * iqr, side="left")]
+        high = values[
+            np.searchsorted(values, q3 + 1.5 * iqr, side="right") - 1]
+        whislo = low if low <= q1 else q1
+        whishi = high if high >= q3 else q3
+
+        # Outliers are read at evenly spread positions among them
+        below = int(weights[:np.searchsorted(values, whislo, "left")].sum())
+        above = int(weights[np.searchsorted(values, whishi, "right"):].sum())
+        picks = np.arange(below + above)
+        if len(picks) > max_fliers:
+            picks = np.linspace(
+                0, len(picks) - 1, max_fliers).round().astype(np.int64)
+        positions = np.where(picks < below, picks, n - above + picks - below)
+        return {
+            "label": label, "n": n, "med": med, "q1": q1, "q3": q3,
+            "whislo": whislo, "whishi": whishi,
+            "fliers": self._value_at(positions),
+        }
+
+
+def _merge_group_means(total, part):
+    """
+    Add up two outputs of `group_mean_statistics`.
+    """
+    x = np.union1d(total["x"], part["x"])
+    merged = {"x": x}
+    for name in ("count", "sum", "sum_sq"):
+        values = np.zeros(len(x))
+        np.add.at(values, np.searchsorted(x, total["x"]), total[name])
+        np.add.at(values, np.searchsorted(x, part["x"]), part[name])
+        merged[name] = values
+    return merged
+
+
+def _bin_codes(values, low, step, bins, offset=0.0):
+    # Bin of each value, with the values outside clipped to the edge bins
+    codes = np.floor((values - low) / step + offset)
+    return np.clip(codes, 0, bins - 1).astype(np.intp)
+
+
+class StreamingSummary:
+    """
+    Statistics of the correlation analysis, accumulated chunk by chunk.
+
+    Each chunk of the EDA frame, with missing values kept as NaN, is
+    added once and then dropped, so memory doesn't grow with the rows.
+    The summary holds:
+
+    - sums, cross products and missing-value counts of all columns,
+      giving the covariances and Pearson correlations of the data
+      imputed with the column medians, as on the in-memory page;
+    - joint counts of rank bins of each pair of columns, giving Spearman
+      correlations, exact for columns holding whole numbers that span
+      fewer than RANK_BINS values and computed from RANK_BINS
+      equal-width bins of ranks otherwise;
+    - a quantile sketch per column, for the medians, and per group of
+      each variable with few values, for box plots;
+    - per-value target sums of the time variables, 2-D counts of each
+      variable against the target, and the target histogram.
+
+    Missing values are imputed with the column median once it's known,
+    at the end. Rows without a target value are left out.
+
+    Args:
+        columns (list): Columns of the EDA frame, the target included
+        target (str): Target variable
+        ranges (dict): Column mapped to the (min, max) of its values,
+                       used to lay out the bins
+    """
+
+    def __init__(self, columns, target, ranges):
+        self.columns = list(columns)
+        self.target = target
+        self.ranges = {
+            column: tuple(float(v) for v in ranges[column])
+            for column in self.columns
+        }
+        k = len(self.columns)
+        self.n = 0
+        self.fingerprint = None
+        self.num_rows = 0
+        self.num_columns = 0
+        self.head = None
+
+        # Moments of the values shifted by the middle of their range
+        self.shift = np.array(
+            [sum(self.ranges[c]) / 2 for c in self.columns])
+        self.minimum = np.full(k, np.inf)
+        self.maximum = np.full(k, -np.inf)
+        self.value_sum = np.zeros(k)
+        self.missing_count = np.zeros(k)
+        self.cross = np.zeros((k, k))
+        self.cross_missing = np.zeros((k, k))
+        self.missing_pairs = np.zeros((k, k))
+        self.sketches = [QuantileSketch() for _ in self.columns]
+
+        # Rank bins: unit bins centered on integers while a column's values
+        # are whole numbers spanning fewer than RANK_BINS, equal-width
+        # bins otherwise
+        self.rank_layout = []
+        for column in self.columns:
+            low, high = self.ranges[column]
+            if high - low < RANK_BINS and float(low).is_integer():
+                bins = int(np.floor(high - low + 0.5)) + 1
+                self.rank_layout.append((low, 1.0, bins, 0.5))
+            else:
+                self.rank_layout.append(self._equal_width_layout(column))
+        self.rank_counts = [
+            np.zeros(bins + 1) for _, _, bins, _ in self.rank_layout]
+        self.rank_joint = {
+            (i, j): np.zeros((self.rank_layout[i][2] + 1)
+                             * (self.rank_layout[j][2] + 1))
+            for i in range(k) for j in range(i + 1, k)
+        }
+
+        # Chart statistics, per variable plotted against the target
+        target_low, target_high = self.ranges[target]
+        self.variables = [c for c in self.columns if c != target]
+        self.groups = {
+            column: {"missing": QuantileSketch()}
+            for column in self.variables
+        }
+        self.group_means = {
+            column: None for column in self.variables if column in TIME_VARS
+        }
+        self.missing_means = {
+            column: np.zeros(3) for column in self.group_means
+        }
+        self.density = {
+            column: np.zeros(DENSITY_BINS * DENSITY_BINS)
+            for column in self.variables
+        }
+        self.density_missing = {
+            column: np.zeros(DENSITY_BINS) for column in self.variables
+        }
+        self.fine_edges = np.linspace(
+            target_low, target_high, HISTOGRAM_FINE_BINS + 1)
+        self.histogram = None
+
+    def _equal_width_layout(self, column):
+        low, high = self.ranges[column]
+        return (low, (high - low) / RANK_BINS or 1.0, RANK_BINS, 0.0)
+
+    def _widen_rank_bins(self, i):
+        """
+        Move a column from unit rank bins to equal-width ones, once it
+        turns out to hold values that aren't whole numbers.
+
+        Every value counted so far was a whole number, alone in its unit
+        bin, so its counts move to its equal-width bin exactly.
+
+        Args:
+            i (int): Position of the column
+        """
+        low, _, bins, _ = self.rank_layout[i]
+        layout = self._equal_width_layout(self.columns[i])
+        new_low, step, new_bins, _ = layout
+        # Missing values keep their own last bin
+        mapping = np.append(
+            _bin_codes(low + np.arange(bins), new_low, step, new_bins),
+            new_bins)
+
+        self.rank_layout[i] = layout
+        self.rank_counts[i] = np.bincount(
+            mapping, weights=self.rank_counts[i], minlength=new_bins + 1)
+        for (a, b), joint in self.rank_joint.items():
+            if i not in (a, b):
+                continue
+            size_a, size_b = (
+                self.rank_layout[a][2] + 1, self.rank_layout[b][2] + 1)
+            if a == i:
+                joint = joint.reshape(bins + 1, size_b)
+                widened = np.zeros((size_a, size_b))
+                np.add.at(widened, mapping, joint)
+            else:
+                joint = joint.reshape(size_a, bins + 1)
+                widened = np.zeros((size_a, size_b))
+                np.add.at(widened.T, mapping, joint.T)
+            self.rank_joint[a, b] = widened.ravel()
+
+    def update(self, frame):
+        """
+        Add a chunk of rows.
+
+        Args:
+            frame (pd.DataFrame): Chunk of the EDA frame, NaN when missing
+        """
+        values = frame.reindex(columns=self.columns).to_numpy(
+            dtype=np.float64, na_value=np.nan)
+        t = self.columns.index(self.target)
+        values = values[~np.isnan(values[:, t])]
+        if not len(values):
+            return
+        self.n += len(values)
+
+        missing = np.isnan(values)
+        weights = missing.astype(np.float64)
+        shifted = np.where(missing, 0.0, values - self.shift)
+        self.value_sum += shifted.sum(axis=0)
+        self.missing_count += weights.sum(axis=0)
+        self.cross += shifted.T @ shifted
+        self.cross_missing += shifted.T @ weights
+        self.missing_pairs += weights.T @ weights
+        with np.errstate(invalid="ignore"):
+            self.minimum = np.fmin(self.minimum, np.nanmin(values, axis=0))
+            self.maximum = np.fmax(self.maximum, np.nanmax(values, axis=0))
+        for sketch, column_values in zip(self.sketches, values.T):
+            sketch.update(column_values)
+
+        for i, (_, _, _, offset) in enumerate(self.rank_layout):
+            column = values[:, i]
+            if offset and not np.array_equal(
+                    column, np.round(column), equal_nan=True):
+                self._widen_rank_bins(i)
+
+        codes = []
+        for i, (low, step, bins, offset) in enumerate(self.rank_layout):
+            code = _bin_codes(
+                np.nan_to_num(values[:, i], nan=low), low, step, bins, offset)
+            code[missing[:, i]] = bins
+            codes.append(code)
+            self.rank_counts[i] += np.bincount(code, minlength=bins + 1)
+        for (i, j), joint in self.rank_joint.items():
+            joint += np.bincount(
+                codes[i] * (self.rank_layout[j][2] + 1) + codes[j],
+                minlength=len(joint))
+
+        self._update_charts(values, missing, t)
+
+    def _update_charts(self, values, missing, t):
+        y = values[:, t]
+        part = histogram_statistics(
+            y, bins=self.fine_edges, grid_size=KDE_GRID_SIZE,
+            value_range=self.ranges[self.target])
+        if self.histogram is None:
+            self.histogram = part
+        else:
+            for name in ("counts", "grid_counts", "n", "sum", "sum_sq"):
+                self.histogram[name] = self.histogram[name] + part[name]
+
+        y_low, y_high = self.ranges[self.target]
+        y_step = (y_high - y_low) / DENSITY_BINS or 1.0
+        y_codes = _bin_codes(y, y_low, y_step, DENSITY_BINS)
+        for column in self.variables:
+            i = self.columns.index(column)
+            x, absent = values[:, i], missing[:, i]
+            present = ~absent
+
+            groups = self.groups[column]
+            if groups is not None:
+                # Count the levels first, so a continuous variable is
+                # dropped before any sketch is built for it
+                levels, inverse = np.unique(x[present], return_inverse=True)
+                if len(levels) > BOX_MAX_GROUPS or len(
+                        groups.keys() - {"missing"} | set(levels.tolist())
+                ) > BOX_MAX_GROUPS:
+                    self.groups[column] = None
+                else:
+                    groups["missing"].update(y[absent])
+                    order = np.argsort(inverse, kind="stable")
+                    splits = np.cumsum(np.bincount(inverse))[:-1]
+                    for value, group_y in zip(
+                            levels, np.split(y[present][order], splits)):
+                        groups.setdefault(value, QuantileSketch()).update(
+                            group_y)
+
+            if column in self.group_means:
+                part = group_mean_statistics(x[present], y[present])
+                total = self.group_means[column]
+                self.group_means[column] = (
+                    part if total is None
+                    else _merge_group_means(total, part))
+                self.missing_means[column] += [
+                    absent.sum(), y[absent].sum(), (y[absent] ** 2).sum()]
+
+            x_low, x_high = self.ranges[column]
+            x_step = (x_high - x_low) / DENSITY_BINS or 1.0
+            x_codes = _bin_codes(x[present], x_low, x_step, DENSITY_BINS)
+            self.density[column] += np.bincount(
+                x_codes * DENSITY_BINS + y_codes[present],
+                minlength=DENSITY_BINS * DENSITY_BINS)
+            self.density_missing[column] += np.bincount(
+                y_codes[absent], minlength=DENSITY_BINS)
+
+    def medians(self):
+        """
+        Return the median of each column over its non-missing values.
+
+        Returns:
+            pd.Series: Column medians, the values missing ones are
+                       imputed with
+        """
+        return pd.Series(
+            [float(s.quantile(0.5)) for s in self.sketches],
+            index=self.columns)
+
+    def _imputed_moments(self):
+        # Sums and cross products once missing values take the median
+        fill = np.where(
+            self.missing_count > 0,
+            np.nan_to_num(self.medians().to_numpy() - self.shift), 0.0)
+        total = self.value_sum + fill * self.missing_count
+        spread = self.cross_missing * fill[np.newaxis, :]
+        cross = (
+            self.cross + spread + spread.T
+            + self.missing_pairs * np.outer(fill, fill))
+        return total, cross
+
+    def _positions_of(self, columns):
+        if columns is None:
+            return np.arange(len(self.columns)), list(self.columns)
+        columns = list(columns)
+        missing = [c for c in columns if c not in self.columns]
+        if missing:
+            raise KeyError(f"Columns not in the streaming summary: {missing}")
+        return np.array([self.columns.index(c) for c in columns]), columns
+
+    def means(self, columns=None):
+        """
+        Return the mean of each column after imputation.
+
+        Args:
+            columns (list): Columns to include, all columns if None
+
+        Returns:
+            pd.Series: Column means
+        """
+        positions, columns = self._positions_of(columns)
+        total, _ = self._imputed_moments()
+        return pd.Series(
+            (self.shift + total / self.n)[positions], index=columns)
+
+    def covariance(self, columns=None):
+        """
+        Return the sample covariance matrix after imputation.
+
+        Args:
+            columns (list): Columns to include, all columns if None
+
+        Returns:
+            pd.DataFrame: Covariance matrix, like `DataFrame.cov`
+        """
+        positions, columns = self._positions_of(columns)
+        total, cross = self._imputed_moments()
+        comoment = cross - np.outer(total, total) / self.n
+        covariance = comoment / (self.n - 1) if self.n > 1 else (
+            np.full_like(comoment, np.nan))
+        return pd.DataFrame(
+            covariance[np.ix_(positions, positions)],
+            index=columns, columns=columns)
+
+    def _rank_comoments(self):
+        # Rank sums and cross products from the joint bin counts
+        k = len(self.columns)
+        fill = []
+        for i, (low, step, bins, offset) in enumerate(self.rank_layout):
+            median = self.sketches[i].quantile(0.5)
+            fill.append(bins if np.isnan(median) else int(_bin_codes(
+                np.array([median]), low, step, bins, offset)[0]))
+
+        def fold(counts, axis, size, slot):
+            # Move the counts of the missing-value bin to the median bin
+            counts = np.moveaxis(counts, axis, 0).copy()
+            if slot != size:
+                counts[slot] += counts[size]
+                counts[size] = 0
+            return np.moveaxis(counts, 0, axis)
+
+        ranks, marginals = [], []
+        for i, (_, _, bins, _) in enumerate(self.rank_layout):
+            counts = fold(self.rank_counts[i], 0, bins, fill[i])
+            ranks.append(np.cumsum(counts) - counts + (counts + 1) / 2)
+            marginals.append(counts)
+
+        cross = np.zeros((k, k))
+        total = np.array([c @ r for c, r in zip(marginals, ranks)])
+        for i in range(k):
+            cross[i, i] = marginals[i] @ ranks[i] ** 2
+        for (i, j), joint in self.rank_joint.items():
+            size_i, size_j = self.rank_layout[i][2], self.rank_layout[j][2]
+            joint = joint.reshape(size_i + 1, size_j + 1)
+            joint = fold(fold(joint, 0, size_i, fill[i]), 1, size_j, fill[j])
+            cross[i, j] = cross[j, i] = ranks[i] @ joint @ ranks[j]
+        return total, cross
+
+    def corr(self, columns=None, method="pearson"):
+        """
+        Return the correlation matrix of a subset of columns.
+
+        Args:
+            columns (list): Columns to include, all columns if None
+            method (str): "pearson" or "spearman"
+
+        Returns:
+            pd.DataFrame: Correlation matrix, like `DataFrame.corr`
+        """
+        if method == "pearson":
+            total, cross = self._imputed_moments()
+        elif method == "spearman":
+            total, cross = self._rank_comoments()
+        else:
+            raise ValueError(
+                f"method must be 'pearson' or 'spearman', got {method!r}")
+
+        positions, columns = self._positions_of(columns)
+        comoment = cross - np.outer(total, total) / max(self.n, 1)
+        spread = np.diag(comoment)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            correlation = comoment / np.sqrt(np.outer(spread, spread))
+        correlation = np.clip(correlation, -1.0, 1.0)
+        np.fill_diagonal(
+            correlation,
+            np.where(np.isnan(np.diag(correlation)), np.nan, 1.0))
+        return pd.DataFrame(
+            correlation[np.ix_(positions, positions)],
+            index=columns, columns=columns)
+
+    def distinct_count(self, column):
+        """
+        Return the number of distinct values of a column.
+
+        Args:
+            column (str): Column name
+
+        Returns:
+            int: Distinct values, None if more than the sketch holds
+        """
+        return self.sketches[self.columns.index(column)].distinct_count()
+
+    def box_statistics(self, column):
+        """
+        Return the box plot statistics of the target per value of a
+        variable, rows missing the variable counted at its median.
+
+        Args:
+            column (str): Variable with at most BOX_MAX_GROUPS values
+
+        Returns:
+            list: Statistics in the format of `box_statistics`, or None if
+                  the variable has too many values
+        """
+        groups = self.groups[column]
+        if groups is None:
+            return None
+        groups = dict(groups)
+        missing = groups.pop("missing")
+        if missing.count:
+            median = self.medians()[column]
+            merged = QuantileSketch()
+            merged.merge(groups.get(median, QuantileSketch()))
+            merged.merge(missing)
+            groups[median] = merged
+        return [
+            groups[value].box_statistics(value) for value in sorted(groups)
+        ]
+
+    def group_mean_statistics(self, column):
+        """
+        Return the target sums per value of a time variable.
+
+        Args:
+            column (str): Variable in TIME_VARS
+
+        Returns:
+            dict: Statistics in the format of `group_mean_statistics`
+        """
+        statistics = self.group_means[column]
+        count, total, total_sq = self.missing_means[column]
+        if count:
+            statistics = _merge_group_means(statistics, {
+                "x": np.array([self.medians()[column]]),
+                "count": np.array([count]),
+                "sum": np.array([total]),
+                "sum_sq": np.array([total_sq]),
+            })
+        return statistics
+
+    def density_statistics(self, column):
+        """
+        Return the 2-D counts of a variable against the target.
+
+        Args:
+            column (str): Variable on the x axis
+
+        Returns:
+            dict: Statistics in the format of `density_statistics`
+        """
+        x_low, x_high = self.ranges[column]
+        y_low, y_high = self.ranges[self.target]
+        counts = self.density[column].reshape(DENSITY_BINS, DENSITY_BINS)
+        counts = counts.copy()
+        if self.density_missing[column].any():
+            x_step = (x_high - x_low) / DENSITY_BINS or 1.0
+            median_bin = _bin_codes(
+                np.array([self.medians()[column]]), x_low, x_step,
+                DENSITY_BINS)[0]
+            counts[median_bin] += self.density_missing[column]
+
+        i, t = self.columns.index(column), self.columns.index(self.target)
+        means = self.means()
+        covariance = self.covariance() * (self.n - 1)
+        return {
+            "x_edges": np.linspace(x_low, x_high, DENSITY_BINS + 1),
+            "y_edges": np.linspace(y_low, y_high, DENSITY_BINS + 1),
+            "counts": counts,
+            "ols": {
+                "n": self.n,
+                "x_mean": means.iloc[i],
+                "y_mean": means.iloc[t],
+                "sxx": covariance.iloc[i, i],
+                "sxy": covariance.iloc[i, t],
+                "syy": covariance.iloc[t, t],
+                "x_min": self.minimum[i],
+                "x_max": self.maximum[i],
+            },
+        }
+
+    def histogram_statistics(self):
+        """
+        Return the target histogram, with seaborn's "auto" bin width.
+
+        Fine bins are merged so the final width is the smaller of the
+        Freedman-Diaconis and Sturges widths, from the target quartiles.
+
+        Returns:
+            dict: Statistics in the format of `histogram_statistics`
+        """
+        statistics = dict(self.histogram)
+        n = statistics["n"]
+        q1, q3 = self.sketches[self.columns.index(self.target)].quantile(
+            [0.25, 0.75])
+        fine_width = self.fine_edges[1] - self.fine_edges[0]
+        width = (self.fine_edges[-1] - self.fine_edges[0]) / (
+            np.log2(n) + 1)
+        if q3 > q1:
+            width = min(width, 2 * (q3 - q1) / np.cbrt(n))
+        group = max(int(width / fine_width), 1) if fine_width else 1
+        starts = np.arange(0, HISTOGRAM_FINE_BINS, group)
+        statistics["counts"] = np.add.reduceat(statistics["counts"], starts)
+        statistics["edges"] = self.fine_edges[
+            np.append(starts, HISTOGRAM_FINE_BINS)]
+        return statistics
+
+    def chart_key(self, chart, **params):
+        """
+        Compute the figure cache key of a chart drawn from this summary.
+
+        Args:
+            chart (str): Chart name
+            **params: Chart parameters
+
+        Returns:
+            str: Hexadecimal key
+        """
+        return hashlib.sha256(json.dumps({
+            "summary": self.fingerprint, "chart": chart, "params": params,
+        }, sort_keys=True, default=str).encode()).hexdigest()
+
+    @classmethod
+    def from_parquet(cls, file_path, variables=EDA_VARIABLES,
+                     target=TARGET_VAR):
+        """
+        Summarize a Parquet file of raw records in one pass.
+
+        Row groups are read one at a time, with only the columns the
+        EDA variables are built from.
+
+        Args:
+            file_path (str): Path to the Parquet file
+            variables (list): Variables to study, as in `build_eda_frame`
+            target (str): Target variable
+
+        Returns:
+            StreamingSummary: Statistics of the whole file
+        """
+        parquet_file = pq.ParquetFile(file_path)
+        empty = parquet_file.schema_arrow.empty_table().to_pandas()
+        columns = list(build_eda_frame(empty, variables, target).columns)
+        if target not in columns:
+            raise KeyError(f"Target {target!r} is not in {file_path}")
+
+        sources, ranges = {}, {}
+        for column in columns:
+            if column in empty.columns:
+                sources[column] = column
+            else:
+                sources[column] = _indicator_source(empty, column)[0]
+                ranges[column] = (0, 1)
+        numeric = [c for c in columns if c not in ranges]
+        ranges.update(_column_ranges(parquet_file, numeric))
+        read_columns = sorted(set(sources.values()))
+
+        summary = cls(columns, target, ranges)
+        stat = os.stat(file_path)
+        summary.fingerprint = (
+            f"{os.path.abspath(file_path)}:{stat.st_size}:"
+            f"{stat.st_mtime_ns}:{STREAMING_VERSION}")
+        summary.num_rows = parquet_file.metadata.num_rows
+        summary.num_columns = parquet_file.metadata.num_columns
+        if parquet_file.num_row_groups:
+            summary.head = parquet_file.read_row_group(0).slice(
+                0, 10).to_pandas()
+        for group in range(parquet_file.num_row_groups):
+            chunk = parquet_file.read_row_group(
+                group, columns=read_columns).to_pandas()
+            summary.update(
+                build_eda_frame(chunk, variables, target, impute=False))
+        return summary
+
+
+def _column_ranges(parquet_file, columns):
+    """
+    Return the value range of numerical columns of a Parquet file.
+
+    Ranges come from the row group statistics, and a column is only read
+    one row group at a time when its statistics are missing.
+
+    Args:
+        parquet_file (pq.ParquetFile): Opened Parquet file
+        columns (list): Numerical column names
+
+    Returns:
+        dict: Column mapped to its (min, max), (0, 0) if it has no values
+    """
+    metadata = parquet_file.metadata
+    positions = {
+        metadata.schema.column(i).name: i
+        for i in range(metadata.num_columns)
+    }
+    ranges = {}
+    for column in columns:
+        low, high = np.inf, -np.inf
+        for group in range(metadata.num_row_groups):
+            chunk = metadata.row_group(group).column(positions[column])
+            statistics = chunk.statistics
+            if statistics is not None and statistics.has_min_max:
+                low = min(low, statistics.min)
+                high = max(high, statistics.max)
+            elif chunk.num_values:
+                values = parquet_file.read_row_group(
+                    group, columns=[column]).column(column)
+                extremes = pc.min_max(values)
+                if extremes["min"].is_valid:
+                    low = min(low, extremes["min"].as_py())
+                    high = max(high, extremes["max"].as_py())
+        ranges[column] = (low, high) if low <= high else (0, 0)
+    return ranges
+
+
+def csv_to_parquet(csv_path, parquet_path, row_group_rows=ROW_GROUP_ROWS):
+    """
+    Convert a CSV file to Parquet block by block, without loading it.
+
+    Integer columns are stored as float64, since a later block may hold
+    fractions or missing values the first one doesn't. Blocks are
+    gathered until they fill a row group, so at most one row group is
+    held in memory.
+
+    Args:
+        csv_path (str): Path to the CSV file
+        parquet_path (str): Path to the Parquet file to write
+        row_group_rows (int): Rows per row group
+    """
+    reader = pacsv.open_csv(csv_path)
+    column_types = {
+        field.name: pa.float64() for field in reader.schema
+        if pa.types.is_integer(field.type)
+    }
+    reader.close()
+    reader = pacsv.open_csv(
+        csv_path,
+        convert_options=pacsv.ConvertOptions(column_types=column_types))
+
+    os.makedirs(os.path.dirname(parquet_path) or ".", exist_ok=True)
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    with pq.ParquetWriter(tmp_path, reader.schema) as writer:
+        pending, pending_rows = [], 0
+        for batch in reader:
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= row_group_rows:
+                writer.write_table(pa.Table.from_batches(pending),
+                                   row_group_size=row_group_rows)
+                pending, pending_rows = [], 0
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending),
+                               row_group_size=row_group_rows)
+    os.replace(tmp_path, parquet_path)
+
+
+def streaming_source(parquet_path=STREAM_PARQUET_PATH,
+                     csv_path=RAW_CSV_PATH):
+    """
+    Return the Parquet file to stream, converting the raw CSV if needed.
+
+    Args:
+        parquet_path (str): Parquet file to stream
+        csv_path (str): CSV file it is converted from when it is missing
+                        or older than the CSV file
+
+    Returns:
+        str: Path to the Parquet file
+    """
+    stale = not os.path.exists(parquet_path) or (
+        os.path.exists(csv_path)
+        and os.path.getmtime(csv_path) > os.path.getmtime(parquet_path))
+    if stale:
+        print(f"Converting {csv_path} to {parquet_path}")
+        csv_to_parquet(csv_path, parquet_path)
+    return parquet_path
+
+
+@st.cache_resource
+def _summary_of(file_path, size, mtime_ns):
+    print(f"Streaming analysis statistics from: {file_path}")
+    return StreamingSummary.from_parquet(file_path)
+
+
+def load_streaming_summary(file_path):
+    """
+    Return the streaming summary of a Parquet file, built once per
+    version of the file and shared by all sessions.
+
+    Args:
+        file_path (str): Path to the Parquet file
+
+    Returns:
+        StreamingSummary: Statistics of the file
+    """
+    stat = os.stat(file_path)
+    return _summary_of(
+        os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def bivariate_figure(summary, col):
+    """
+    Draw the chart of a variable against the target from a summary,
+    picked like `bivariate_chart`.
+
+    Args:
+        summary (StreamingSummary): Statistics of the data
+        col (str): Variable on the x axis
+
+    Returns:
+        Figure: The chart
+    """
+    distinct = summary.distinct_count(col)
+    if distinct is not None and distinct <= BOX_MAX_GROUPS:
+        return box_figure(summary.box_statistics(col), col, summary.target)
+    if col in TIME_VARS:
+        return line_figure(
+            summary.group_mean_statistics(col), col, summary.target)
+    return density_figure(
+        summary.density_statistics(col), col, summary.target)
+
+
+def target_figure(summary):
+    """
+    Draw the target histogram and KDE from a summary.
+
+    Args:
+        summary (StreamingSummary): Statistics of the data
+
+    Returns:
+        Figure: The chart
+    """
+    return histogram_figure(summary.histogram_statistics(), summary.target)
+
+
+def main():
+    """
+    Command-line entry point summarizing a Parquet file out of core.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compute the correlation analysis statistics of a "
+                    "Parquet file one row group at a time."
+    )
+    parser.add_argument("--file", default=None,
+                        help="Parquet file, converted from --csv if unset")
+    parser.add_argument("--csv", default=RAW_CSV_PATH)
+    args = parser.parse_args()
+
+    file_path = args.file or streaming_source(csv_path=args.csv)
+    start = time.perf_counter()
+    summary = StreamingSummary.from_parquet(file_path)
+    print(f"Summarized {summary.n} rows in "
+          f"{time.perf_counter() - start:.2f}s")
+    with pd.option_context("display.width", 200, "display.precision", 3):
+        print("Pearson correlations with the target:")
+        print(summary.corr(method="pearson")[summary.target])
+        print("Spearman correlations with the target:")
+        print(summary.corr(method="spearman")[summary.target])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,518 @@
 import os
+import re
+import time
+import hashlib
 import joblib
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import streamlit as st
 
+# Directory holding the columnar copies of the raw CSV files
+CACHE_DIR = os.path.join("outputs", "datasets", "cache")
+
+# Metadata file describing the columns of the raw datasets
+METADATA_PATH = os.path.join(
+    "inputs", "datasets", "raw", "house-metadata.txt"
+    )
+
+# Parquet metadata keys storing how a cache file was built
+SOURCE_HASH_KEY = b"source_sha256"
+SCHEMA_HASH_KEY = b"dtype_schema_sha256"
+RAW_MEMORY_KEY = b"raw_memory_bytes"
+
+# Hit/miss and load time of the most recent load, per dataset name
+load_stats = {}
+
+
+def file_content_hash(file_path, chunk_size=1024 * 1024):
+    """
+    Compute the SHA-256 hash of a file's content.
+
+    Args:
+        file_path (str): Path to the file
+        chunk_size (int): Number of bytes read per chunk
+
+    Returns:
+        str: Hexadecimal digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def frame_content_hash(df):
+    """
+    Compute a SHA-256 hash of a DataFrame's columns, dtypes and values.
+
+    Args:
+        df (pd.DataFrame): Data to hash
+
+    Returns:
+        str: Hexadecimal digest, equal for frames holding the same data
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+    digest.update(
+        pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def parse_house_metadata(file_path=METADATA_PATH):
+    """
+    Parse the dataset metadata file into a description of each column.
+
+    Args:
+        file_path (str): Path to the metadata text file
+
+    Returns:
+        dict: Column name mapped to a dict with a "description" and either
+              a numeric "range" (min, max) or a list of value "codes"
+    """
+    metadata = {}
+    column = None
+    with open(file_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if not line[0].isspace():
+                # Unindented lines start a new column, e.g. "LotArea: ..."
+                column, description = line.split(":", 1)
+                column = column.strip()
+                metadata[column] = {"description": description.strip()}
+                continue
+
+            value = line.strip().rstrip(";|").strip()
+            range_match = re.fullmatch(r"(-?\d+)\s*-\s*(-?\d+)", value)
+            if range_match:
+                metadata[column]["range"] = (
+                    int(range_match.group(1)), int(range_match.group(2))
+                )
+            else:
+                code = value.split(":", 1)[0].strip()
+                metadata[column].setdefault("codes", []).append(code)
+    return metadata
+
+
+def smallest_int_dtype(min_value, max_value):
+    """
+    Return the smallest signed integer dtype that holds a value range.
+
+    Args:
+        min_value (int): Smallest value to hold
+        max_value (int): Largest value to hold
+
+    Returns:
+        np.dtype: Smallest fitting integer dtype
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= min_value and max_value <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def build_dtype_schema(metadata=None):
+    """
+    Build a compact dtype for each column described in the metadata.
+
+    Columns with text codes (e.g. `KitchenQual`) become categoricals,
+    numeric rating scales and value ranges become the smallest integer
+    dtype that holds the documented range.
+
+    Args:
+        metadata (dict): Parsed metadata, read from METADATA_PATH if None
+
+    Returns:
+        dict: Column name mapped to its target dtype
+    """
+    if metadata is None:
+        metadata = parse_house_metadata()
+
+    schema = {}
+    for column, info in metadata.items():
+        codes = info.get("codes")
+        if codes and all(code.isdigit() for code in codes):
+            values = [int(code) for code in codes]
+            schema[column] = smallest_int_dtype(min(values), max(values))
+        elif codes:
+            schema[column] = pd.CategoricalDtype(categories=codes)
+        elif "range" in info:
+            schema[column] = smallest_int_dtype(*info["range"])
+    return schema
+
+
+def apply_dtype_schema(df, schema):
+    """
+    Cast the columns of a DataFrame to the compact dtypes of a schema.
+
+    Integer columns with missing values use the nullable integer dtype,
+    and the dtype is widened when the data falls outside the documented
+    range. Numeric columns holding fractions keep their dtype, and codes
+    missing from the metadata are added as extra categories, so the cast
+    never changes a value.
+
+    Args:
+        df (pd.DataFrame): Data to convert
+        schema (dict): Column name mapped to its target dtype
+
+    Returns:
+        pd.DataFrame: Data with compact dtypes
+    """
+    converted = {}
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+
+        if isinstance(dtype, pd.CategoricalDtype):
+            if pd.api.types.is_numeric_dtype(series):
+                continue
+            values = series.dropna().unique()
+            extra = sorted(set(values) - set(dtype.categories))
+            if extra:
+                dtype = pd.CategoricalDtype(list(dtype.categories) + extra)
+            converted[column] = series.astype(dtype)
+            continue
+
+        if not pd.api.types.is_numeric_dtype(series):
+            continue
+        values = series.dropna().to_numpy(dtype="float64")
+        if len(values) and not np.all(np.mod(values, 1) == 0):
+            continue
+        if len(values):
+            dtype = np.promote_types(
+                dtype, smallest_int_dtype(values.min(), values.max())
+            )
+        if series.hasnans:
+            # Nullable integer dtype, e.g. "Int16"
+            dtype = pd.api.types.pandas_dtype(dtype.name.capitalize())
+        converted[column] = series.astype(dtype)
+
+    return df.assign(**converted)
+
+
+def schema_fingerprint(schema):
+    """
+    Compute a hash identifying a dtype schema.
+
+    Args:
+        schema (dict): Column name mapped to its target dtype
+
+    Returns:
+        str: Hexadecimal digest of the schema
+    """
+    items = sorted((column, repr(dtype)) for column, dtype in schema.items())
+    text = repr(items)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def frame_memory(df):
+    """
+    Return the memory used by a DataFrame, including object contents.
+
+    Args:
+        df (pd.DataFrame): Data to measure
+
+    Returns:
+        int: Memory usage in bytes
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def read_cached_parquet(cache_path, build_keys):
+    """
+    Read a cached Parquet file if it was built from the given inputs.
+
+    Args:
+        cache_path (str): Path to the cached Parquet file
+        build_keys (dict): Metadata keys and values the cache must match
+
+    Returns:
+        tuple: Cached data and its Parquet metadata, or (None, None) if the
+               cache is missing or stale
+    """
+    if not os.path.exists(cache_path):
+        return None, None
+    try:
+        metadata = pq.read_schema(cache_path).metadata or {}
+        for key, value in build_keys.items():
+            if metadata.get(key) != value:
+                return None, None
+        return pd.read_parquet(cache_path), metadata
+    except (OSError, pa.ArrowException) as e:
+        print(f"Ignoring unreadable cache file {cache_path}: {e}")
+        return None, None
+
+
+def write_cached_parquet(df, cache_path, metadata):
+    """
+    Write a DataFrame to Parquet with an explicit schema and build metadata.
+
+    The file is written to a temporary path first and then renamed, so
+    workers starting at the same time never read a half-written cache.
+
+    Args:
+        df (pd.DataFrame): Data to cache
+        cache_path (str): Path to the cached Parquet file
+        metadata (dict): Extra key/value pairs stored in the file schema
+    """
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    schema = schema.with_metadata({**(schema.metadata or {}), **metadata})
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, cache_path)
+
+
+def load_csv_cached(file_path, name, dtype_schema=None):
+    """
+    Load a CSV file through a columnar Parquet cache.
+
+    The first load parses the CSV, casts it to the compact dtypes of
+    `dtype_schema` and stores it as Parquet. Later loads read the Parquet
+    file, and the cache is rebuilt only when the CSV's content hash or
+    the schema changes. The cache outcome, load time and memory saved by
+    the schema are recorded in `load_stats`, with the dataset version:
+    a hash of the CSV content and the schema, which together determine
+    the loaded data.
+
+    Args:
+        file_path (str): Path to the CSV file
+        name (str): Dataset name used for the cache file and `load_stats`
+        dtype_schema (dict): Column name mapped to its target dtype
+
+    Returns:
+        pd.DataFrame: Data loaded from the cache or the CSV file
+    """
+    start = time.perf_counter()
+    cache_path = os.path.join(CACHE_DIR, f"{name}.parquet")
+    source_hash = file_content_hash(file_path)
+    build_keys = {
+        SOURCE_HASH_KEY: source_hash.encode(),
+        SCHEMA_HASH_KEY: schema_fingerprint(dtype_schema or {}).encode(),
+    }
+
+    df, metadata = read_cached_parquet(cache_path, build_keys)
+    cache_hit = df is not None
+    if cache_hit:
+        raw_memory = int(metadata.get(RAW_MEMORY_KEY, 0))
+    else:
+        df = pd.read_csv(file_path)
+        raw_memory = frame_memory(df)
+    if dtype_schema:
+        # Also restores unused categories, which Parquet does not keep
+        df = apply_dtype_schema(df, dtype_schema)
+    if not cache_hit:
+        try:
+            write_cached_parquet(df, cache_path, {
+                **build_keys, RAW_MEMORY_KEY: str(raw_memory).encode()
+            })
+        except OSError as e:
+            print(f"Could not write cache file {cache_path}: {e}")
+
+    memory = frame_memory(df)
+    load_stats[name] = {
+        "cache": "hit" if cache_hit else "miss",
+        "load_time": time.perf_counter() - start,
+        "source_hash": source_hash,
+        "version": hashlib.sha256(b"".join(build_keys.values())).hexdigest(),
+        "memory_before": raw_memory,
+        "memory_after": memory,
+        "memory_saved": raw_memory - memory,
+    }
+    print(
+        f"Loaded {name} (cache {load_stats[name]['cache']}) "
+        f"in {load_stats[name]['load_time']:.3f}s, "
+        f"memory {raw_memory / 1024:.1f} KB -> {memory / 1024:.1f} KB"
+    )
+    return df
+
+
+def _read_only_array(array):
+    """
+    Return a copy of a NumPy array that can't be written to.
+    """
+    array = np.array(array)
+    array.flags.writeable = False
+    return array
+
+
+def _read_only_column(column):
+    """
+    Copy a column into arrays that can't be written to.
+
+    Categorical columns keep their categories and read-only codes, and
+    nullable integer, float and boolean columns keep read-only values
+    and missing flags. Other extension types are copied as they are.
+
+    Args:
+        column (pd.Series): Column to copy
+
+    Returns:
+        np.ndarray or ExtensionArray: Read-only values of the column
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return pd.Categorical.from_codes(
+            _read_only_array(column.cat.codes.to_numpy()),
+            dtype=column.dtype)
+    masked = (
+        pd.arrays.IntegerArray, pd.arrays.FloatingArray,
+        pd.arrays.BooleanArray,
+    )
+    if isinstance(column.array, masked):
+        values = column.array.to_numpy(
+            dtype=column.dtype.numpy_dtype, na_value=0)
+        return type(column.array)(
+            _read_only_array(values),
+            _read_only_array(column.isna().to_numpy()))
+    if isinstance(column.dtype, np.dtype):
+        return _read_only_array(column.to_numpy())
+    return column.array.copy()
+
+
+def freeze_frame(df):
+    """
+    Return a copy of a DataFrame backed by read-only buffers, so in-place
+    writes raise instead of changing data shared between sessions.
+
+    Every column gets its own read-only array, built through public
+    pandas API only; the copy happens once, when the shared data is
+    loaded.
+
+    Args:
+        df (pd.DataFrame): Data to freeze
+
+    Returns:
+        pd.DataFrame: Frozen copy with the same columns, dtypes and index
+    """
+    frozen = pd.DataFrame(
+        {
+            position: _read_only_column(df.iloc[:, position])
+            for position in range(df.shape[1])
+        },
+        index=df.index, copy=False,
+    )
+    frozen.columns = df.columns
+    return frozen
+
+
+def shared_view(df):
+    """
+    Return a new DataFrame object backed by the buffers of `df`.
+
+    Adding or replacing columns on the view leaves `df` untouched, and
+    nothing is copied until a column is replaced.
+
+    Args:
+        df (pd.DataFrame): Frozen base data
+
+    Returns:
+        pd.DataFrame: View of the base data
+    """
+    return df.copy(deep=False)
+
+
+def derive_frame(base, columns):
+    """
+    Layer new or replaced columns on top of shared base data.
+
+    Use this instead of assigning to, or calling `fillna(inplace=True)`
+    on, a frame returned by the loaders. Only the given columns are
+    materialized, every other column keeps pointing at the base buffers.
+
+    Args:
+        base (pd.DataFrame): Frame returned by one of the loaders
+        columns (dict): Column name mapped to its new values, or to a
+                        callable that takes the derived frame and returns
+                        the values
+
+    Returns:
+        pd.DataFrame: Derived frame with the layered columns
+    """
+    derived = shared_view(base)
+    for name, values in columns.items():
+        derived[name] = values(derived) if callable(values) else values
+    return derived
+
 
 @st.cache_resource
-def load_pricing_data():
+def _load_shared_pricing_data():
     """
-    Load raw house pricing dataset from CSV file.
+    Load the house pricing dataset once per process, with frozen buffers.
 
     Returns:
-        pd.DataFrame: Raw house pricing data
+        tuple: Raw house pricing data shared by all sessions, and its
+               dataset version
     """
     file_path = os.path.join(
         "inputs", "datasets", "raw", "house_prices_records.csv"
         )
     print(f"Loading house pricing data from: {file_path}")
-    df = pd.read_csv(file_path)
-    return df
+    df = load_csv_cached(
+        file_path, "house_prices_records", build_dtype_schema()
+        )
+    return freeze_frame(df), load_stats["house_prices_records"]["version"]
 
 
 @st.cache_resource
-def load_inherited_data():
+def _load_shared_inherited_data():
     """
-    Load raw inherited house prices from CSV file.
+    Load the inherited houses dataset once per process, with frozen buffers.
 
     Returns:
-        pd.DataFrame: Raw inherited house pricing data
+        pd.DataFrame: Raw inherited house data shared by all sessions
     """
     file_path = os.path.join(
         "inputs", "datasets", "raw", "inherited_houses.csv"
         )
     print(f"Loading inherited house data from: {file_path}")
-    df_inherited = pd.read_csv(file_path)
-    return df_inherited
+    df_inherited = load_csv_cached(
+        file_path, "inherited_houses", build_dtype_schema()
+        )
+    return freeze_frame(df_inherited)
+
+
+def load_pricing_data():
+    """
+    Load raw house pricing dataset from CSV file.
+
+    The returned frame is a read-only view of data shared by every
+    session. Use `derive_frame` to add or replace columns.
+
+    Returns:
+        pd.DataFrame: Raw house pricing data
+    """
+    return shared_view(_load_shared_pricing_data()[0])
+
+
+def pricing_data_version():
+    """
+    Return the version of the house pricing data `load_pricing_data`
+    hands out, to key results derived from it without hashing its rows.
+
+    Returns:
+        str: Hash of the CSV content and the dtype schema
+    """
+    return _load_shared_pricing_data()[1]
+
+
+def load_inherited_data():
+    """
+    Load raw inherited house prices from CSV file.
+
+    The returned frame is a read-only view of data shared by every
+    session. Use `derive_frame` to add or replace columns.
+
+    Returns:
+        pd.DataFrame: Raw inherited house pricing data
+    """
+    return shared_view(_load_shared_inherited_data())
 
 
 def load_pkl_file(file_path):
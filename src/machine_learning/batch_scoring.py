@@ -0,0 +1,323 @@
+import os
+import time
+import argparse
+import concurrent.futures
+from collections import deque
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.data_management import load_pkl_file
+from src.machine_learning.fast_inference import fast_predict
+from src.machine_learning.predictive_analysis import normalize_features
+
+# Name of the predicted price column in the output file
+PREDICTION_COLUMN = "PredictedSalePrice"
+
+# Pipeline used by the scoring worker of the current process
+_worker_pipeline = None
+
+
+def iter_input_chunks(file_path, chunk_size, columns):
+    """
+    Stream a CSV or Parquet file in chunks of rows.
+
+    Only `columns` are read; the ones missing from the file are left out.
+
+    Args:
+        file_path (str): Path to a `.csv` or `.parquet` file
+        chunk_size (int): Rows per chunk
+        columns (list): Columns to read
+
+    Yields:
+        pd.DataFrame: Next chunk of rows, in file order
+    """
+    wanted = set(columns)
+    if file_path.endswith(".parquet"):
+        parquet_file = pq.ParquetFile(file_path)
+        present = [
+            name for name in parquet_file.schema_arrow.names
+            if name in wanted
+        ]
+        for batch in parquet_file.iter_batches(
+                batch_size=chunk_size, columns=present):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(
+            file_path, usecols=lambda name: name in wanted,
+            chunksize=chunk_size,
+        )
+
+
+def _init_worker(pipeline_path):
+    """
+    Load the pipeline once in each scoring process.
+
+    Args:
+        pipeline_path (str): Path to the fitted pipeline
+    """
+    global _worker_pipeline
+    _worker_pipeline = load_pkl_file(pipeline_path)
+
+
+def score_chunk(chunk, keep_columns, pipeline=None):
+    """
+    Normalize and predict one chunk of house records.
+
+    Args:
+        chunk (pd.DataFrame): Raw house records
+        keep_columns (list): Input columns copied to the output
+        pipeline (Pipeline): Fitted pipeline, the worker's pipeline if None
+
+    Returns:
+        pd.DataFrame: The kept columns and the predicted prices
+    """
+    pipeline = pipeline if pipeline is not None else _worker_pipeline
+    house_features = list(pipeline.feature_names_in_)
+    X = normalize_features(chunk, house_features)
+    predictions = fast_predict(X, pipeline)
+    if predictions is None:
+        predictions = pipeline.predict(X)
+
+    scored = chunk.reindex(columns=keep_columns)
+    scored[PREDICTION_COLUMN] = predictions
+    return scored.reset_index(drop=True)
+
+
+def _first_failing_row(chunk, keep_columns, pipeline):
+    """
+    Bisect a chunk that failed to score down to its first bad row.
+
+    Args:
+        chunk (pd.DataFrame): Raw house records that failed to score
+        keep_columns (list): Input columns copied to the output
+        pipeline (Pipeline): Fitted pipeline
+
+    Returns:
+        int: Position of the row in the chunk, or None if the rows only
+             fail together
+    """
+    low, high = 0, len(chunk)
+    while high - low > 1:
+        middle = (low + high) // 2
+        try:
+            score_chunk(chunk.iloc[low:middle], keep_columns, pipeline)
+        except Exception:
+            high = middle
+        else:
+            low = middle
+    try:
+        score_chunk(chunk.iloc[low:low + 1], keep_columns, pipeline)
+    except Exception:
+        return low
+    return None
+
+
+def output_schema(input_path, keep_columns):
+    """
+    Compute the output schema of a Parquet input, known before reading.
+
+    Args:
+        input_path (str): Path to a `.csv` or `.parquet` file
+        keep_columns (list): Input columns copied to the output
+
+    Returns:
+        pa.Schema: Kept columns with their input types, NaN-filled float64
+                   when missing, and the predictions; None for CSV input,
+                   whose types are only known from its rows
+    """
+    if not input_path.endswith(".parquet"):
+        return None
+    schema = pq.read_schema(input_path)
+    fields = [
+        schema.field(name) if name in schema.names
+        else pa.field(name, pa.float64())
+        for name in keep_columns
+    ]
+    return pa.schema(fields + [pa.field(PREDICTION_COLUMN, pa.float64())])
+
+
+class _ParquetSink:
+    """
+    Append scored chunks to a Parquet file, one row group per chunk.
+
+    Every chunk is converted to one schema: `schema` when known upfront,
+    else the schema of the first chunk, so a column read as int in one
+    chunk and float in another is written with a single type. The file is
+    written under a temporary name and renamed on `close`, so readers
+    never see a partial output; without any chunk it holds no rows.
+
+    Args:
+        file_path (str): Path to the output `.parquet` file
+        keep_columns (list): Input columns copied to the output
+        schema (pa.Schema): Output schema, see `output_schema`
+    """
+
+    def __init__(self, file_path, keep_columns, schema=None):
+        self.file_path = file_path
+        self.tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        self.keep_columns = keep_columns
+        self.schema = schema
+        self.writer = None
+        self.rows = 0
+
+    def write(self, df):
+        if self.writer is None:
+            if self.schema is None:
+                self.schema = pa.Schema.from_pandas(df, preserve_index=False)
+            self.writer = pq.ParquetWriter(self.tmp_path, self.schema)
+        # NaN of missing values becomes null, e.g. in int columns
+        table = pa.Table.from_pandas(
+            df, schema=self.schema, preserve_index=False)
+        self.writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self.writer is None:
+            empty = pd.DataFrame(columns=self.keep_columns)
+            empty[PREDICTION_COLUMN] = pd.Series(dtype="float64")
+            self.write(empty)
+        self.writer.close()
+        os.replace(self.tmp_path, self.file_path)
+
+    def abort(self):
+        if self.writer is not None:
+            self.writer.close()
+            os.remove(self.tmp_path)
+
+
+def score_file(input_path, output_path, pipeline_path, keep_columns=(),
+               chunk_size=100_000, workers=None, report_every=10):
+    """
+    Score a portfolio of house records and write predictions to Parquet.
+
+    Chunks are scored in a process pool and written in input order, so
+    row N of the output belongs to row N of the input. At most two chunks
+    per worker are in flight, which bounds memory use whatever the input
+    size.
+
+    Args:
+        input_path (str): Path to a `.csv` or `.parquet` file
+        output_path (str): Path to the output `.parquet` file
+        pipeline_path (str): Path to the fitted pipeline
+        keep_columns (list): Input columns copied to the output, e.g. ids
+        chunk_size (int): Rows scored per task
+        workers (int): Scoring processes, the CPU count if None; with 1
+                       chunks are scored in this process
+        report_every (int): Chunks between progress reports
+
+    Returns:
+        dict: Rows scored, seconds taken and rows per second
+    """
+    pipeline = load_pkl_file(pipeline_path)
+    keep_columns = list(keep_columns)
+    columns = list(pipeline.feature_names_in_) + keep_columns
+    chunks = iter_input_chunks(input_path, chunk_size, columns)
+    workers = workers or os.cpu_count() or 1
+
+    sink = _ParquetSink(
+        output_path, keep_columns, output_schema(input_path, keep_columns))
+    start = time.perf_counter()
+
+    def report(done):
+        elapsed = time.perf_counter() - start
+        print(f"Scored {sink.rows:,} rows in {done} chunks "
+              f"({sink.rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    def write(done, chunk, score):
+        # Failures name the chunk and the input rows it holds
+        try:
+            scored = score()
+        except Exception as e:
+            row = _first_failing_row(chunk, keep_columns, pipeline)
+            where = "" if row is None else (
+                f", first failing row {sink.rows + row:,}")
+            raise ValueError(
+                f"Could not score chunk {done} (input rows {sink.rows:,} "
+                f"to {sink.rows + len(chunk) - 1:,}{where}): {e}") from e
+        try:
+            sink.write(scored)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(
+                f"Could not write chunk {done} (input rows {sink.rows:,} "
+                f"to {sink.rows + len(chunk) - 1:,}): {e}") from e
+        if done % report_every == 0:
+            report(done)
+
+    try:
+        if workers == 1:
+            for done, chunk in enumerate(chunks, start=1):
+                write(done, chunk, lambda: score_chunk(
+                    chunk, keep_columns, pipeline))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker,
+                    initargs=(pipeline_path,)) as pool:
+                pending = deque()
+                done = 0
+                for chunk in chunks:
+                    pending.append((chunk, pool.submit(
+                        score_chunk, chunk, keep_columns)))
+                    if len(pending) >= 2 * workers:
+                        chunk, future = pending.popleft()
+                        done += 1
+                        write(done, chunk, future.result)
+                while pending:
+                    chunk, future = pending.popleft()
+                    done += 1
+                    write(done, chunk, future.result)
+    except BaseException:
+        sink.abort()
+        raise
+    sink.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": sink.rows,
+        "seconds": elapsed,
+        "rows_per_second": sink.rows / max(elapsed, 1e-9),
+    }
+
+
+def main():
+    """
+    Command-line entry point to score a portfolio of house records.
+    """
+    parser = argparse.ArgumentParser(
+        description="Predict sale prices for a CSV or Parquet file of "
+                    "house records."
+    )
+    parser.add_argument("input", help="Input .csv or .parquet file")
+    parser.add_argument("output", help="Output .parquet file")
+    parser.add_argument(
+        "--version-dir",
+        default=os.path.join("outputs", "ml_pipeline", "predict_price", "v1"),
+        help="Model version directory holding regression_pipeline.pkl",
+    )
+    parser.add_argument(
+        "--keep", nargs="*", default=[],
+        help="Input columns copied to the output, e.g. an id column",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=100_000,
+        help="Rows scored per task (default: 100000)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Scoring processes (default: number of CPUs)",
+    )
+    args = parser.parse_args()
+
+    report = score_file(
+        args.input, args.output,
+        os.path.join(args.version_dir, "regression_pipeline.pkl"),
+        keep_columns=args.keep, chunk_size=args.chunk_size,
+        workers=args.workers,
+    )
+    print(
+        f"Scored {report['rows']:,} rows in {report['seconds']:.1f}s "
+        f"({report['rows_per_second']:,.0f} rows/s) into {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+import os
+import argparse
+import numpy as np
+from sklearn.pipeline import Pipeline
+from src.data_management import load_pkl_file
+from src.machine_learning.model_bundle import load_training_data
+
+# File name of the exported forest inside a model version directory
+COMPILED_FOREST_FILE = "compiled_forest.npz"
+
+
+class CompiledForest:
+    """
+    Fitted regression trees flattened into contiguous NumPy node arrays.
+
+    All trees share one set of node arrays, with child indices pointing
+    into those arrays. Leaves point to themselves, so a batch of rows can
+    walk every tree at once for a fixed number of steps. Predictions
+    match the fitted sklearn model bit for bit: rows are compared as
+    float32 like sklearn does, and tree outputs are summed in estimator
+    order before averaging.
+
+    Args:
+        feature (np.ndarray): Feature index tested at each node
+        threshold (np.ndarray): Split threshold of each node
+        left (np.ndarray): Index of the left child of each node
+        right (np.ndarray): Index of the right child of each node
+        value (np.ndarray): Predicted value of each node
+        roots (np.ndarray): Index of the root node of each tree
+        max_depth (int): Depth of the deepest tree
+        n_features_in (int): Number of features the model was fitted on
+        pipeline_hash (str): Content hash of the pipeline file the forest
+                             was compiled from, if known
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots,
+                 max_depth, n_features_in, pipeline_hash=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features_in)
+        self.pipeline_hash = pipeline_hash
+
+    @classmethod
+    def from_estimator(cls, model, pipeline_hash=None):
+        """
+        Flatten a fitted tree or forest regressor.
+
+        Args:
+            model: Fitted single-output regressor exposing `estimators_`
+                   (e.g. ExtraTreesRegressor) or `tree_`
+            pipeline_hash (str): Content hash of the pipeline file holding
+                                 the model, if known
+
+        Returns:
+            CompiledForest: Flattened model
+        """
+        if hasattr(model, "estimators_"):
+            trees = [estimator.tree_ for estimator in model.estimators_]
+        elif hasattr(model, "tree_"):
+            trees = [model.tree_]
+        else:
+            raise TypeError(
+                f"Cannot compile {type(model).__name__}, "
+                "expected a fitted tree or forest regressor"
+            )
+        if any(tree.n_outputs != 1 for tree in trees):
+            raise ValueError("Only single-output regressors are supported")
+
+        features, thresholds, lefts, rights, values, roots = (
+            [], [], [], [], [], []
+        )
+        offset = 0
+        for tree in trees:
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            # Leaves loop back to themselves and always go "left"
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(
+                np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(
+                np.where(is_leaf, node_ids, tree.children_right) + offset)
+            values.append(tree.value[:, 0, 0])
+            offset += tree.node_count
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max(tree.max_depth for tree in trees),
+            n_features_in=model.n_features_in_,
+            pipeline_hash=pipeline_hash,
+        )
+
+    def save(self, file_path):
+        """
+        Export the node arrays to an uncompressed `.npz` file.
+
+        Args:
+            file_path (str): Path to the output file
+        """
+        arrays = {}
+        if self.pipeline_hash is not None:
+            arrays["pipeline_hash"] = np.array(self.pipeline_hash)
+        np.savez(
+            file_path,
+            feature=self.feature, threshold=self.threshold,
+            left=self.left, right=self.right, value=self.value,
+            roots=self.roots, max_depth=self.max_depth,
+            n_features_in=self.n_features_in_, **arrays
+        )
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load node arrays exported with `save`.
+
+        Args:
+            file_path (str): Path to the `.npz` file
+
+        Returns:
+            CompiledForest: Flattened model, with the `pipeline_hash` it was
+                            saved with (None for files exported without)
+        """
+        with np.load(file_path, allow_pickle=False) as arrays:
+            pipeline_hash = (
+                str(arrays["pipeline_hash"])
+                if "pipeline_hash" in arrays.files else None
+            )
+            return cls(pipeline_hash=pipeline_hash, **{
+                name: arrays[name] for name in (
+                    "feature", "threshold", "left", "right", "value",
+                    "roots", "max_depth", "n_features_in")
+            })
+
+    def predict(self, X, chunk_size=8192):
+        """
+        Predict target values for a batch of rows.
+
+        Args:
+            X (array-like): Rows of shape (n_samples, n_features)
+            chunk_size (int): Rows evaluated at a time, bounding the memory
+                              used for node indices
+
+        Returns:
+            np.ndarray: Predicted values
+
+        Raises:
+            ValueError: If X has another number of features, or holds
+                        missing or infinite values, like sklearn does
+        """
+        # sklearn evaluates trees on float32 input
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has shape {X.shape}, expected "
+                f"(n_samples, {self.n_features_in_})"
+            )
+        if not np.isfinite(X).all():
+            if np.isnan(X).any():
+                raise ValueError("Input X contains NaN.")
+            raise ValueError(
+                "Input X contains infinity or a value too large for "
+                "dtype('float32').")
+        predictions = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_size):
+            chunk = X[start:start + chunk_size]
+            predictions[start:start + len(chunk)] = self._predict_chunk(chunk)
+        return predictions
+
+    def _predict_chunk(self, X):
+        """
+        Walk all trees for a chunk of rows and average the leaf values.
+
+        Args:
+            X (np.ndarray): float32 rows of shape (n_samples, n_features)
+
+        Returns:
+            np.ndarray: Predicted values
+        """
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.repeat(self.roots[np.newaxis, :], X.shape[0], axis=0)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        # Sum trees one by one in estimator order, like sklearn, so the
+        # floating point result is identical
+        leaf_values = self.value[nodes]
+        y_hat = np.zeros(X.shape[0], dtype=np.float64)
+        for tree in range(leaf_values.shape[1]):
+            y_hat += leaf_values[:, tree]
+        y_hat /= leaf_values.shape[1]
+        return y_hat
+
+
+def compile_pipeline(pipeline, compiled_forest=None):
+    """
+    Return a copy of a pipeline whose final model is a CompiledForest.
+
+    The fitted preprocessing steps are shared with the original pipeline.
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline ending in a tree regressor
+        compiled_forest (CompiledForest): Previously exported forest for
+                                          this pipeline, compiled if None
+
+    Returns:
+        Pipeline: Pipeline with identical predictions
+    """
+    name, model = pipeline.steps[-1]
+    if compiled_forest is None:
+        compiled_forest = CompiledForest.from_estimator(model)
+    return Pipeline(pipeline.steps[:-1] + [(name, compiled_forest)])
+
+
+def export_compiled_forest(pipeline, file_path, pipeline_hash=None):
+    """
+    Flatten the final model of a fitted pipeline and save it to disk.
+
+    The file is written under a temporary name and then renamed, so
+    readers never load a half-written forest.
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline ending in a tree regressor
+        file_path (str): Path to the output `.npz` file
+        pipeline_hash (str): Content hash of the pipeline file, stored so
+                             loaders can tell the forest is up to date
+
+    Returns:
+        CompiledForest: The exported forest
+    """
+    compiled_forest = CompiledForest.from_estimator(
+        pipeline.steps[-1][1], pipeline_hash)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp.npz"
+    compiled_forest.save(tmp_path)
+    os.replace(tmp_path, file_path)
+    return compiled_forest
+
+
+def _predict_outcome(predict, X):
+    """
+    Return the predictions of X, or the error raised for it.
+    """
+    try:
+        return predict(X)
+    except ValueError as e:
+        return e
+
+
+def check_parity(pipeline, X):
+    """
+    Check that the compiled pipeline behaves exactly like the fitted one.
+
+    Predictions of `X` must be identical, and rows with a missing or an
+    infinite model input must be rejected by both with a ValueError.
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline ending in a tree regressor
+        X (pd.DataFrame): Valid rows of the pipeline's features
+
+    Returns:
+        dict: Name of each check mapped to whether it passed
+    """
+    compiled = compile_pipeline(pipeline)
+    model, forest = pipeline.steps[-1][1], compiled.steps[-1][1]
+    X_model = np.asarray(pipeline[:-1].transform(X), dtype=np.float64)
+    checks = {
+        "predictions": np.array_equal(
+            pipeline.predict(X), compiled.predict(X)),
+    }
+    for name, value in (("missing", np.nan), ("infinite", np.inf)):
+        invalid = X_model.copy()
+        invalid[0, 0] = value
+        outcomes = [
+            _predict_outcome(predict, invalid)
+            for predict in (model.predict, forest.predict)
+        ]
+        checks[f"rejects {name}"] = all(
+            isinstance(outcome, ValueError) for outcome in outcomes)
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check compiled forests against the fitted pipelines "
+                    "of model versions.")
+    parser.add_argument(
+        "version_dirs", nargs="+", help="Model version directories")
+    args = parser.parse_args()
+
+    failed = False
+    for version_dir in args.version_dirs:
+        pipeline = load_pkl_file(
+            os.path.join(version_dir, "regression_pipeline.pkl"))
+        X_test = load_training_data(version_dir)["X_test"].reindex(
+            columns=pipeline.feature_names_in_, fill_value=0)
+        checks = check_parity(pipeline, X_test)
+        failed = failed or not all(checks.values())
+        print(f"{version_dir}: " + ", ".join(
+            f"{name} {'ok' if passed else 'FAILED'}"
+            for name, passed in checks.items()
+        ))
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,24 @@
-import numpy as np
-import pandas as pd
 import streamlit as st
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
+# Names of the metrics, as displayed
+METRIC_LABELS = {
+    "mae": "Mean Absolute Error (MAE)",
+    "mse": "Mean Squared Error (MSE)",
+    "rmse": "Root Mean Squared Error (RMSE)",
+    "r2": "R² Score",
+}
 
-def regression_performance(X_train, y_train, X_test, y_test, pipeline):
+# Column headers of the metrics in segment tables
+METRIC_COLUMNS = {"mae": "MAE", "mse": "MSE", "rmse": "RMSE", "r2": "R²"}
+
+
+def regression_performance(evaluation):
     """
-    Evaluates the performance of a regression model on both training and
+    Displays the performance of a regression model on both training and
     test datasets.
 
     Args:
-        X_train (pd.DataFrame or np.ndarray): Training feature set.
-        y_train (pd.Series or np.ndarray): Target variable for training set.
-        X_test (pd.DataFrame or np.ndarray): Test feature set.
-        y_test (pd.Series or np.ndarray): Target variable for test set.
-        pipeline (sklearn Pipeline): Trained pipeline model.
+        evaluation (ModelEvaluation): Stored evaluation of the model
     """
     st.subheader("Model Evaluation")
     st.write("")
@@ -25,39 +29,55 @@ def regression_performance(X_train, y_train, X_test, y_test, pipeline):
     with col1:
         # Evaluate training set
         st.write("#### Train Set\n")
-        regression_evaluation(X_train, y_train, pipeline)
+        regression_evaluation(
+            evaluation.metrics["train"], evaluation.intervals("train"))
 
     with col2:
         # Evaluate test set
         st.write("#### Test Set\n")
-        regression_evaluation(X_test, y_test, pipeline)
+        regression_evaluation(
+            evaluation.metrics["test"], evaluation.intervals("test"))
 
 
-def regression_evaluation(X, y, pipeline):
+def regression_evaluation(metrics, intervals=None):
     """
-    Computes and displays various regression evaluation metrics for a given
-    dataset.
+    Displays various regression evaluation metrics for a given dataset.
 
     Args:
-        X (pd.DataFrame or np.ndarray): Feature set.
-        y (pd.Series, pd.DataFrame, or np.ndarray): Target variable.
-        pipeline (sklearn Pipeline): Trained pipeline model.
+        metrics (dict): "mae", "mse", "rmse" and "r2" of the dataset
+        intervals (dict): 95% confidence interval of each metric, if any
     """
-    # Make predictions
-    predictions = pipeline.predict(X)
+    # Visualize metrics
+    for name, label in METRIC_LABELS.items():
+        line = f"{label}: {metrics[name]:.2f}"
+        if intervals is not None:
+            low, high = intervals[name]
+            line += f" (95% CI {low:.2f} – {high:.2f})"
+        st.write(line)
 
-    # If y is a DataFrame, extract values
-    if isinstance(y, pd.DataFrame):
-        y = y.values.ravel()
 
-    # Calculate metrics
-    mae = mean_absolute_error(y, predictions)
-    mse = mean_squared_error(y, predictions)
-    rmse = np.sqrt(mse)
-    r2 = r2_score(y, predictions)
+def segment_performance(segments):
+    """
+    Displays the metrics of each segment of a dataset in a table.
 
-    # Visualize metrics
-    st.write(f"Mean Absolute Error (MAE): {mae:.2f}")
-    st.write(f"Mean Squared Error (MSE): {mse:.2f}")
-    st.write(f"Root Mean Squared Error (RMSE): {rmse:.2f}")
-    st.write(f"R² Score: {r2:.2f}")
+    Args:
+        segments (pd.DataFrame): Output of `RegressionMetrics.segments`
+    """
+    table = segments.copy()
+    for name, column in METRIC_COLUMNS.items():
+        if f"{name}_low" in table:
+            low, high = table.pop(f"{name}_low"), table.pop(f"{name}_high")
+            digits = 2 if name == "r2" else 0
+            table[f"{column} 95% CI"] = [
+                f"{lo:,.{digits}f} – {hi:,.{digits}f}"
+                for lo, hi in zip(low, high)
+            ]
+    table = table.rename(columns={"n": "Houses", **METRIC_COLUMNS})
+    # MSE is in squared dollars, the table shows the errors in dollars
+    table = table.drop(columns=["MSE", "MSE 95% CI"], errors="ignore")
+    st.dataframe(
+        table.style.format(
+            {"MAE": "{:,.0f}", "RMSE": "{:,.0f}", "R²": "{:.2f}"},
+            na_rep="–"),
+        use_container_width=True
+    )
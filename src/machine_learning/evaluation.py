@@ -0,0 +1,306 @@
+import io
+import os
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+import seaborn as sns
+import matplotlib.pyplot as plt
+from src.data_management import load_pkl_file
+from src.machine_learning.metrics_engine import METRICS, RegressionMetrics
+from src.machine_learning.model_bundle import (
+    ModelManifest,
+    load_training_data,
+    regression_metrics
+)
+
+# Evaluation artifacts inside a model version directory
+EVALUATION_FILE = "evaluation.npz"
+EVALUATION_PLOT_FILE = "regression_evaluation.png"
+
+# Version of the evaluation layout, bumped when its arrays change
+EVALUATION_FORMAT = 2
+
+# Datasets a model is evaluated on
+SPLITS = ("train", "test")
+
+# Features the metrics are broken down by, when the model uses them
+SEGMENT_COLUMNS = ("OverallQual", "KitchenQual")
+
+# Options Streamlit's st.pyplot encodes figures with
+SAVEFIG_OPTIONS = {"bbox_inches": "tight", "dpi": 200}
+
+
+class ModelEvaluation:
+    """
+    Predictions and metrics of a model version on its train and test sets.
+
+    Args:
+        actual (dict): Actual prices of each split
+        predicted (dict): Predicted prices of each split
+        metrics (dict): Metrics of each split, as `regression_metrics`
+        pipeline_hash (str): Content hash of the evaluated pipeline file
+        segments (dict): Per split, the values of each of the
+                         SEGMENT_COLUMNS the model uses
+        plot (bytes): PNG of the actual vs predicted scatterplots
+    """
+
+    def __init__(self, actual, predicted, metrics, pipeline_hash,
+                 segments=None, plot=None):
+        self.actual = actual
+        self.predicted = predicted
+        self.metrics = metrics
+        self.pipeline_hash = pipeline_hash
+        self.segments = segments or {split: {} for split in SPLITS}
+        self.plot = plot
+        self._breakdowns = {}
+        self._lock = threading.Lock()
+
+    def _memoized(self, key, compute):
+        with self._lock:
+            if key in self._breakdowns:
+                return self._breakdowns[key]
+        value = compute()
+        with self._lock:
+            return self._breakdowns.setdefault(key, value)
+
+    def intervals(self, split):
+        """
+        Return bootstrap confidence intervals of the metrics of a split,
+        computed on first use.
+
+        Args:
+            split (str): "train" or "test"
+
+        Returns:
+            dict: Lower and upper bound of each metric
+        """
+        return self._memoized(("intervals", split), lambda: RegressionMetrics(
+            self.actual[split], self.predicted[split]).intervals())
+
+    def segment_metrics(self, split, column):
+        """
+        Return the metrics of a split per value of a segment column,
+        with their confidence intervals, computed on first use.
+
+        Args:
+            split (str): "train" or "test"
+            column (str): One of the stored segment columns
+
+        Returns:
+            pd.DataFrame: Output of `RegressionMetrics.segments`
+        """
+        return self._memoized(("segments", split, column), lambda: (
+            RegressionMetrics(self.actual[split], self.predicted[split])
+            .segments(self.segments[split][column])
+            .rename_axis(column)
+        ))
+
+    def save(self, version_dir):
+        """
+        Store the evaluation in a model version directory.
+
+        Both files are written under temporary names and then renamed, the
+        arrays last, so a stored evaluation always has its plot.
+
+        Args:
+            version_dir (str): Model version directory
+        """
+        arrays = {
+            "format": np.array(EVALUATION_FORMAT),
+            "pipeline_hash": np.array(self.pipeline_hash),
+        }
+        for split in SPLITS:
+            for column, values in self.segments[split].items():
+                arrays[f"{split}_segment_{column}"] = values
+            arrays[f"{split}_actual"] = self.actual[split]
+            arrays[f"{split}_predicted"] = self.predicted[split]
+            arrays[f"{split}_metrics"] = np.array(
+                [self.metrics[split][name] for name in METRICS])
+
+        tmp_suffix = f".{os.getpid()}.tmp"
+        plot_path = os.path.join(version_dir, EVALUATION_PLOT_FILE)
+        if self.plot is not None:
+            with open(plot_path + tmp_suffix, "wb") as f:
+                f.write(self.plot)
+            os.replace(plot_path + tmp_suffix, plot_path)
+        path = os.path.join(version_dir, EVALUATION_FILE)
+        with open(path + tmp_suffix, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(path + tmp_suffix, path)
+
+    @classmethod
+    def load(cls, version_dir, pipeline_hash=None):
+        """
+        Read the evaluation stored in a model version directory.
+
+        Args:
+            version_dir (str): Model version directory
+            pipeline_hash (str): Hash of the current pipeline file, a
+                                 stored evaluation of another pipeline
+                                 is ignored
+
+        Returns:
+            ModelEvaluation: Stored evaluation, or None if there is none,
+                             it has another format or it is out of date
+        """
+        path = os.path.join(version_dir, EVALUATION_FILE)
+        plot_path = os.path.join(version_dir, EVALUATION_PLOT_FILE)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            with open(plot_path, "rb") as f:
+                plot = f.read()
+        except (OSError, ValueError):
+            return None
+        if "format" not in arrays or arrays["format"] != EVALUATION_FORMAT:
+            return None
+        stored_hash = str(arrays["pipeline_hash"])
+        if pipeline_hash is not None and stored_hash != pipeline_hash:
+            return None
+        return cls(
+            actual={split: arrays[f"{split}_actual"] for split in SPLITS},
+            predicted={
+                split: arrays[f"{split}_predicted"] for split in SPLITS},
+            metrics={
+                split: dict(zip(METRICS, arrays[f"{split}_metrics"].tolist()))
+                for split in SPLITS
+            },
+            pipeline_hash=stored_hash,
+            segments={
+                split: {
+                    name[len(f"{split}_segment_"):]: values
+                    for name, values in arrays.items()
+                    if name.startswith(f"{split}_segment_")
+                }
+                for split in SPLITS
+            },
+            plot=plot,
+        )
+
+
+def regression_evaluation_figure(evaluation, alpha_scatter=0.5):
+    """
+    Create scatterplots to compare actual values and predictions
+    for both training and test datasets, with multiple colors from the
+    Spectral palette.
+
+    Args:
+        evaluation (ModelEvaluation): Predictions of the model
+        alpha_scatter (float): Transparency for scatter points
+
+    Returns:
+        Figure: One scatterplot per split
+    """
+    fig, axes = plt.subplots(nrows=1, ncols=2, figsize=(12, 5))
+    for ax, split, title in zip(axes, SPLITS, ("Train Set", "Test Set")):
+        actual = evaluation.actual[split]
+        predicted = evaluation.predicted[split]
+        sns.scatterplot(
+            x=actual, y=predicted, alpha=alpha_scatter, ax=ax,
+            hue=predicted, palette="Spectral", legend=False
+        )
+        sns.lineplot(x=actual, y=actual, color='black', ax=ax)
+        ax.set_xlabel("Actual")
+        ax.set_ylabel("Predictions")
+        ax.set_title(title, fontsize=20)
+
+    # Adjust layout
+    fig.tight_layout()
+    return fig
+
+
+def _segment_values(values):
+    """
+    Return segment values as an array that loads without pickle.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy()
+    return values.astype(object).fillna("Missing").astype(str).to_numpy(
+        dtype=str)
+
+
+def evaluate_model(pipeline, manifest, X_train, y_train, X_test, y_test):
+    """
+    Predict the train and test sets and compute the metrics of each.
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline
+        manifest (ModelManifest): Manifest of the pipeline's version
+        X_train (pd.DataFrame): Training features
+        y_train (pd.DataFrame or pd.Series): Training target
+        X_test (pd.DataFrame): Test features
+        y_test (pd.DataFrame or pd.Series): Test target
+
+    Returns:
+        ModelEvaluation: Predictions, metrics and plot
+    """
+    sets = {"train": (X_train, y_train), "test": (X_test, y_test)}
+    actual, predicted, metrics, segments = {}, {}, {}, {}
+    for split, (X, y) in sets.items():
+        X = X.reindex(columns=manifest.features, fill_value=0)
+        actual[split] = np.asarray(y, dtype=np.float64).ravel()
+        predicted[split] = np.asarray(pipeline.predict(X), dtype=np.float64)
+        metrics[split] = regression_metrics(actual[split], predicted[split])
+        segments[split] = {
+            column: _segment_values(X[column])
+            for column in SEGMENT_COLUMNS if column in manifest.features
+        }
+
+    evaluation = ModelEvaluation(
+        actual, predicted, metrics, manifest.pipeline_hash, segments)
+    fig = regression_evaluation_figure(evaluation)
+    image = io.BytesIO()
+    try:
+        fig.savefig(image, format="png", **SAVEFIG_OPTIONS)
+    finally:
+        plt.close(fig)
+    evaluation.plot = image.getvalue()
+    return evaluation
+
+
+def evaluate_version(version_dir, pipeline=None, manifest=None):
+    """
+    Evaluate a model version on its saved train and test sets, and store
+    the evaluation next to its pipeline.
+
+    Args:
+        version_dir (str): Model version directory
+        pipeline (Pipeline): Fitted pipeline, loaded from the version
+                             directory if None
+        manifest (ModelManifest): Manifest of the version, read from the
+                                  version directory if None
+
+    Returns:
+        ModelEvaluation: Stored evaluation
+    """
+    if manifest is None:
+        manifest = ModelManifest.load(version_dir)
+        if manifest is None:
+            raise ValueError(f"{version_dir} has no valid manifest")
+    if pipeline is None:
+        pipeline = load_pkl_file(
+            os.path.join(version_dir, manifest.pipeline_file))
+    evaluation = evaluate_model(
+        pipeline, manifest, **load_training_data(version_dir))
+    evaluation.save(version_dir)
+    return evaluation
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Evaluate model versions on their train and test sets.")
+    parser.add_argument(
+        "version_dirs", nargs="+", help="Model version directories")
+    args = parser.parse_args()
+
+    for version_dir in args.version_dirs:
+        evaluation = evaluate_version(version_dir)
+        print(f"Wrote {EVALUATION_FILE} for {version_dir}: " + ", ".join(
+            f"{split} R² {evaluation.metrics[split]['r2']:.3f}"
+            for split in SPLITS
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from feature_engine.encoding import OrdinalEncoder
+from feature_engine.imputation import CategoricalImputer
+from sklearn.feature_selection import SelectorMixin
+from sklearn.preprocessing import StandardScaler
+from src.machine_learning.compiled_forest import CompiledForest
+
+# Code OrdinalEncoder gives unseen categories with unseen="encode", as
+# documented by feature-engine
+UNSEEN_CODE = -1
+
+
+class FusedPreprocessor:
+    """
+    The fitted preprocessing steps of a pipeline as one NumPy transform.
+
+    Categorical columns are imputed and mapped to their ordinal codes by
+    `encode`, which turns a DataFrame into a raw float array. `transform`
+    then scales and selects features in a single vectorized step. The
+    output is identical to running the fitted steps one by one.
+
+    Args:
+        feature_names_in (list): Columns expected by the pipeline, in order
+        fill_values (dict): Categorical column mapped to its imputed value
+        category_codes (dict): Categorical column mapped to a dict of
+                               category to ordinal code
+        unseen_codes (dict): Categorical column mapped to the code used for
+                             unseen categories, missing if those raise
+        mean (np.ndarray): Values subtracted from each column, or None
+        scale (np.ndarray): Values each column is divided by, or None
+        selected (np.ndarray): Indices of the columns kept by selection
+    """
+
+    def __init__(self, feature_names_in, fill_values, category_codes,
+                 unseen_codes, mean, scale, selected):
+        self.feature_names_in = list(feature_names_in)
+        self.fill_values = fill_values
+        self.category_codes = category_codes
+        self.unseen_codes = unseen_codes
+        self.mean = mean
+        self.scale = scale
+        self.selected = selected
+
+    def encode(self, X):
+        """
+        Convert a DataFrame of raw features into a float array.
+
+        Args:
+            X (pd.DataFrame): Raw features, containing at least the columns
+                              in `feature_names_in`
+
+        Returns:
+            np.ndarray: float64 array of shape (n_samples, n_features);
+                        values the fitted steps can't encode are NaN
+        """
+        encoded = np.empty((len(X), len(self.feature_names_in)))
+        for i, column in enumerate(self.feature_names_in):
+            values = X[column]
+            if column in self.fill_values:
+                values = values.astype(object).where(
+                    values.notna(), self.fill_values[column])
+            if column in self.category_codes:
+                codes = self.category_codes[column]
+                positions = pd.Index(list(codes)).get_indexer(values)
+                lookup = np.append(
+                    np.array(list(codes.values()), dtype=np.float64),
+                    self.unseen_codes.get(column, np.nan),
+                )
+                # Position -1 (unseen category) picks the last entry
+                encoded[:, i] = lookup[positions]
+            else:
+                encoded[:, i] = pd.to_numeric(values).to_numpy(
+                    dtype=np.float64, na_value=np.nan)
+        return encoded
+
+    def transform(self, X):
+        """
+        Scale and select features of an encoded float array.
+
+        Args:
+            X (np.ndarray): Output of `encode`
+
+        Returns:
+            np.ndarray: Model input, identical to the fitted steps' output
+        """
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        if self.selected is not None:
+            X = X[:, self.selected]
+        return X
+
+
+class FastPredictor:
+    """
+    Fused preprocessing followed by a compiled forest.
+
+    The compiled forest has the lowest latency for small batches, while
+    sklearn's Cython tree walk is faster for large ones. When the fitted
+    sklearn model is available it is used for batches above
+    `compiled_max_rows`. Both give identical predictions.
+
+    Args:
+        preprocessor (FusedPreprocessor): Fused preprocessing steps
+        forest (CompiledForest): Flattened final model
+        model: Fitted sklearn model the forest was compiled from, or None
+        compiled_max_rows (int): Largest batch evaluated by the forest
+    """
+
+    def __init__(self, preprocessor, forest, model=None,
+                 compiled_max_rows=512):
+        self.preprocessor = preprocessor
+        self.forest = forest
+        self.model = model
+        self.compiled_max_rows = compiled_max_rows
+
+    def predict(self, X):
+        """
+        Predict prices for a DataFrame of raw features.
+
+        Args:
+            X (pd.DataFrame): Raw features
+
+        Returns:
+            np.ndarray: Predicted prices, or None if the input holds values
+                        the fast path can't handle (missing numbers or
+                        unseen categories); the full pipeline then reports
+                        the problem the usual way
+        """
+        encoded = self.preprocessor.encode(X)
+        if np.isnan(encoded).any():
+            return None
+        X_model = self.preprocessor.transform(encoded)
+        if self.model is not None and len(X_model) > self.compiled_max_rows:
+            return self.model.predict(X_model)
+        return self.forest.predict(X_model)
+
+
+def compile_preprocessing(steps, feature_names_in):
+    """
+    Fuse fitted preprocessing steps into one FusedPreprocessor.
+
+    Recognized steps are feature-engine's CategoricalImputer and
+    OrdinalEncoder, one sklearn StandardScaler and sklearn feature
+    selectors.
+
+    Args:
+        steps (list): (name, fitted transformer) pairs, in pipeline order
+        feature_names_in (list): Columns the first step was fitted on
+
+    Returns:
+        FusedPreprocessor: Fused transform, or None if a step isn't
+                           recognized
+    """
+    columns = list(feature_names_in)
+    fill_values, category_codes, unseen_codes = {}, {}, {}
+    mean = scale = selected = None
+    scaled = False
+
+    for _, step in steps:
+        if isinstance(step, CategoricalImputer):
+            if scaled or selected is not None:
+                return None
+            fill_values.update(step.imputer_dict_)
+        elif isinstance(step, OrdinalEncoder):
+            if scaled or selected is not None:
+                return None
+            category_codes.update(step.encoder_dict_)
+            if step.unseen == "encode":
+                unseen_codes.update(
+                    {variable: UNSEEN_CODE for variable in step.variables_})
+        elif isinstance(step, StandardScaler) and not scaled:
+            if selected is not None:
+                return None
+            mean = step.mean_ if step.with_mean else None
+            scale = step.scale_ if step.with_std else None
+            scaled = True
+        elif isinstance(step, SelectorMixin):
+            support = np.flatnonzero(step.get_support())
+            selected = support if selected is None else selected[support]
+        else:
+            return None
+
+    # Every categorical column must be encoded before reaching the model
+    categorical = set(fill_values) - set(category_codes)
+    if categorical & set(columns):
+        return None
+    return FusedPreprocessor(
+        columns, fill_values, category_codes, unseen_codes,
+        mean, scale, selected,
+    )
+
+
+def compile_fast_predictor(pipeline):
+    """
+    Build a FastPredictor for a fitted pipeline.
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline, with either a tree regressor
+                             or a CompiledForest as final step
+
+    Returns:
+        FastPredictor: Fast path for the pipeline, or None if the
+                       pipeline's structure isn't recognized
+    """
+    steps = getattr(pipeline, "steps", None)
+    if not steps:
+        return None
+    feature_names_in = getattr(pipeline, "feature_names_in_", None)
+    if feature_names_in is None:
+        feature_names_in = getattr(steps[0][1], "feature_names_in_", None)
+    if feature_names_in is None:
+        return None
+
+    preprocessor = compile_preprocessing(steps[:-1], feature_names_in)
+    if preprocessor is None:
+        return None
+
+    model = steps[-1][1]
+    if isinstance(model, CompiledForest):
+        return FastPredictor(preprocessor, model)
+    try:
+        forest = CompiledForest.from_estimator(model)
+    except (TypeError, ValueError):
+        return None
+    return FastPredictor(preprocessor, forest, model)
+
+
+# Fast predictors built so far, dropped together with their pipeline
+_fast_predictors = weakref.WeakKeyDictionary()
+_fast_predictors_lock = threading.Lock()
+
+
+def get_fast_predictor(pipeline):
+    """
+    Return the cached FastPredictor of a pipeline, building it once.
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline
+
+    Returns:
+        FastPredictor: Fast path for the pipeline, or None if the
+                       pipeline's structure isn't recognized
+    """
+    try:
+        with _fast_predictors_lock:
+            if pipeline in _fast_predictors:
+                return _fast_predictors[pipeline]
+    except TypeError:
+        # Objects that can't be weakly referenced are never cached
+        return compile_fast_predictor(pipeline)
+
+    predictor = compile_fast_predictor(pipeline)
+    with _fast_predictors_lock:
+        _fast_predictors[pipeline] = predictor
+    return predictor
+
+
+def fast_predict(X, pipeline):
+    """
+    Predict with the fused NumPy path of a pipeline, when it has one.
+
+    Args:
+        X (pd.DataFrame): Raw features
+        pipeline (Pipeline): Fitted pipeline
+
+    Returns:
+        np.ndarray: Predictions, or None when the caller should use
+                    `pipeline.predict` instead
+    """
+    predictor = get_fast_predictor(pipeline)
+    if predictor is None:
+        return None
+    try:
+        return predictor.predict(X)
+    except (KeyError, TypeError, ValueError):
+        # Let the full pipeline validate the input and report the error
+        return None
@@ -0,0 +1,162 @@
+import json
+import time
+import random
+import asyncio
+import argparse
+import numpy as np
+import pandas as pd
+
+# Houses the generated requests are drawn from
+RECORDS_PATH = "inputs/datasets/raw/house_prices_records.csv"
+
+
+def load_request_records(file_path=RECORDS_PATH, features=None):
+    """
+    Load house records to send as prediction requests.
+
+    Args:
+        file_path (str): CSV file of house records
+        features (list): Columns to send, all columns if None
+
+    Returns:
+        list: Houses as JSON-serializable dicts, missing values dropped
+    """
+    df = pd.read_csv(file_path, usecols=features)
+    return [
+        {name: value for name, value in record.items() if pd.notna(value)}
+        for record in json.loads(df.to_json(orient="records"))
+    ]
+
+
+async def _request(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(host, port, records, batch_size, deadline, latencies,
+                  failures, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    path = "/predict" if batch_size == 1 else "/predict/batch"
+    try:
+        while time.perf_counter() < deadline:
+            if batch_size == 1:
+                payload = rng.choice(records)
+            else:
+                payload = rng.sample(records, batch_size)
+            start = time.perf_counter()
+            status = await _request(reader, writer, host, path, payload)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+async def _fetch_metrics(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f"GET /metrics HTTP/1.1\r\nHost: {host}\r\n"
+        "Connection: close\r\n\r\n".encode("latin-1")
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def run_load(host="127.0.0.1", port=8000, concurrency=32,
+                   duration=10.0, batch_size=1, records=None, seed=0):
+    """
+    Send prediction requests from concurrent keep-alive connections.
+
+    Args:
+        host (str): Host of the prediction service
+        port (int): Port of the prediction service
+        concurrency (int): Number of concurrent connections
+        duration (float): Seconds to send requests for
+        batch_size (int): Houses per request; 1 uses /predict, more use
+                          /predict/batch
+        records (list): Houses to draw requests from, the raw dataset if
+                        None
+        seed (int): Seed used to draw the houses
+
+    Returns:
+        dict: Client-side throughput and latency percentiles, and the
+              metrics reported by the service
+    """
+    records = records or load_request_records()
+    rng = random.Random(seed)
+    latencies, failures = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        _client(host, port, records, batch_size, deadline, latencies,
+                failures, random.Random(rng.random()))
+        for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "failures": len(failures),
+        "requests_per_second": len(latencies) / elapsed,
+        "rows_per_second": len(latencies) * batch_size / elapsed,
+        "latency_ms": {
+            name: float(np.percentile(latencies_ms, q))
+            if len(latencies_ms) else None
+            for name, q in (("p50", 50), ("p90", 90), ("p99", 99))
+        },
+        "service": await _fetch_metrics(host, port),
+    }
+
+
+def main():
+    """
+    Command-line entry point to benchmark a running prediction service.
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate load against the house price prediction "
+                    "service."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--concurrency", type=int, default=32,
+        help="Concurrent connections (default: 32)",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0,
+        help="Seconds to send requests for (default: 10)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1,
+        help="Houses per request (default: 1)",
+    )
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(
+        args.host, args.port, args.concurrency, args.duration,
+        args.batch_size,
+    ))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# Metrics computed from the residual sums
+METRICS = ("mae", "mse", "rmse", "r2")
+
+# Bootstrap resamples behind the confidence intervals
+BOOTSTRAP_ROUNDS = 1000
+
+# Confidence level of the intervals, in percent
+CONFIDENCE = 95
+
+# Total sum of squares, relative to the sum of squared centered values,
+# below which the actual values are considered constant
+TOTAL_TOLERANCE = 1e-12
+
+# Resampling counts held in memory at once, in matrix cells
+BOOTSTRAP_BLOCK_CELLS = 1_000_000
+
+
+def residual_statistics(y, predictions):
+    """
+    Compute, per row, the terms every metric is a sum of.
+
+    The actual values are centered on their mean, which leaves the total
+    sum of squares of any subset unchanged and keeps it accurate.
+
+    Args:
+        y (array-like): Actual values
+        predictions (array-like): Predicted values
+
+    Returns:
+        np.ndarray: Array of shape (n_rows, 5) holding 1, the absolute
+                    error, the squared error, the centered actual value
+                    and its square
+    """
+    y = np.asarray(y, dtype=np.float64).ravel()
+    residuals = y - np.asarray(predictions, dtype=np.float64).ravel()
+    centered = y - y.mean() if len(y) else y
+    return np.column_stack([
+        np.ones_like(y), np.abs(residuals), residuals * residuals,
+        centered, centered * centered,
+    ])
+
+
+def metrics_from_sums(sums):
+    """
+    Turn sums of `residual_statistics` into metrics.
+
+    Args:
+        sums (np.ndarray): Sums over rows, the statistics on the last axis
+
+    Returns:
+        dict: Arrays of "n", "mae", "mse", "rmse" and "r2"; R² is NaN when
+              the actual values don't vary beyond rounding error
+    """
+    sums = np.asarray(sums, dtype=np.float64)
+    n = sums[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mae = sums[..., 1] / n
+        mse = sums[..., 2] / n
+        total = sums[..., 4] - sums[..., 3] ** 2 / n
+        # Identical values leave a total of rounding error, not zero
+        varies = total > TOTAL_TOLERANCE * sums[..., 4]
+        r2 = np.where(varies, 1 - sums[..., 2] / total, np.nan)
+    return {"n": n, "mae": mae, "mse": mse, "rmse": np.sqrt(mse), "r2": r2}
+
+
+def bootstrap_counts(n, rounds, seed=0):
+    """
+    Draw bootstrap resamples as counts of each row, in blocks of rounds.
+
+    Each block comes from one matrix of resampled row indices.
+
+    Args:
+        n (int): Number of rows
+        rounds (int): Number of resamples
+        seed (int): Seed of the resampling
+
+    Yields:
+        np.ndarray: Counts of shape (rounds in the block, n)
+    """
+    rng = np.random.default_rng(seed)
+    block = max(1, BOOTSTRAP_BLOCK_CELLS // max(n, 1))
+    for start in range(0, rounds, block):
+        size = min(block, rounds - start)
+        index = rng.integers(0, n, (size, n))
+        index += np.arange(size)[:, np.newaxis] * n
+        yield np.bincount(index.ravel(), minlength=size * n).reshape(size, n)
+
+
+def _percentile_interval(values, confidence):
+    tail = (100 - confidence) / 2
+    with warnings.catch_warnings():
+        # Segments missing from a resample have no metrics
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanpercentile(values, [tail, 100 - tail], axis=0)
+
+
+class RegressionMetrics:
+    """
+    Error metrics of predictions, all computed from sums of residual
+    statistics.
+
+    Any set of rows, a segment or a bootstrap resample, only needs its
+    sums of the five `residual_statistics`, so every metric of every
+    resample and segment comes from the same vectorized sums.
+
+    Args:
+        y (array-like): Actual values
+        predictions (array-like): Predicted values
+    """
+
+    def __init__(self, y, predictions):
+        self.statistics = residual_statistics(y, predictions)
+
+    def summary(self):
+        """
+        Compute the metrics of all rows.
+
+        Returns:
+            dict: "n", "mae", "mse", "rmse" and "r2"
+        """
+        metrics = metrics_from_sums(self.statistics.sum(axis=0))
+        summary = {name: float(metrics[name]) for name in METRICS}
+        summary["n"] = int(metrics["n"])
+        return summary
+
+    def intervals(self, rounds=BOOTSTRAP_ROUNDS, confidence=CONFIDENCE,
+                  seed=0):
+        """
+        Compute percentile bootstrap confidence intervals of the metrics.
+
+        Args:
+            rounds (int): Number of resamples
+            confidence (float): Confidence level in percent
+            seed (int): Seed of the resampling
+
+        Returns:
+            dict: Lower and upper bound of each metric
+        """
+        sums = np.concatenate([
+            counts @ self.statistics
+            for counts in bootstrap_counts(
+                len(self.statistics), rounds, seed)
+        ])
+        replicates = metrics_from_sums(sums)
+        return {
+            name: tuple(float(bound) for bound in _percentile_interval(
+                replicates[name], confidence))
+            for name in METRICS
+        }
+
+    def segments(self, groups, rounds=BOOTSTRAP_ROUNDS,
+                 confidence=CONFIDENCE, seed=0):
+        """
+        Compute the metrics of each segment of the rows.
+
+        Resamples are drawn from all rows, so segment sizes vary between
+        resamples as they would between datasets.
+
+        Args:
+            groups (array-like): Segment of each row, e.g. OverallQual
+            rounds (int): Number of resamples, 0 for no intervals
+            confidence (float): Confidence level in percent
+            seed (int): Seed of the resampling
+
+        Returns:
+            pd.DataFrame: One row per segment, in ascending order, with
+                          "n" and each metric, and their "_low" and "_high"
+                          bounds when `rounds` is positive
+        """
+        columns = ("n",) + METRICS
+        if rounds > 0:
+            columns += tuple(
+                f"{name}_{bound}" for name in METRICS
+                for bound in ("low", "high"))
+        groups = np.asarray(groups)
+        if len(groups) == 0:
+            table = pd.DataFrame(
+                columns=columns, index=pd.Index([], name="segment"),
+                dtype=np.float64)
+            table["n"] = table["n"].astype(int)
+            return table
+
+        labels, inverse = np.unique(groups, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        starts = np.searchsorted(inverse[order], np.arange(len(labels)))
+        statistics = self.statistics[order]
+
+        metrics = metrics_from_sums(
+            np.add.reduceat(statistics, starts, axis=0))
+        table = pd.DataFrame(
+            {name: metrics[name] for name in ("n",) + METRICS},
+            index=pd.Index(labels, name="segment"),
+        )
+        table["n"] = table["n"].astype(int)
+        if rounds <= 0:
+            return table
+
+        sums = []
+        for counts in bootstrap_counts(len(statistics), rounds, seed):
+            # Each row's statistics weighted by its count, summed per segment
+            weighted = counts[:, :, np.newaxis] * statistics[np.newaxis]
+            sums.append(np.add.reduceat(weighted, starts, axis=1))
+        replicates = metrics_from_sums(np.concatenate(sums))
+        for name in METRICS:
+            low, high = _percentile_interval(replicates[name], confidence)
+            table[f"{name}_low"] = low
+            table[f"{name}_high"] = high
+        return table
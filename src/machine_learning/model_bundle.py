@@ -0,0 +1,292 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from src.data_management import file_content_hash, load_pkl_file
+from src.machine_learning.metrics_engine import METRICS, RegressionMetrics
+
+# File describing a model version, next to its pipeline
+MANIFEST_FILE = "manifest.json"
+
+# Version of the manifest layout, bumped when its keys change
+BUNDLE_FORMAT = 1
+
+# Training data files of a model version, read only to build a manifest
+TRAINING_FILES = {
+    "X_train": "X_train.parquet",
+    "y_train": "y_train.parquet",
+    "X_test": "X_test.parquet",
+    "y_test": "y_test.parquet",
+}
+
+
+class ModelManifest:
+    """
+    Metadata of a model version: everything the pages need to know about
+    its inputs without reading the training data.
+
+    Args:
+        features (list): Columns the pipeline expects, in order
+        dtypes (dict): dtype name of each feature
+        categories (dict): Levels of each categorical feature
+        metrics (dict): "train" and "test" dicts of "mae", "mse", "rmse"
+                        and "r2"
+        pipeline_file (str): File name of the pipeline in the version
+                             directory
+        pipeline_hash (str): SHA-256 hash of the pipeline file
+        pipeline_bytes (int): Size of the pipeline file
+        target (str): Name of the predicted column
+        created (float): Unix time the manifest was built
+    """
+
+    def __init__(self, features, dtypes, categories, metrics, pipeline_file,
+                 pipeline_hash, pipeline_bytes, target="SalePrice",
+                 created=None):
+        self.features = list(features)
+        self.dtypes = dict(dtypes)
+        self.categories = dict(categories)
+        self.metrics = dict(metrics)
+        self.pipeline_file = pipeline_file
+        self.pipeline_hash = pipeline_hash
+        self.pipeline_bytes = pipeline_bytes
+        self.target = target
+        self.created = time.time() if created is None else created
+
+    def to_dict(self):
+        """
+        Return the manifest as JSON-serializable data.
+
+        Returns:
+            dict: Manifest fields, with the bundle format
+        """
+        return {
+            "format": BUNDLE_FORMAT,
+            "features": self.features,
+            "dtypes": self.dtypes,
+            "categories": self.categories,
+            "target": self.target,
+            "metrics": self.metrics,
+            "pipeline_file": self.pipeline_file,
+            "pipeline_hash": self.pipeline_hash,
+            "pipeline_bytes": self.pipeline_bytes,
+            "created": self.created,
+        }
+
+    def matches_pipeline(self, version_dir):
+        """
+        Check that the pipeline file has the size the manifest recorded.
+
+        A cheap check run on every load; `verify` compares the hash.
+
+        Args:
+            version_dir (str): Model version directory
+
+        Returns:
+            bool: False if the pipeline is missing or has another size
+        """
+        path = os.path.join(version_dir, self.pipeline_file)
+        try:
+            return os.path.getsize(path) == self.pipeline_bytes
+        except OSError:
+            return False
+
+    def verify(self, version_dir):
+        """
+        Check that the pipeline file has the content hash the manifest
+        recorded.
+
+        Args:
+            version_dir (str): Model version directory
+
+        Returns:
+            bool: True if the pipeline is the one the manifest describes
+        """
+        path = os.path.join(version_dir, self.pipeline_file)
+        return (
+            self.matches_pipeline(version_dir)
+            and file_content_hash(path) == self.pipeline_hash
+        )
+
+    def save(self, version_dir):
+        """
+        Write the manifest into a model version directory.
+
+        Written under a temporary name and then renamed, so readers never
+        see a half-written manifest.
+
+        Args:
+            version_dir (str): Model version directory
+        """
+        path = os.path.join(version_dir, MANIFEST_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, version_dir):
+        """
+        Read the manifest of a model version.
+
+        Args:
+            version_dir (str): Model version directory
+
+        Returns:
+            ModelManifest: Manifest of the version, or None if it has none,
+                           it has another format or it describes another
+                           pipeline file
+        """
+        path = os.path.join(version_dir, MANIFEST_FILE)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("format") != BUNDLE_FORMAT:
+            return None
+        manifest = cls(
+            data["features"], data["dtypes"], data["categories"],
+            data["metrics"], data["pipeline_file"], data["pipeline_hash"],
+            data["pipeline_bytes"], data["target"], data["created"],
+        )
+        if not manifest.matches_pipeline(version_dir):
+            return None
+        return manifest
+
+
+def regression_metrics(y, predictions):
+    """
+    Compute the error metrics shown on the Machine Learning Model page.
+
+    Args:
+        y (array-like): Actual values
+        predictions (array-like): Predicted values
+
+    Returns:
+        dict: "mae", "mse", "rmse" and "r2"
+    """
+    summary = RegressionMetrics(y, predictions).summary()
+    return {name: summary[name] for name in METRICS}
+
+
+def _categories(X):
+    """
+    List the sorted levels of each non-numerical column.
+    """
+    return {
+        column: sorted(X[column].dropna().astype(str).unique().tolist())
+        for column in X.columns
+        if not pd.api.types.is_numeric_dtype(X[column])
+    }
+
+
+def build_manifest(version_dir, pipeline, X_train, y_train, X_test, y_test,
+                   pipeline_file="regression_pipeline.pkl"):
+    """
+    Describe a fitted pipeline and its training data.
+
+    Args:
+        version_dir (str): Model version directory holding the pipeline
+        pipeline (Pipeline): Fitted pipeline
+        X_train (pd.DataFrame): Training features
+        y_train (pd.DataFrame or pd.Series): Training target
+        X_test (pd.DataFrame): Test features
+        y_test (pd.DataFrame or pd.Series): Test target
+        pipeline_file (str): File name of the pipeline
+
+    Returns:
+        ModelManifest: Manifest of the version
+    """
+    features = list(getattr(pipeline, "feature_names_in_", X_train.columns))
+    X_train = X_train[features]
+    X_test = X_test.reindex(columns=features, fill_value=0)
+    target = (
+        y_train.columns[0] if isinstance(y_train, pd.DataFrame)
+        else y_train.name
+    )
+    y_train = np.asarray(y_train).ravel()
+    y_test = np.asarray(y_test).ravel()
+
+    pipeline_path = os.path.join(version_dir, pipeline_file)
+    return ModelManifest(
+        features=features,
+        dtypes={column: str(X_train[column].dtype) for column in features},
+        categories=_categories(pd.concat([X_train, X_test])),
+        metrics={
+            "train": regression_metrics(y_train, pipeline.predict(X_train)),
+            "test": regression_metrics(y_test, pipeline.predict(X_test)),
+        },
+        pipeline_file=pipeline_file,
+        pipeline_hash=file_content_hash(pipeline_path),
+        pipeline_bytes=os.path.getsize(pipeline_path),
+        target=target or "SalePrice",
+    )
+
+
+def load_training_data(version_dir):
+    """
+    Read the training and test sets saved with a model version.
+
+    Args:
+        version_dir (str): Model version directory
+
+    Returns:
+        dict: "X_train", "y_train", "X_test" and "y_test" DataFrames
+    """
+    return {
+        name: pd.read_parquet(os.path.join(version_dir, file_name))
+        for name, file_name in TRAINING_FILES.items()
+    }
+
+
+def write_manifest(version_dir, pipeline=None,
+                   pipeline_file="regression_pipeline.pkl"):
+    """
+    Build the manifest of a model version from its saved files and store it.
+
+    Args:
+        version_dir (str): Model version directory
+        pipeline (Pipeline): Fitted pipeline, loaded from the version
+                             directory if None
+        pipeline_file (str): File name of the pipeline
+
+    Returns:
+        ModelManifest: Stored manifest
+    """
+    if pipeline is None:
+        pipeline = load_pkl_file(os.path.join(version_dir, pipeline_file))
+    manifest = build_manifest(
+        version_dir, pipeline, pipeline_file=pipeline_file,
+        **load_training_data(version_dir))
+    manifest.save(version_dir)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write or check the manifest of model versions.")
+    parser.add_argument(
+        "version_dirs", nargs="+", help="Model version directories")
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Check the stored manifests against the pipeline files")
+    args = parser.parse_args()
+
+    for version_dir in args.version_dirs:
+        if args.check:
+            manifest = ModelManifest.load(version_dir)
+            valid = manifest is not None and manifest.verify(version_dir)
+            print(f"{version_dir}: {'valid' if valid else 'invalid'}")
+            continue
+        manifest = write_manifest(version_dir)
+        test_r2 = manifest.metrics["test"]["r2"]
+        print(
+            f"Wrote {MANIFEST_FILE} for {version_dir}: "
+            f"{len(manifest.features)} features, test R² {test_r2:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+import os
+import re
+import time
+import zipfile
+import threading
+import streamlit as st
+from src.data_management import file_content_hash, load_pkl_file
+from src.machine_learning.compiled_forest import (
+    COMPILED_FOREST_FILE,
+    CompiledForest,
+    compile_pipeline,
+    export_compiled_forest
+)
+from src.machine_learning.evaluation import ModelEvaluation, evaluate_version
+from src.machine_learning.model_bundle import ModelManifest, write_manifest
+
+# Directory holding one sub-directory per trained model version
+MODEL_DIR = os.path.join("outputs", "ml_pipeline", "predict_price")
+
+# File name of the fitted pipeline inside a version directory
+PIPELINE_FILE = "regression_pipeline.pkl"
+
+# Engine used when callers don't pick one: "compiled" evaluates the forest
+# from flattened node arrays, "sklearn" uses the pipeline as fitted. Both
+# return identical predictions.
+PREDICTION_ENGINE = os.environ.get("PRICE_PREDICTION_ENGINE", "compiled")
+
+
+def version_sort_key(version):
+    """
+    Sort key ordering version names naturally, e.g. v2 before v10.
+
+    Args:
+        version (str): Version directory name
+
+    Returns:
+        list: Text and integer parts of the name
+    """
+    return [
+        int(part) if part.isdigit() else part
+        for part in re.split(r"(\d+)", version)
+    ]
+
+
+class ModelRegistry:
+    """
+    Process-wide store of fitted pipelines, loaded once per version.
+
+    The registry watches the model directory for new versions. When one
+    appears it is loaded in full before `latest_version` starts returning
+    it, so readers always get a complete pipeline. Versions that have not
+    been used for `max_idle` seconds are evicted, except the latest one.
+
+    Args:
+        model_dir (str): Directory holding the version directories
+        scan_interval (float): Minimum seconds between directory scans
+        max_idle (float): Seconds a version may go unused before eviction
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, scan_interval=5.0,
+                 max_idle=30 * 60.0):
+        self.model_dir = model_dir
+        self.scan_interval = scan_interval
+        self.max_idle = max_idle
+        self._models = {}
+        self._compiled = {}
+        self._manifests = {}
+        self._evaluations = {}
+        self._last_used = {}
+        self._latest = None
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._evaluate_lock = threading.Lock()
+
+    def version_dir(self, version):
+        """
+        Return the directory of a model version.
+
+        Args:
+            version (str): Version name, e.g. "v1"
+
+        Returns:
+            str: Path to the version directory
+        """
+        return os.path.join(self.model_dir, version)
+
+    def available_versions(self):
+        """
+        List the versions on disk that contain a fitted pipeline.
+
+        Returns:
+            list: Version names, oldest first
+        """
+        if not os.path.isdir(self.model_dir):
+            return []
+        # Hidden directories are versions still being written
+        versions = [
+            name for name in os.listdir(self.model_dir)
+            if not name.startswith(".") and os.path.isfile(
+                os.path.join(self.model_dir, name, PIPELINE_FILE))
+        ]
+        return sorted(versions, key=version_sort_key)
+
+    def latest_version(self):
+        """
+        Return the newest version that has been loaded successfully.
+
+        Scans the model directory at most every `scan_interval` seconds
+        and swaps to a newer version once its pipeline has loaded.
+
+        Returns:
+            str: Latest version name, or None if no version is available
+        """
+        now = time.monotonic()
+        scan_due = now - self._last_scan >= self.scan_interval
+        if self._latest is None or scan_due:
+            self._last_scan = now
+            for version in reversed(self.available_versions()):
+                if version == self._latest:
+                    break
+                if self._load(version) is not None:
+                    with self._lock:
+                        self._latest = version
+                    print(f"Model registry switched to version {version}")
+                    break
+        return self._latest
+
+    def get(self, version=None, engine=None):
+        """
+        Return the fitted pipeline of a version, loading it on first use.
+
+        Args:
+            version (str): Version name, the latest version if None
+            engine (str): "compiled" or "sklearn", PREDICTION_ENGINE if None
+
+        Returns:
+            Pipeline: Fitted pipeline, or None if it could not be loaded
+        """
+        if version is None:
+            version = self.latest_version()
+            if version is None:
+                return None
+        pipeline = self._load(version)
+        engine = engine or PREDICTION_ENGINE
+        if pipeline is not None and engine == "compiled":
+            pipeline = self._compile(version, pipeline)
+        self.evict_idle()
+        return pipeline
+
+    def manifest(self, version=None):
+        """
+        Return the manifest of a version: its features, their dtypes and
+        levels, and its training metrics.
+
+        The manifest is read once per version. A version saved without one
+        gets it built from its training data files and stored, once.
+
+        Args:
+            version (str): Version name, the latest version if None
+
+        Returns:
+            ModelManifest: Manifest of the version, or None if it could not
+                           be read or built
+        """
+        if version is None:
+            version = self.latest_version()
+            if version is None:
+                return None
+        with self._lock:
+            if version in self._manifests:
+                self._last_used[version] = time.monotonic()
+                return self._manifests[version]
+
+        version_dir = self.version_dir(version)
+        manifest = ModelManifest.load(version_dir)
+        if manifest is None:
+            pipeline = self._load(version)
+            if pipeline is None:
+                return None
+            try:
+                manifest = write_manifest(version_dir, pipeline)
+                print(f"Wrote manifest of model version {version}")
+            except (OSError, KeyError, ValueError) as e:
+                print(f"Could not build manifest of version {version}: {e}")
+                return None
+
+        with self._lock:
+            self._manifests[version] = manifest
+            self._last_used[version] = time.monotonic()
+        return manifest
+
+    def evaluation(self, version=None):
+        """
+        Return the predictions and metrics of a version on its train and
+        test sets.
+
+        The evaluation stored with the version is read once. A version
+        without one, or with one of another pipeline, is evaluated once
+        and the result stored.
+
+        Args:
+            version (str): Version name, the latest version if None
+
+        Returns:
+            ModelEvaluation: Evaluation of the version, or None if it could
+                             not be read or computed
+        """
+        if version is None:
+            version = self.latest_version()
+            if version is None:
+                return None
+        manifest = self.manifest(version)
+        if manifest is None:
+            return None
+        with self._lock:
+            if version in self._evaluations:
+                self._last_used[version] = time.monotonic()
+                return self._evaluations[version]
+
+        # One evaluation at a time, so concurrent sessions don't repeat it
+        with self._evaluate_lock:
+            with self._lock:
+                if version in self._evaluations:
+                    return self._evaluations[version]
+            version_dir = self.version_dir(version)
+            evaluation = ModelEvaluation.load(
+                version_dir, manifest.pipeline_hash)
+            if evaluation is None:
+                pipeline = self._load(version)
+                if pipeline is None:
+                    return None
+                try:
+                    evaluation = evaluate_version(
+                        version_dir, pipeline, manifest)
+                    print(f"Evaluated model version {version}")
+                except (OSError, KeyError, ValueError) as e:
+                    print(f"Could not evaluate version {version}: {e}")
+                    return None
+            with self._lock:
+                self._evaluations[version] = evaluation
+                self._last_used[version] = time.monotonic()
+        return evaluation
+
+    def evict_idle(self):
+        """
+        Drop loaded versions that have not been used for `max_idle` seconds.
+
+        A version's pipeline, compiled pipeline, manifest and evaluation
+        are evicted together.
+
+        Returns:
+            list: Names of the evicted versions
+        """
+        now = time.monotonic()
+        with self._lock:
+            evicted = [
+                version for version, last_used in self._last_used.items()
+                if version != self._latest
+                and now - last_used > self.max_idle
+            ]
+            for version in evicted:
+                del self._last_used[version]
+                for cache in (self._models, self._compiled, self._manifests,
+                              self._evaluations):
+                    cache.pop(version, None)
+        for version in evicted:
+            print(f"Model registry evicted idle version {version}")
+        return evicted
+
+    def loaded_versions(self):
+        """
+        List the versions currently held in memory.
+
+        Returns:
+            list: Version names, oldest first
+        """
+        with self._lock:
+            return sorted(self._models, key=version_sort_key)
+
+    def _load(self, version):
+        """
+        Return a loaded pipeline, reading it from disk if needed.
+
+        Args:
+            version (str): Version name
+
+        Returns:
+            Pipeline: Fitted pipeline, or None if it could not be loaded
+        """
+        with self._lock:
+            if version in self._models:
+                self._last_used[version] = time.monotonic()
+                return self._models[version]
+
+        # One load at a time, so concurrent sessions don't load twice
+        with self._load_lock:
+            with self._lock:
+                if version in self._models:
+                    self._last_used[version] = time.monotonic()
+                    return self._models[version]
+            pipeline_path = os.path.join(
+                self.version_dir(version), PIPELINE_FILE)
+            try:
+                pipeline = load_pkl_file(pipeline_path)
+            except Exception as e:
+                # The version may still be being written, retry next scan
+                print(f"Could not load model version {version}: {e}")
+                return None
+            with self._lock:
+                self._models[version] = pipeline
+                self._last_used[version] = time.monotonic()
+        return pipeline
+
+    def _compile(self, version, pipeline):
+        """
+        Return the pipeline of a version with its forest compiled.
+
+        Uses the forest exported next to the pipeline when it was compiled
+        from the same pipeline file content, and exports one otherwise.
+        Falls back to the sklearn pipeline when its model can't be
+        compiled.
+
+        Args:
+            version (str): Version name
+            pipeline (Pipeline): Fitted sklearn pipeline of the version
+
+        Returns:
+            Pipeline: Pipeline ending in a CompiledForest
+        """
+        with self._lock:
+            if version in self._compiled:
+                return self._compiled[version]
+
+        forest_path = os.path.join(
+            self.version_dir(version), COMPILED_FOREST_FILE)
+        pipeline_path = os.path.join(self.version_dir(version), PIPELINE_FILE)
+        forest = pipeline_hash = None
+        try:
+            pipeline_hash = file_content_hash(pipeline_path)
+            forest = CompiledForest.load(forest_path)
+        except FileNotFoundError:
+            pass
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            # A corrupt export is replaced by a fresh one below
+            print(f"Could not load compiled forest of version {version}: {e}")
+        if forest is not None and forest.pipeline_hash != pipeline_hash:
+            forest = None
+
+        try:
+            if forest is None:
+                try:
+                    forest = export_compiled_forest(
+                        pipeline, forest_path, pipeline_hash)
+                except OSError as e:
+                    print(f"Could not export compiled forest: {e}")
+                    forest = CompiledForest.from_estimator(
+                        pipeline.steps[-1][1], pipeline_hash)
+            compiled = compile_pipeline(pipeline, forest)
+        except (TypeError, ValueError) as e:
+            print(f"Using sklearn engine for version {version}: {e}")
+            compiled = pipeline
+
+        with self._lock:
+            self._compiled[version] = compiled
+        return compiled
+
+
+@st.cache_resource
+def get_model_registry():
+    """
+    Return the model registry shared by all pages and sessions.
+
+    Returns:
+        ModelRegistry: Process-wide model registry
+    """
+    return ModelRegistry()
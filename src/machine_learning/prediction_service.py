@@ -0,0 +1,405 @@
+import json
+import time
+import asyncio
+import logging
+import argparse
+import collections
+import concurrent.futures
+import numpy as np
+import pandas as pd
+from src.machine_learning.fast_inference import fast_predict
+from src.machine_learning.model_registry import MODEL_DIR, ModelRegistry
+from src.machine_learning.predictive_analysis import (
+    FEATURE_DEFAULTS,
+    normalize_features
+)
+
+logger = logging.getLogger(__name__)
+
+# Latencies kept for the percentile estimates
+LATENCY_WINDOW = 10_000
+
+# Longest request body accepted, in bytes
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+HTTP_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class ServiceMetrics:
+    """
+    Request latencies and batch sizes of the prediction service.
+
+    Latency percentiles are computed over the last LATENCY_WINDOW
+    requests. Batch sizes are counted in power-of-two buckets.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.batch_sizes = collections.Counter()
+
+    def record_request(self, latency, rows, error=False):
+        self.requests += 1
+        self.rows += rows
+        self.errors += int(error)
+        self.latencies.append(latency)
+
+    def record_batch(self, size):
+        bucket = 1 << max(size - 1, 0).bit_length()
+        self.batch_sizes[bucket] += 1
+
+    def summary(self):
+        """
+        Return the metrics as a JSON-serializable dict.
+
+        Returns:
+            dict: Counters, latency percentiles in milliseconds and the
+                  batch size histogram, keyed by the bucket's upper bound
+        """
+        latencies = np.array(self.latencies) * 1000
+        percentiles = {}
+        for name, q in (("p50", 50), ("p90", 90), ("p99", 99)):
+            percentiles[name] = (
+                float(np.percentile(latencies, q)) if len(latencies)
+                else None
+            )
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "requests": self.requests,
+            "rows": self.rows,
+            "errors": self.errors,
+            "latency_ms": percentiles,
+            "batch_size_histogram": {
+                f"<={bucket}": count
+                for bucket, count in sorted(self.batch_sizes.items())
+            },
+        }
+
+
+def records_frame(records):
+    """
+    Stack houses sent as JSON objects into one DataFrame.
+
+    Every house is read as if it were alone, whatever else is in the
+    batch: a feature it leaves out gets its FEATURE_DEFAULTS value rather
+    than becoming missing because another house has it, and JSON nulls
+    become NaN so a column of nulls keeps a numerical dtype.
+
+    Args:
+        records (list): Houses as dicts of feature name to value
+
+    Returns:
+        pd.DataFrame: One row per house
+    """
+    return pd.DataFrame.from_records([
+        {
+            name: np.nan if value is None else value
+            for name, value in {**FEATURE_DEFAULTS, **record}.items()
+        }
+        for record in records
+    ])
+
+
+class MicroBatcher:
+    """
+    Gather concurrent prediction requests into one vectorized predict.
+
+    The first request of a batch opens a window of `max_wait` seconds;
+    every request arriving before it closes, or until `max_batch` rows are
+    queued, is predicted in the same call. Predictions run in a worker
+    thread so the event loop keeps accepting requests meanwhile.
+
+    Args:
+        registry (ModelRegistry): Source of the latest fitted pipeline
+        metrics (ServiceMetrics): Metrics updated with each batch
+        max_wait (float): Seconds a batch stays open for more requests
+        max_batch (int): Rows that close a batch early
+    """
+
+    def __init__(self, registry, metrics, max_wait=0.005, max_batch=512):
+        self.registry = registry
+        self.metrics = metrics
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self._queue = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(1)
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        return asyncio.get_running_loop().create_task(self._run())
+
+    async def predict(self, records):
+        """
+        Predict the price of one or more houses.
+
+        Args:
+            records (list): Houses as dicts of feature name to value
+
+        Returns:
+            list: Predicted prices, in `records` order
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            records = [record for item, _ in batch for record in item]
+            try:
+                predictions = await loop.run_in_executor(
+                    self._executor, self._predict, records)
+            except Exception:
+                # Predict requests one by one, so a malformed request
+                # only fails itself
+                for item, future in batch:
+                    await self._predict_alone(item, future)
+                continue
+            self.metrics.record_batch(len(records))
+            start = 0
+            for item, future in batch:
+                if not future.done():
+                    future.set_result(
+                        predictions[start:start + len(item)].tolist())
+                start += len(item)
+
+    async def _predict_alone(self, records, future):
+        loop = asyncio.get_running_loop()
+        try:
+            predictions = await loop.run_in_executor(
+                self._executor, self._predict, records)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        self.metrics.record_batch(len(records))
+        if not future.done():
+            future.set_result(predictions.tolist())
+
+    def _predict(self, records):
+        pipeline = self.registry.get()
+        if pipeline is None:
+            raise RuntimeError("No model version is available")
+        X = normalize_features(
+            records_frame(records), list(pipeline.feature_names_in_))
+        predictions = fast_predict(X, pipeline)
+        if predictions is None:
+            predictions = pipeline.predict(X)
+        return np.asarray(predictions, dtype=np.float64)
+
+
+class PredictionService:
+    """
+    Minimal HTTP/1.1 JSON service for house price predictions.
+
+    Endpoints:
+        POST /predict: one house as a JSON object, returns
+                       {"PredictedSalePrice": price}
+        POST /predict/batch: a JSON list of houses (or {"records": [...]}),
+                             returns {"PredictedSalePrice": [prices]}
+        GET /metrics: latency percentiles and batch size histogram
+        GET /health: {"status": "ok", "version": latest model version}
+
+    Args:
+        batcher (MicroBatcher): Batcher the predictions go through
+        metrics (ServiceMetrics): Metrics reported by /metrics
+    """
+
+    def __init__(self, batcher, metrics):
+        self.batcher = batcher
+        self.metrics = metrics
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            status = 413 if "too large" in str(e) else 400
+            self._write_response(writer, status, {"error": str(e)}, False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise ValueError("Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_BODY_SIZE:
+            raise ValueError("Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path.split("?", 1)[0], headers, body
+
+    async def _dispatch(self, method, path, body):
+        if path == "/health":
+            return 200, {
+                "status": "ok",
+                "version": self.batcher.registry.latest_version(),
+            }
+        if path == "/metrics":
+            return 200, self.metrics.summary()
+        if path not in ("/predict", "/predict/batch"):
+            return 404, {"error": f"Unknown endpoint {path}"}
+        if method != "POST":
+            return 405, {"error": f"{path} only accepts POST"}
+
+        start = time.perf_counter()
+        try:
+            data = json.loads(body or b"null")
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        if path == "/predict":
+            records = [data] if isinstance(data, dict) else None
+        elif isinstance(data, dict):
+            records = data.get("records")
+        else:
+            records = data
+        if not isinstance(records, list) or not all(
+                isinstance(record, dict) for record in records):
+            return 400, {"error": "Expected a house as a JSON object, "
+                                  "or a list of them for /predict/batch"}
+        if not records:
+            return 200, {"PredictedSalePrice": []}
+
+        try:
+            predictions = await self.batcher.predict(records)
+        except (ValueError, TypeError) as e:
+            # Houses the pipeline can't read, e.g. an unknown category or
+            # a non-numerical area
+            self.metrics.record_request(
+                time.perf_counter() - start, len(records), error=True)
+            return 400, {"error": f"Invalid house data: {e}"}
+        except Exception as e:
+            logger.exception("Error during prediction")
+            self.metrics.record_request(
+                time.perf_counter() - start, len(records), error=True)
+            return 500, {"error": f"Error during prediction: {e}"}
+        self.metrics.record_request(time.perf_counter() - start, len(records))
+        if path == "/predict":
+            return 200, {"PredictedSalePrice": predictions[0]}
+        return 200, {"PredictedSalePrice": predictions}
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+
+async def serve(host="127.0.0.1", port=8000, model_dir=MODEL_DIR,
+                max_wait=0.005, max_batch=512):
+    """
+    Run the prediction service until cancelled.
+
+    Args:
+        host (str): Interface to listen on
+        port (int): Port to listen on
+        model_dir (str): Directory holding the model versions
+        max_wait (float): Seconds a batch stays open for more requests
+        max_batch (int): Rows that close a batch early
+    """
+    registry = ModelRegistry(model_dir)
+    if registry.latest_version() is None:
+        raise SystemExit(f"No model version found in {model_dir}")
+    metrics = ServiceMetrics()
+    batcher = MicroBatcher(registry, metrics, max_wait, max_batch)
+    service = PredictionService(batcher, metrics)
+
+    batcher_task = batcher.start()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    logger.info(
+        "Serving predictions of model %s on http://%s:%s",
+        registry.latest_version(), host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batcher_task.cancel()
+
+
+def main():
+    """
+    Command-line entry point to run the prediction service.
+    """
+    parser = argparse.ArgumentParser(
+        description="Serve house price predictions over HTTP."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--model-dir", default=MODEL_DIR,
+        help="Directory holding one sub-directory per model version",
+    )
+    parser.add_argument(
+        "--batch-window-ms", type=float, default=5.0,
+        help="Milliseconds a batch stays open for more requests "
+             "(default: 5)",
+    )
+    parser.add_argument(
+        "--max-batch", type=int, default=512,
+        help="Rows that close a batch early (default: 512)",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(serve(
+            args.host, args.port, args.model_dir,
+            args.batch_window_ms / 1000, args.max_batch,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
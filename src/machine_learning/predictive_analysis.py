@@ -1,5 +1,67 @@
+import functools
 import streamlit as st
 import pandas as pd
+from src.data_management import build_dtype_schema, derive_frame
+from src.machine_learning.fast_inference import fast_predict
+
+# Value given to a feature missing from the input data
+FEATURE_DEFAULTS = {
+    'KitchenQual': "TA",  # Default to Typical/Average
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_categorical_features():
+    """
+    Return the features the dataset metadata describes with text codes.
+
+    Returns:
+        frozenset: Names of the categorical features
+    """
+    try:
+        schema = build_dtype_schema()
+    except OSError as e:
+        print(f"Could not read dataset metadata: {e}")
+        return frozenset()
+    return frozenset(
+        column for column, dtype in schema.items()
+        if isinstance(dtype, pd.CategoricalDtype)
+    )
+
+
+def normalize_features(X, house_features):
+    """
+    Bring raw house data into the form the pipeline expects, in one step.
+
+    Features missing from `X` are added with their default value
+    ("TA" for `KitchenQual`, "None" for other categorical features and 0
+    for numerical ones). Missing values are filled with "None" for
+    categorical features and 0 for numerical ones, and categorical
+    features are cast to strings, as the pipeline was trained on them.
+
+    Args:
+        X (pd.DataFrame): Raw house data
+        house_features (list): List of features used in the model.
+
+    Returns:
+        pd.DataFrame: The model features, in `house_features` order
+    """
+    categorical = _schema_categorical_features().union(
+        X.select_dtypes(include=["object", "category"]).columns
+    )
+    casts, fill_values = {}, {}
+    for feature in house_features:
+        if feature in categorical:
+            casts[feature] = object
+            fill_values[feature] = (
+                "None" if feature in X.columns
+                else FEATURE_DEFAULTS.get(feature, "None")
+            )
+        else:
+            fill_values[feature] = FEATURE_DEFAULTS.get(feature, 0)
+
+    return X.reindex(columns=house_features).astype(casts).fillna(
+        fill_values)
 
 
 def predict_house_price(X_live, house_features, price_pipeline):
@@ -15,36 +77,13 @@ def predict_house_price(X_live, house_features, price_pipeline):
         float: Predicted house price or None if error occurs.
     """
     try:
-        # Create a copy to avoid modifying the original data
-        X_live_copy = X_live.copy()
-
-        # Ensure all required features are present
-        for feature in house_features:
-            if feature not in X_live_copy.columns:
-                # Add missing feature with appropriate default value
-                if feature == 'KitchenQual':
-                    X_live_copy[feature] = "TA"  # Default to Typical/Average
-                elif feature in X_live_copy.select_dtypes(
-                        include="object").columns:
-                    # Default for other categorical features
-                    X_live_copy[feature] = "None"
-
-                else:
-                    X_live_copy[feature] = 0  # Default for numerical features
-
-        # Handle missing values
-        for feature in X_live_copy.columns:
-            if X_live_copy[feature].isnull().any():
-                if X_live_copy[feature].dtype == "object":
-                    X_live_copy[feature].fillna("None", inplace=True)
-                else:
-                    X_live_copy[feature].fillna(0, inplace=True)
-
-        # Filter to only include the required features
-        X_live_price = X_live_copy[house_features]
-
-        # Make a prediction
-        price_prediction = price_pipeline.predict(X_live_price)
+        X_live_price = normalize_features(X_live, house_features)
+
+        # Make a prediction, through the fused NumPy path when the
+        # pipeline's structure is recognized
+        price_prediction = fast_predict(X_live_price, price_pipeline)
+        if price_prediction is None:
+            price_prediction = price_pipeline.predict(X_live_price)
 
         # Return the predicted price
         return price_prediction[0]
@@ -69,38 +108,21 @@ def predict_inherited_house_price(X_inherited, house_features, price_pipeline):
                       prices, or None if error occurs.
     """
     try:
-        # Create a copy to avoid modifying the original data
-        X_inherited_copy = X_inherited.copy()
-
-        # Ensure all required features are present
-        for feature in house_features:
-            if feature not in X_inherited_copy.columns:
-                if feature == 'KitchenQual':
-                    X_inherited_copy[feature] = "TA"
-                elif feature in X_inherited_copy.select_dtypes(
-                        include="object").columns:
-                    X_inherited_copy[feature] = "None"
-                else:
-                    X_inherited_copy[feature] = 0
-
-        # Handle missing values
-        for feature in X_inherited_copy.columns:
-            if X_inherited_copy[feature].isnull().any():
-                if X_inherited_copy[feature].dtype == "object":
-                    X_inherited_copy[feature].fillna("None", inplace=True)
-                else:
-                    X_inherited_copy[feature].fillna(0, inplace=True)
-
-        # Filter relevant features
-        X_inherited_price = X_inherited_copy[house_features]
-
-        # Make predictions
-        predicted_prices = price_pipeline.predict(X_inherited_price)
-
-        # Add the predicted prices to the original DataFrame
-        X_inherited_copy["PredictedSalePrice"] = predicted_prices
-
-        return X_inherited_copy
+        X_inherited_price = normalize_features(X_inherited, house_features)
+
+        # Make predictions, through the fused NumPy path when the
+        # pipeline's structure is recognized
+        predicted_prices = fast_predict(X_inherited_price, price_pipeline)
+        if predicted_prices is None:
+            predicted_prices = price_pipeline.predict(X_inherited_price)
+
+        # Layer the model features and predicted prices over the
+        # original data, without copying its other columns
+        return derive_frame(X_inherited, {
+            **{feature: X_inherited_price[feature]
+               for feature in house_features},
+            "PredictedSalePrice": predicted_prices,
+        })
     except Exception as e:
         st.error(f"Error during prediction for inherited houses: {e}")
         print(f"Error during prediction for inherited houses: {e}")
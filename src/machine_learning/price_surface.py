@@ -0,0 +1,387 @@
+import os
+import json
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from src.data_management import (
+    build_dtype_schema,
+    file_content_hash,
+    load_csv_cached,
+    load_pkl_file
+)
+
+# Files holding the surface inside a model version directory
+SURFACE_VALUES_FILE = "price_surface.npy"
+SURFACE_AXES_FILE = "price_surface.json"
+
+# Inputs of the Sale Price Predictor widgets, in surface axis order
+SURFACE_FEATURES = ['GarageArea', 'GrLivArea', 'KitchenQual', 'OverallQual']
+AREA_STEP = 50
+PERCENTAGE_MIN, PERCENTAGE_MAX = 0.4, 2.0
+KITCHEN_QUAL_CODES = ['Fa', 'TA', 'Gd', 'Ex']
+OVERALL_QUAL_LEVELS = list(range(1, 11))
+
+# Widget range used when a column is missing from the dataset
+DEFAULT_AREA_RANGES = {
+    'GarageArea': (0, 2000, 500),
+    'GrLivArea': (500, 5000, 1500),
+}
+
+
+def area_input_range(df, column):
+    """
+    Return the range of an area input widget, based on the dataset.
+
+    Args:
+        df (pd.DataFrame): House pricing data
+        column (str): 'GarageArea' or 'GrLivArea'
+
+    Returns:
+        tuple: Minimum, maximum and default value of the widget
+    """
+    if df is None or column not in df.columns:
+        return DEFAULT_AREA_RANGES[column]
+    return (
+        int(df[column].min() * PERCENTAGE_MIN),
+        int(df[column].max() * PERCENTAGE_MAX),
+        int(df[column].median()),
+    )
+
+
+def surface_axes(df):
+    """
+    List every value the Sale Price Predictor widgets can step to.
+
+    Area inputs step by AREA_STEP from their default value, so their axis
+    holds the values on that lattice within the widget range.
+
+    Args:
+        df (pd.DataFrame): House pricing data
+
+    Returns:
+        dict: Feature name mapped to the list of its grid values
+    """
+    axes = {}
+    for column in ('GarageArea', 'GrLivArea'):
+        min_value, max_value, default = area_input_range(df, column)
+        start = default - (default - min_value) // AREA_STEP * AREA_STEP
+        axes[column] = list(range(start, max_value + 1, AREA_STEP))
+    axes['KitchenQual'] = list(KITCHEN_QUAL_CODES)
+    axes['OverallQual'] = list(OVERALL_QUAL_LEVELS)
+    return axes
+
+
+class PriceSurface:
+    """
+    Predicted price for every combination of the predictor's inputs.
+
+    Args:
+        values (np.ndarray): Prices indexed by the position of each input
+                             on its axis, in SURFACE_FEATURES order
+        axes (dict): Feature name mapped to the list of its grid values
+        pipeline_hash (str): Content hash of the pipeline file the prices
+                             were predicted with
+    """
+
+    def __init__(self, values, axes, pipeline_hash=None):
+        self.values = values
+        self.axes = axes
+        self.pipeline_hash = pipeline_hash
+        self._positions = {
+            feature: {value: i for i, value in enumerate(axis)}
+            for feature, axis in axes.items()
+        }
+
+    def grid_frame(self):
+        """
+        Return every grid point as a DataFrame of raw features.
+
+        Returns:
+            pd.DataFrame: One row per grid point, in `values` order
+        """
+        index = pd.MultiIndex.from_product(
+            [self.axes[feature] for feature in SURFACE_FEATURES],
+            names=SURFACE_FEATURES,
+        )
+        return index.to_frame(index=False)
+
+    def lookup(self, X):
+        """
+        Look up the price of a single house.
+
+        Args:
+            X (pd.DataFrame): One row holding the SURFACE_FEATURES
+
+        Returns:
+            float: Predicted price, or None if the input is off the grid
+        """
+        position = []
+        for feature in SURFACE_FEATURES:
+            if feature not in X.columns:
+                return None
+            value = X[feature].iloc[0]
+            if feature != 'KitchenQual':
+                if pd.isna(value) or value != int(value):
+                    return None
+                value = int(value)
+            index = self._positions[feature].get(value)
+            if index is None:
+                return None
+            position.append(index)
+        return float(self.values[tuple(position)])
+
+    def save(self, version_dir):
+        """
+        Store the surface next to the pipeline of a model version.
+
+        Both files are written under temporary names and then renamed, the
+        axes last, so a reader never pairs new axes with old values.
+
+        Args:
+            version_dir (str): Model version directory
+        """
+        values_path = os.path.join(version_dir, SURFACE_VALUES_FILE)
+        axes_path = os.path.join(version_dir, SURFACE_AXES_FILE)
+        tmp_suffix = f".{os.getpid()}.tmp"
+
+        with open(values_path + tmp_suffix, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.values))
+        os.replace(values_path + tmp_suffix, values_path)
+        with open(axes_path + tmp_suffix, "w") as f:
+            json.dump({
+                "features": SURFACE_FEATURES,
+                "axes": self.axes,
+                "pipeline_hash": self.pipeline_hash,
+            }, f)
+        os.replace(axes_path + tmp_suffix, axes_path)
+
+    @classmethod
+    def load(cls, version_dir):
+        """
+        Memory-map the surface stored in a model version directory.
+
+        Args:
+            version_dir (str): Model version directory
+
+        Returns:
+            PriceSurface: Stored surface, or None if there is none
+        """
+        values_path = os.path.join(version_dir, SURFACE_VALUES_FILE)
+        axes_path = os.path.join(version_dir, SURFACE_AXES_FILE)
+        if not (os.path.exists(values_path) and os.path.exists(axes_path)):
+            return None
+        with open(axes_path) as f:
+            meta = json.load(f)
+        if meta.get("features") != SURFACE_FEATURES:
+            return None
+        values = np.load(values_path, mmap_mode="r")
+        expected_shape = tuple(
+            len(meta["axes"][feature]) for feature in SURFACE_FEATURES)
+        if values.shape != expected_shape:
+            return None
+        return cls(values, meta["axes"], meta.get("pipeline_hash"))
+
+
+def build_price_surface(pipeline, df, pipeline_hash=None, chunk_size=65536):
+    """
+    Predict the price of every grid point with batched predictions.
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline using the SURFACE_FEATURES
+        df (pd.DataFrame): House pricing data, sets the area ranges
+        pipeline_hash (str): Content hash of the pipeline file
+        chunk_size (int): Rows predicted per batch
+
+    Returns:
+        PriceSurface: Surface of predicted prices
+    """
+    axes = surface_axes(df)
+    shape = tuple(len(axes[feature]) for feature in SURFACE_FEATURES)
+    surface = PriceSurface(np.empty(shape), axes, pipeline_hash)
+
+    grid = surface.grid_frame()
+    feature_names = list(pipeline.feature_names_in_)
+    flat_values = surface.values.reshape(-1)
+    for start in range(0, len(grid), chunk_size):
+        chunk = grid.iloc[start:start + chunk_size][feature_names]
+        flat_values[start:start + len(chunk)] = pipeline.predict(chunk)
+    return surface
+
+
+def validate_price_surface(surface, pipeline, sample_size=None,
+                           random_state=0):
+    """
+    Check stored prices against live predictions of the pipeline.
+
+    Args:
+        surface (PriceSurface): Surface to check
+        pipeline (Pipeline): Fitted pipeline the surface was built from
+        sample_size (int): Number of random grid points to check, all
+                           grid points if None
+        random_state (int): Seed used to draw the sample
+
+    Returns:
+        dict: Number of points checked, number of mismatches and the
+              largest absolute difference
+    """
+    grid = surface.grid_frame()
+    stored = np.asarray(surface.values).reshape(-1)
+    if sample_size is not None and sample_size < len(grid):
+        rng = np.random.default_rng(random_state)
+        rows = np.sort(rng.choice(len(grid), sample_size, replace=False))
+        grid, stored = grid.iloc[rows], stored[rows]
+
+    live = pipeline.predict(grid[list(pipeline.feature_names_in_)])
+    differences = np.abs(live - stored)
+    return {
+        "checked": len(grid),
+        "mismatches": int(np.count_nonzero(live != stored)),
+        "max_abs_diff": float(differences.max()) if len(grid) else 0.0,
+    }
+
+
+def supports_price_surface(pipeline):
+    """
+    Check whether a pipeline's inputs are exactly the widget inputs.
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline
+
+    Returns:
+        bool: True if a surface can stand in for the pipeline
+    """
+    feature_names = getattr(pipeline, "feature_names_in_", None)
+    return (
+        feature_names is not None
+        and sorted(feature_names) == sorted(SURFACE_FEATURES)
+    )
+
+
+def create_price_surface(version_dir, pipeline, df):
+    """
+    Build, store and return the surface of a model version.
+
+    Args:
+        version_dir (str): Model version directory
+        pipeline (Pipeline): Fitted pipeline of the version
+        df (pd.DataFrame): House pricing data
+
+    Returns:
+        PriceSurface: The stored surface
+    """
+    pipeline_hash = file_content_hash(
+        os.path.join(version_dir, "regression_pipeline.pkl"))
+    surface = build_price_surface(pipeline, df, pipeline_hash)
+    surface.save(version_dir)
+    print(f"Stored price surface of shape {surface.values.shape} "
+          f"in {version_dir}")
+    return surface
+
+
+# Loaded surfaces and running builds, per model version directory
+_surfaces = {}
+_builds = {}
+_surfaces_lock = threading.Lock()
+
+
+def get_price_surface(version_dir, pipeline, df):
+    """
+    Return the surface of a model version, building it in the background.
+
+    A stored surface is memory-mapped once per process. Versions saved by
+    the training module ship with theirs; for older versions, or one
+    built from another pipeline file, a background thread builds it and
+    None is returned until it is ready, so callers use live inference
+    meanwhile.
+
+    Args:
+        version_dir (str): Model version directory
+        pipeline (Pipeline): Fitted sklearn pipeline of the version
+        df (pd.DataFrame): House pricing data
+
+    Returns:
+        PriceSurface: Surface of the version, or None if not available yet
+    """
+    with _surfaces_lock:
+        if version_dir in _surfaces:
+            return _surfaces[version_dir]
+        if version_dir in _builds:
+            return None
+
+    if not supports_price_surface(pipeline):
+        with _surfaces_lock:
+            _surfaces[version_dir] = None
+        return None
+
+    pipeline_hash = file_content_hash(
+        os.path.join(version_dir, "regression_pipeline.pkl"))
+    surface = PriceSurface.load(version_dir)
+    if surface is not None and surface.pipeline_hash == pipeline_hash:
+        with _surfaces_lock:
+            _surfaces[version_dir] = surface
+        return surface
+
+    def build():
+        try:
+            create_price_surface(version_dir, pipeline, df)
+            built = PriceSurface.load(version_dir)
+        except Exception as e:
+            print(f"Could not build price surface in {version_dir}: {e}")
+            built = None
+        with _surfaces_lock:
+            _surfaces[version_dir] = built
+            del _builds[version_dir]
+
+    with _surfaces_lock:
+        if version_dir not in _builds and version_dir not in _surfaces:
+            _builds[version_dir] = threading.Thread(target=build, daemon=True)
+            _builds[version_dir].start()
+    return None
+
+
+def main():
+    """
+    Command-line entry point to build or validate a price surface.
+    """
+    parser = argparse.ArgumentParser(
+        description="Precompute the Sale Price Predictor price surface."
+    )
+    parser.add_argument(
+        "--version-dir",
+        default=os.path.join("outputs", "ml_pipeline", "predict_price", "v1"),
+        help="Model version directory holding regression_pipeline.pkl",
+    )
+    parser.add_argument(
+        "--validate", action="store_true",
+        help="Check the stored surface against live predictions",
+    )
+    parser.add_argument(
+        "--sample", type=int, default=None,
+        help="Number of random grid points to validate (default: all)",
+    )
+    args = parser.parse_args()
+
+    pipeline = load_pkl_file(
+        os.path.join(args.version_dir, "regression_pipeline.pkl"))
+    if args.validate:
+        surface = PriceSurface.load(args.version_dir)
+        if surface is None:
+            parser.error(f"No price surface stored in {args.version_dir}")
+        report = validate_price_surface(surface, pipeline, args.sample)
+        print(
+            f"Checked {report['checked']} grid points: "
+            f"{report['mismatches']} mismatches, "
+            f"max abs difference {report['max_abs_diff']}"
+        )
+        raise SystemExit(1 if report["mismatches"] else 0)
+
+    df = load_csv_cached(
+        os.path.join("inputs", "datasets", "raw", "house_prices_records.csv"),
+        "house_prices_records", build_dtype_schema(),
+    )
+    create_price_surface(args.version_dir, pipeline, df)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,667 @@
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+import seaborn as sns
+import matplotlib.pyplot as plt
+from feature_engine.encoding import OrdinalEncoder
+from feature_engine.imputation import CategoricalImputer
+from sklearn.ensemble import (
+    AdaBoostRegressor,
+    ExtraTreesRegressor,
+    GradientBoostingRegressor,
+    RandomForestRegressor
+)
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import (
+    GridSearchCV,
+    HalvingGridSearchCV,
+    train_test_split
+)
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+from src.data_management import (
+    build_dtype_schema,
+    file_content_hash,
+    load_csv_cached
+)
+from src.machine_learning.compiled_forest import (
+    COMPILED_FOREST_FILE,
+    export_compiled_forest
+)
+from src.machine_learning.evaluation import evaluate_version
+from src.machine_learning.model_bundle import write_manifest
+from src.machine_learning.model_registry import MODEL_DIR, PIPELINE_FILE
+from src.machine_learning.price_surface import (
+    create_price_surface,
+    supports_price_surface
+)
+
+# Cleaned dataset the models are trained on
+CLEANED_DATA_PATH = os.path.join(
+    "outputs", "datasets", "cleaned", "house_prices_cleaned.parquet")
+
+# Raw house records the Sale Price Predictor's price surface spans
+RAW_DATA_PATH = os.path.join(
+    "inputs", "datasets", "raw", "house_prices_records.csv")
+
+# Predicted column, and the best features found in notebook 05
+TARGET = 'SalePrice'
+BEST_FEATURES = ['GarageArea', 'GrLivArea', 'KitchenQual', 'OverallQual']
+
+# Categorical features imputed and encoded by the pipeline
+CATEGORICAL_FEATURES = ['KitchenQual']
+
+# Train/test split of notebook 05
+TEST_SIZE = 0.2
+SPLIT_RANDOM_STATE = 42
+
+# Model of each estimator name, built on demand
+MODELS = {
+    "LinearRegression": lambda: LinearRegression(),
+    "DecisionTreeRegressor": lambda: DecisionTreeRegressor(random_state=42),
+    "RandomForestRegressor": lambda: RandomForestRegressor(random_state=42),
+    "ExtraTreesRegressor": lambda: ExtraTreesRegressor(random_state=0),
+    "AdaBoostRegressor": lambda: AdaBoostRegressor(random_state=42),
+    "GradientBoostingRegressor":
+        lambda: GradientBoostingRegressor(random_state=42),
+    "XGBRegressor": lambda: _xgb_regressor(),
+}
+
+# Hyperparameter grids of the quick search in notebook 05
+PARAMS = {
+    "LinearRegression": {},
+    "DecisionTreeRegressor": {
+        'model__max_depth': [None, 4, 15],
+        'model__min_samples_split': [2, 50],
+        'model__min_samples_leaf': [1, 50],
+        'model__max_leaf_nodes': [None, 50],
+    },
+    "RandomForestRegressor": {
+        'model__n_estimators': [100, 50, 140],
+        'model__max_depth': [None, 4, 15],
+        'model__min_samples_split': [2, 50],
+        'model__min_samples_leaf': [1, 50],
+        'model__max_leaf_nodes': [None, 50],
+    },
+    "ExtraTreesRegressor": {
+        'model__n_estimators': [50, 100, 150],
+        'model__max_depth': [None, 3, 15],
+        'model__min_samples_split': [2, 50],
+        'model__min_samples_leaf': [1, 50],
+    },
+    "AdaBoostRegressor": {
+        'model__n_estimators': [50, 25, 80, 150],
+        'model__learning_rate': [1, 0.1, 2],
+        'model__loss': ['linear', 'square', 'exponential'],
+    },
+    "GradientBoostingRegressor": {
+        'model__n_estimators': [100, 50, 140],
+        'model__learning_rate': [0.1, 0.01, 0.001],
+        'model__max_depth': [3, 15, None],
+        'model__min_samples_split': [2, 50],
+        'model__min_samples_leaf': [1, 50],
+        'model__max_leaf_nodes': [None, 50],
+    },
+    "XGBRegressor": {
+        'model__n_estimators': [30, 80, 200],
+        'model__max_depth': [None, 3, 15],
+        'model__learning_rate': [0.01, 0.1, 0.001],
+        'model__gamma': [0, 0.1],
+    },
+}
+
+# Estimator of the final search in notebook 05
+DEFAULT_MODELS = ["ExtraTreesRegressor"]
+
+# Search strategies: every candidate on all the data, or successive
+# halving, which gives all candidates a small budget and only the best
+# `1 / HALVING_FACTOR` of them a larger one, round after round
+STRATEGIES = ("grid", "halving")
+HALVING_FACTOR = 3
+
+# Budgets successive halving can allocate: trees of the ensemble models,
+# or training rows for any model
+HALVING_RESOURCES = ("n_estimators", "n_samples")
+TREES_PARAM = 'model__n_estimators'
+
+# Fewest training rows of a successive halving round, so that rare
+# categories are seen by the encoder
+HALVING_MIN_SAMPLES = 300
+
+
+def _xgb_regressor():
+    """
+    Build an XGBRegressor, which needs the optional xgboost package.
+    """
+    try:
+        from xgboost import XGBRegressor
+    except ImportError as e:
+        raise ValueError(
+            "XGBRegressor needs the xgboost package, "
+            "install it with `pip install xgboost`") from e
+    return XGBRegressor(random_state=42)
+
+
+def create_pipeline(model, categorical_features=CATEGORICAL_FEATURES,
+                    memory=None):
+    """
+    Create the regression pipeline of notebook 05 around a model.
+
+    With `memory`, the fitted imputer, encoder and scaler are cached,
+    keyed by their parameters and input data. Candidates of a search that
+    only differ in model parameters then reuse the preprocessing fitted on
+    their fold instead of refitting it.
+
+    Args:
+        model: Regressor ending the pipeline
+        categorical_features (list): Features to impute and encode
+        memory (joblib.Memory or str): Cache of the fitted transformers
+
+    Returns:
+        Pipeline: Unfitted pipeline
+    """
+    if model is None:
+        raise ValueError("Model cannot be None. Please provide a valid model.")
+
+    steps = []
+    if categorical_features:
+        steps += [
+            # 1. Impute missing values for categorical variables
+            ('categorical_imputer', CategoricalImputer(
+                imputation_method='missing',
+                variables=list(categorical_features))),
+            # 2. Encode categorical variables
+            ('ordinal_encoder', OrdinalEncoder(
+                encoding_method='arbitrary',
+                variables=list(categorical_features))),
+        ]
+    steps += [
+        # 3. Scale numerical features
+        ('scale_features', StandardScaler()),
+        # 4. Train the model
+        ('model', model),
+    ]
+    return Pipeline(steps, memory=memory)
+
+
+def load_training_sets(features=BEST_FEATURES, data_path=CLEANED_DATA_PATH):
+    """
+    Split the cleaned dataset into train and test sets, as notebook 05.
+
+    Args:
+        features (list): Feature columns to keep
+        data_path (str): Path to the cleaned dataset
+
+    Returns:
+        tuple: X_train, X_test, y_train, y_test
+    """
+    df = pd.read_parquet(data_path)
+    X_train, X_test, y_train, y_test = train_test_split(
+        df.drop([TARGET], axis=1), df[TARGET],
+        test_size=TEST_SIZE, random_state=SPLIT_RANDOM_STATE, shuffle=True,
+    )
+    return X_train[features], X_test[features], y_train, y_test
+
+
+def score_summary(grid_searches, sort_by='mean_score'):
+    """
+    Summarize the cross-validation scores of every candidate.
+
+    Successive halving searches only contribute the candidates of their
+    last round, the ones scored with the largest budget.
+
+    Args:
+        grid_searches (dict): Fitted searches of each estimator name
+        sort_by (str): Column the candidates are sorted by, descending
+
+    Returns:
+        pd.DataFrame: One row per candidate with its estimator, score
+                      statistics over the folds and parameters
+    """
+    rows = []
+    for estimator, search in grid_searches.items():
+        results = search.cv_results_
+        splits = sorted(
+            key for key in results
+            if key.startswith("split") and key.endswith("_test_score")
+        )
+        scores = np.column_stack([results[key] for key in splits])
+        finalists = (
+            results['iter'] == results['iter'].max() if 'iter' in results
+            else np.ones(len(scores), dtype=bool)
+        )
+        for params, candidate_scores in zip(
+                np.asarray(results['params'])[finalists], scores[finalists]):
+            candidate_scores = candidate_scores[~np.isnan(candidate_scores)]
+            rows.append({
+                'estimator': estimator,
+                'min_score': candidate_scores.min(),
+                'mean_score': candidate_scores.mean(),
+                'max_score': candidate_scores.max(),
+                'std_score': candidate_scores.std(),
+                **params,
+            })
+    return (
+        pd.DataFrame(rows)
+        .sort_values(sort_by, ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+def _grid_size(grid):
+    return int(np.prod([len(values) for values in grid.values()]))
+
+
+def _fit_seconds(search, scale=1.0):
+    """
+    Return the mean time to fit and score one candidate on one fold in
+    the last round of a search, times `scale`.
+    """
+    results = search.cv_results_
+    last = (
+        results['iter'] == results['iter'].max() if 'iter' in results
+        else slice(None)
+    )
+    return scale * float(np.mean(
+        results['mean_fit_time'][last] + results['mean_score_time'][last]))
+
+
+def halving_search(pipeline, grid, X, y, resource="n_estimators",
+                   factor=HALVING_FACTOR, workers=1, cv=5, scoring='r2'):
+    """
+    Tune a pipeline by successive halving instead of an exhaustive grid.
+
+    With the "n_estimators" resource, the other parameters are halved on
+    growing numbers of trees, up to the largest tree count of the grid.
+    The grid's own tree counts are then compared on the winning
+    parameters, so the search ends on a candidate of the grid. Models
+    without trees fall back to the "n_samples" resource, which halves on
+    growing numbers of training rows.
+
+    Args:
+        pipeline (Pipeline): Unfitted pipeline
+        grid (dict): Parameter grid, as for GridSearchCV
+        X (pd.DataFrame): Training features
+        y (pd.Series): Training target
+        resource (str): "n_estimators" or "n_samples"
+        factor (int): Share of candidates kept each round is 1 / factor
+        workers (int): Parallel fits
+        cv (int): Number of cross-validation folds
+        scoring (str): Score the candidates are ranked by
+
+    Returns:
+        tuple: The fitted search holding the best pipeline, and the
+               wall-clock seconds the exhaustive grid would take, estimated
+               from the fit times of the last round
+    """
+    n_candidates = _grid_size(grid)
+    trees = TREES_PARAM in pipeline.get_params()
+    if resource == "n_estimators" and trees:
+        tree_counts = grid.get(
+            TREES_PARAM, [pipeline.get_params()[TREES_PARAM]])
+        others = {
+            name: values for name, values in grid.items()
+            if name != TREES_PARAM
+        }
+        halving = HalvingGridSearchCV(
+            pipeline, others, resource=TREES_PARAM, factor=factor,
+            min_resources=max(1, min(tree_counts) // factor),
+            max_resources=max(tree_counts), cv=cv, n_jobs=workers,
+            scoring=scoring, refit=False, random_state=0,
+        ).fit(X, y)
+
+        # Compare the grid's tree counts on the winning parameters
+        best = {
+            name: [value] for name, value in halving.best_params_.items()
+            if name != TREES_PARAM
+        }
+        search = GridSearchCV(
+            clone(pipeline), {**best, TREES_PARAM: tree_counts}, cv=cv,
+            n_jobs=workers, scoring=scoring,
+        ).fit(X, y)
+        # Fits of the last stage have the average tree count of the grid
+        scale = np.mean(tree_counts) / np.mean(
+            search.cv_results_[f'param_{TREES_PARAM}'].astype(float))
+    else:
+        search = HalvingGridSearchCV(
+            pipeline, grid, factor=factor,
+            min_resources=min(HALVING_MIN_SAMPLES, len(X)), cv=cv,
+            n_jobs=workers, scoring=scoring, random_state=0,
+        ).fit(X, y)
+        # Fits of the last round use fewer rows than the grid's, so the
+        # estimate is a lower bound
+        scale = 1.0
+
+    exhaustive = np.ceil(n_candidates * cv / workers) * _fit_seconds(
+        search, scale)
+    return search, exhaustive
+
+
+def run_search(X_train, y_train, models=DEFAULT_MODELS, params=None,
+               workers=None, cv=5, scoring='r2', cache=True,
+               cache_dir=None, strategy="grid", resource="n_estimators"):
+    """
+    Tune each model's pipeline and keep the best one.
+
+    Fits run in parallel in `workers` processes. Each model is fitted
+    single-threaded, so the workers are the whole CPU budget.
+
+    Args:
+        X_train (pd.DataFrame): Training features
+        y_train (pd.Series): Training target
+        models (list): Names of the estimators in MODELS to tune
+        params (dict): Grid of each estimator, PARAMS if None
+        workers (int): Parallel fits, all CPUs if None
+        cv (int): Number of cross-validation folds
+        scoring (str): Score the candidates are ranked by
+        cache (bool): Cache the fitted preprocessing across candidates,
+                      which pays off once it costs more than hashing its
+                      input
+        cache_dir (str): Directory caching the fitted preprocessing, a
+                         temporary directory removed afterwards if None
+        strategy (str): "grid" for an exhaustive search, "halving" for
+                        successive halving
+        resource (str): Budget of successive halving, "n_estimators" or
+                        "n_samples"
+
+    Returns:
+        tuple: Name of the best estimator, its refitted pipeline, the
+               score summary and the fitted searches
+    """
+    params = PARAMS if params is None else params
+    workers = workers or os.cpu_count() or 1
+    categorical = [
+        column for column in CATEGORICAL_FEATURES if column in X_train]
+    own_cache = cache and cache_dir is None
+    if own_cache:
+        cache_dir = tempfile.mkdtemp(prefix="training_cache_")
+    memory = joblib.Memory(cache_dir, verbose=0) if cache else None
+
+    grid_searches = {}
+    try:
+        for name in models:
+            pipeline = create_pipeline(MODELS[name](), categorical, memory)
+            grid = params.get(name, {})
+            start = time.perf_counter()
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", FutureWarning)
+                if strategy == "halving" and _grid_size(grid) > 1:
+                    print(
+                        f"Running successive halving on {resource} for "
+                        f"{name} with {workers} workers"
+                    )
+                    search, exhaustive = halving_search(
+                        pipeline, grid, X_train, y_train, resource,
+                        workers=workers, cv=cv, scoring=scoring)
+                    elapsed = time.perf_counter() - start
+                    saved = exhaustive - elapsed
+                    print(
+                        f"{name}: successive halving took {elapsed:.1f}s, "
+                        f"the exhaustive grid of {_grid_size(grid)} "
+                        f"candidates would take about {exhaustive:.1f}s "
+                        + (f"(saved about {saved:.1f}s)" if saved >= 0
+                           else f"(cost about {-saved:.1f}s more)")
+                    )
+                else:
+                    print(
+                        f"Running GridSearchCV for {name} with "
+                        f"{workers} workers"
+                    )
+                    search = GridSearchCV(
+                        pipeline, grid, cv=cv, n_jobs=workers,
+                        scoring=scoring,
+                    ).fit(X_train, y_train)
+                    print(
+                        f"{name}: grid search took "
+                        f"{time.perf_counter() - start:.1f}s"
+                    )
+            grid_searches[name] = search
+    finally:
+        if own_cache:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    summary = score_summary(grid_searches)
+    best_name = summary.loc[0, 'estimator']
+    best_pipeline = grid_searches[best_name].best_estimator_
+    # The cache only serves fitting, the saved pipeline doesn't keep it
+    best_pipeline.set_params(memory=None)
+    return best_name, best_pipeline, summary, grid_searches
+
+
+def feature_importance_figure(pipeline, features):
+    """
+    Plot the feature importances of a fitted tree-based pipeline, as
+    notebook 05.
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline
+        features (list): Features of the pipeline, in order
+
+    Returns:
+        Figure: Bar plot of the importances, or None if the model has none
+    """
+    model = pipeline.steps[-1][1]
+    importances = getattr(model, "feature_importances_", None)
+    if importances is None:
+        return None
+    df_feature_importance = pd.DataFrame({
+        'Feature': features, 'Importance': importances,
+    }).sort_values(by='Importance', ascending=False)
+
+    with sns.axes_style('darkgrid'):
+        fig, ax = plt.subplots(figsize=(6, 3))
+        sns.barplot(
+            data=df_feature_importance, x='Importance', y='Feature',
+            hue='Feature', legend=False, ax=ax,
+            palette=sns.color_palette(
+                "Spectral", n_colors=len(df_feature_importance)),
+        )
+    ax.set_title('Feature Importance', fontsize=20)
+    ax.set_xlabel('Importance', fontsize=9)
+    ax.set_ylabel('Feature', fontsize=9)
+    fig.tight_layout()
+    return fig
+
+
+def next_version(model_dir=MODEL_DIR):
+    """
+    Return the name of the version after the newest one on disk.
+
+    Args:
+        model_dir (str): Directory holding the version directories
+
+    Returns:
+        str: Version name, e.g. "v2"
+    """
+    numbers = [
+        int(name[1:]) for name in os.listdir(model_dir)
+        if name.startswith("v") and name[1:].isdigit()
+    ] if os.path.isdir(model_dir) else []
+    return f"v{max(numbers, default=0) + 1}"
+
+
+def save_version(pipeline, X_train, X_test, y_train, y_test, summary,
+                 model_dir=MODEL_DIR, version=None, house_data=None):
+    """
+    Write a trained pipeline and its artifacts as a new model version.
+
+    Besides the pipeline and its training data, the version gets its
+    manifest, its evaluation and, when the model supports them, its
+    compiled forest and its price surface, so the pages and the
+    prediction service have nothing left to build. Everything is written
+    into a hidden directory that is renamed to the version name at the
+    end, so the model registry never sees a partial version.
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline
+        X_train (pd.DataFrame): Training features
+        X_test (pd.DataFrame): Test features
+        y_train (pd.Series): Training target
+        y_test (pd.Series): Test target
+        summary (pd.DataFrame): Output of `score_summary`
+        model_dir (str): Directory holding the version directories
+        version (str): Version name, the next free one if None
+        house_data (pd.DataFrame): Raw house records the price surface
+                                   spans, read from RAW_DATA_PATH if None
+
+    Returns:
+        str: Path to the version directory
+    """
+    version = version or next_version(model_dir)
+    version_dir = os.path.join(model_dir, version)
+    if os.path.exists(version_dir):
+        raise FileExistsError(f"{version_dir} already exists")
+    os.makedirs(model_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{version}.", dir=model_dir)
+
+    try:
+        joblib.dump(pipeline, os.path.join(tmp_dir, PIPELINE_FILE))
+        X_train.to_parquet(
+            os.path.join(tmp_dir, "X_train.parquet"), index=False)
+        X_test.to_parquet(os.path.join(tmp_dir, "X_test.parquet"), index=False)
+        y_train.to_frame().to_parquet(
+            os.path.join(tmp_dir, "y_train.parquet"), index=False)
+        y_test.to_frame().to_parquet(
+            os.path.join(tmp_dir, "y_test.parquet"), index=False)
+        summary.to_csv(
+            os.path.join(tmp_dir, "grid_search_summary.csv"), index=False)
+
+        fig = feature_importance_figure(pipeline, list(X_train.columns))
+        if fig is not None:
+            fig.savefig(
+                os.path.join(tmp_dir, "feature_importance.png"),
+                bbox_inches='tight')
+            plt.close(fig)
+
+        manifest = write_manifest(tmp_dir, pipeline)
+        evaluate_version(tmp_dir, pipeline, manifest)
+        try:
+            export_compiled_forest(
+                pipeline, os.path.join(tmp_dir, COMPILED_FOREST_FILE),
+                file_content_hash(os.path.join(tmp_dir, PIPELINE_FILE)))
+        except (TypeError, ValueError) as e:
+            # Models other than trees are served by sklearn
+            print(f"No compiled forest for this version: {e}")
+        if supports_price_surface(pipeline):
+            if house_data is None:
+                house_data = load_csv_cached(
+                    RAW_DATA_PATH, "house_prices_records",
+                    build_dtype_schema())
+            create_price_surface(tmp_dir, pipeline, house_data)
+        os.rename(tmp_dir, version_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return version_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tune the sale price pipeline and save it as a new "
+                    "model version."
+    )
+    parser.add_argument(
+        "--models", nargs="+", default=DEFAULT_MODELS, choices=list(MODELS),
+        help="Estimators to tune (default: ExtraTreesRegressor)",
+    )
+    parser.add_argument(
+        "--features", nargs="+", default=BEST_FEATURES,
+        help="Feature columns (default: the best features of notebook 05)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Parallel fits (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--cv", type=int, default=5,
+        help="Cross-validation folds (default: 5)",
+    )
+    parser.add_argument(
+        "--cache-dir", default=None,
+        help="Directory caching fitted preprocessing across runs "
+             "(default: a temporary directory)",
+    )
+    parser.add_argument(
+        "--strategy", choices=STRATEGIES, default="grid",
+        help="Exhaustive grid search or successive halving "
+             "(default: grid)",
+    )
+    parser.add_argument(
+        "--resource", choices=HALVING_RESOURCES, default="n_estimators",
+        help="Budget successive halving allocates (default: n_estimators)",
+    )
+    parser.add_argument(
+        "--compare", action="store_true",
+        help="Also run the exhaustive grid, and report the time saved by "
+             "successive halving and whether it found the same pipeline",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Refit the preprocessing for every candidate",
+    )
+    parser.add_argument(
+        "--model-dir", default=MODEL_DIR,
+        help=f"Directory of the model versions (default: {MODEL_DIR})",
+    )
+    parser.add_argument(
+        "--version", default=None,
+        help="Name of the new version (default: the next free vN)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Run the search without saving a version",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    X_train, X_test, y_train, y_test = load_training_sets(args.features)
+    best_name, best_pipeline, summary, _ = run_search(
+        X_train, y_train, models=args.models, workers=args.workers,
+        cv=args.cv, cache=not args.no_cache, cache_dir=args.cache_dir,
+        strategy=args.strategy, resource=args.resource,
+    )
+    best = summary.iloc[0]
+    elapsed = time.perf_counter() - start
+    print(
+        f"Best estimator {best_name}: mean CV score {best['mean_score']:.3f}"
+        f" in {elapsed:.1f}s"
+    )
+    if args.compare and args.strategy != "grid":
+        start = time.perf_counter()
+        grid_name, grid_pipeline, _, _ = run_search(
+            X_train, y_train, models=args.models, workers=args.workers,
+            cv=args.cv, cache=not args.no_cache, cache_dir=args.cache_dir,
+        )
+        saved = time.perf_counter() - start - elapsed
+        same = (
+            grid_name == best_name
+            and grid_pipeline.get_params()['model'].get_params()
+            == best_pipeline.get_params()['model'].get_params()
+        )
+        print(
+            f"Exhaustive grid took {saved + elapsed:.1f}s, successive "
+            + (f"halving saved {saved:.1f}s" if saved >= 0
+               else f"halving took {-saved:.1f}s longer")
+            + f" and found {'the same' if same else 'a different'} "
+            "best pipeline"
+        )
+    if args.dry_run:
+        return
+    version_dir = save_version(
+        best_pipeline, X_train, X_test, y_train, y_test, summary,
+        model_dir=args.model_dir, version=args.version,
+    )
+    print(f"Saved model version to {version_dir}")
+
+
+if __name__ == "__main__":
+    main()